@@ -1,16 +1,22 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from navigabilite.admin_utils import LargeTableAdmin
 from .models import User, Organization
 
 @admin.register(Organization)
 class OrganizationAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "created_at", "updated_at")
-    search_fields = ("name",)
+    # Préfixe : index accounts_org_name_prefix_idx
+    search_fields = ("^name",)
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(LargeTableAdmin, BaseUserAdmin):
     fieldsets = BaseUserAdmin.fieldsets + (
         ("Rôle et Organisation", {"fields": ("role", "organization")}),
     )
     list_display = ("username", "email", "first_name", "last_name", "role", "organization", "is_staff", "is_superuser")
     list_filter = ("role", "organization", "is_staff", "is_superuser")
+    list_select_related = ("organization",)
+    # Préfixe (pas de LIKE '%xx%') : index accounts_user_uname_prefix_idx / accounts_user_lname_prefix_idx
+    search_fields = ("^username", "^last_name")
+    autocomplete_fields = ("organization",)
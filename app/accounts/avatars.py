@@ -0,0 +1,120 @@
+"""
+Avatars : validation et réduction à l'écriture, variantes de taille fixe.
+
+À l'envoi (ProfileUpdateForm) : l'image est vérifiée par Pillow (format,
+poids, dimensions), remise droite (EXIF) et réduite à AVATAR_MAX_SIDE px.
+On stocke cet original réduit et, pour chaque taille de AVATAR_SIZES, un
+carré WebP + JPEG. Noms dérivés du contenu (avatars/<empreinte>.jpg,
+avatars/<empreinte>-<taille>.<ext>) : un fichier ne change jamais sous un
+même nom, il est servi avec un cache navigateur d'un an (accounts.views.avatar_file).
+"""
+import hashlib
+import io
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True})}
+
+# avatars/<empreinte>.jpg : original réduit ; avatars/<empreinte>-<taille>.<ext> : variantes
+ORIGINAL_RE = re.compile(r"^avatars/(?P<digest>[0-9a-f]{16})\.jpg$")
+VARIANT_RE = re.compile(r"^(?P<digest>[0-9a-f]{16})-(?P<size>\d+)\.(?P<ext>webp|jpg)$")
+
+
+def sizes():
+    return tuple(getattr(settings, "AVATAR_SIZES", (64, 192)))
+
+
+def _encode(image, ext):
+    fmt, options = FORMATS[ext]
+    buf = io.BytesIO()
+    image.save(buf, fmt, **options)
+    return buf.getvalue()
+
+
+def _open(uploaded):
+    """Image validée et chargée (premier calque, RGB, orientation EXIF appliquée)."""
+    max_bytes = getattr(settings, "AVATAR_MAX_UPLOAD_MB", 5) * 1024 * 1024
+    if uploaded.size and uploaded.size > max_bytes:
+        raise ValidationError(f"Image trop lourde (max {max_bytes // (1024 * 1024)} Mo).")
+
+    try:
+        uploaded.seek(0)
+        image = Image.open(uploaded)
+        if image.format not in ALLOWED_FORMATS:
+            raise ValidationError("Format non supporté (JPEG, PNG, WebP ou GIF).")
+        # Dimensions lues dans l'en-tête : refus avant de décoder les pixels
+        if image.width * image.height > getattr(settings, "AVATAR_MAX_PIXELS", 40_000_000):
+            raise ValidationError("Image trop grande.")
+        image.load()
+    except ValidationError:
+        raise
+    except (Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        raise ValidationError("Fichier image illisible.")
+
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    return image
+
+
+def prepare(uploaded):
+    """
+    Valide et réduit l'envoi ; renvoie {nom: octets} (original réduit + variantes).
+    Lève ValidationError si le fichier n'est pas une image acceptable.
+    """
+    image = _open(uploaded)
+    max_side = getattr(settings, "AVATAR_MAX_SIDE", 1024)
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    original = _encode(image, "jpg")
+    digest = hashlib.sha256(original).hexdigest()[:16]
+    files = {f"avatars/{digest}.jpg": original}
+    for size in sizes():
+        square = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for ext in FORMATS:
+            files[f"avatars/{digest}-{size}.{ext}"] = _encode(square, ext)
+    return files
+
+
+def store(files):
+    """Écrit les fichiers absents (même contenu = même nom) ; renvoie le nom de l'original."""
+    name = next(n for n in files if ORIGINAL_RE.match(n))
+    for fname, data in files.items():
+        if not default_storage.exists(fname):
+            default_storage.save(fname, ContentFile(data))
+    return name
+
+
+def variant_names(name):
+    """Noms des variantes d'un original traité ; [] pour un ancien envoi non traité."""
+    m = ORIGINAL_RE.match(name or "")
+    if not m:
+        return []
+    return [f"avatars/{m['digest']}-{size}.{ext}" for size in sizes() for ext in FORMATS]
+
+
+def delete(name):
+    """Supprime un original et ses variantes (plus référencé par aucun utilisateur)."""
+    for fname in [name] + variant_names(name):
+        default_storage.delete(fname)
+
+
+def variant(name, display_px):
+    """(nom webp, nom jpg, taille) de la plus petite variante couvrant display_px en 2x."""
+    m = ORIGINAL_RE.match(name or "")
+    if not m:
+        return None
+    available = sorted(sizes())
+    size = next((s for s in available if s >= display_px * 2), available[-1])
+    return f"{m['digest']}-{size}.webp", f"{m['digest']}-{size}.jpg", size
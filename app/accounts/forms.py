@@ -1,7 +1,10 @@
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
 
+from . import avatars
 from .models import Organization
 
 User = get_user_model()
@@ -15,6 +18,36 @@ class ProfileUpdateForm(forms.ModelForm):
             "email": forms.EmailInput(),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._previous_avatar = self.instance.avatar.name if self.instance.avatar else ""
+        self._avatar_files = None
+
+    def clean_avatar(self):
+        avatar = self.cleaned_data.get("avatar")
+        if isinstance(avatar, UploadedFile):
+            # Validation + réduction ici : l'original envoyé n'est jamais stocké
+            self._avatar_files = avatars.prepare(avatar)
+        return avatar
+
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        if self._avatar_files:
+            # Nom seul : le fichier est déjà écrit, rien à enregistrer au save()
+            user.avatar = avatars.store(self._avatar_files)
+        if commit:
+            user.save()
+            previous = self._previous_avatar
+            if previous and previous != user.avatar.name:
+                transaction.on_commit(lambda: _drop_unused_avatar(previous))
+        return user
+
+
+def _drop_unused_avatar(name):
+    # Même image (même empreinte) possible chez un autre utilisateur
+    if not User.objects.filter(avatar=name).exists():
+        avatars.delete(name)
+
 
 class UserCreateForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from accounts import avatars
+
+
+class Command(BaseCommand):
+    help = (
+        "Traite les avatars envoyés avant la réduction à l'écriture (originaux bruts) "
+        "et régénère les variantes manquantes (ex. après changement de AVATAR_SIZES)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        converted = regenerated = failed = 0
+        for user in User.objects.exclude(avatar="").exclude(avatar=None).only("pk", "avatar").iterator():
+            name = user.avatar.name
+            if avatars.ORIGINAL_RE.match(name) and all(default_storage.exists(v) for v in avatars.variant_names(name)):
+                continue
+            try:
+                with default_storage.open(name, "rb") as handle:
+                    files = avatars.prepare(handle)
+            except (FileNotFoundError, ValidationError) as exc:
+                failed += 1
+                self.stderr.write(f"{user.pk} {name} : {exc}")
+                continue
+            if opts["dry_run"]:
+                continue
+
+            new_name = avatars.store(files)
+            if new_name == name:
+                regenerated += 1
+                continue
+            User.objects.filter(pk=user.pk).update(avatar=new_name)
+            if not User.objects.filter(avatar=name).exists():
+                avatars.delete(name)
+            converted += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{converted} avatar(s) converti(s), {regenerated} complété(s), {failed} en échec."
+        ))
@@ -1,5 +1,8 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import OpClass
+from django.db.models.functions import Upper
 
 
 class Organization(models.Model):
@@ -7,6 +10,12 @@ class Organization(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Autocomplétion : UPPER(name) LIKE 'XX%'
+            models.Index(OpClass(Upper("name"), name="text_pattern_ops"), name="accounts_org_name_prefix_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -25,14 +34,31 @@ class User(AbstractUser):
         LIGHT = "light", "Clair"
 
     role = models.CharField(max_length=20, choices=Roles.choices, default=Roles.PILOT)
+    # Pas d'index simple : couvert par les index d'autocomplétion (organization en tête)
     organization = models.ForeignKey(
-        Organization, on_delete=models.SET_NULL, null=True, blank=True, related_name="users"
+        Organization, on_delete=models.SET_NULL, null=True, blank=True, related_name="users", db_index=False
     )
     avatar = models.ImageField(upload_to="avatars/", null=True, blank=True)
 
     # ✅ Nouveau : thème UI par utilisateur
     ui_theme = models.CharField(max_length=10, choices=UITheme.choices, default=UITheme.DARK)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Autocomplétion des utilisateurs d'une organisation (préfixe identifiant / nom)
+            models.Index(
+                F("organization"), OpClass(Upper("username"), name="text_pattern_ops"),
+                name="accounts_user_org_uname_idx",
+            ),
+            models.Index(
+                F("organization"), OpClass(Upper("last_name"), name="text_pattern_ops"),
+                name="accounts_user_org_lname_idx",
+            ),
+            # Recherche de l'admin, sur toutes les organisations
+            models.Index(OpClass(Upper("username"), name="text_pattern_ops"), name="accounts_user_uname_prefix_idx"),
+            models.Index(OpClass(Upper("last_name"), name="text_pattern_ops"), name="accounts_user_lname_prefix_idx"),
+        ]
+
     def is_admin_or_super(self):
         return self.role in {self.Roles.ADMIN, self.Roles.SUPERADMIN}
 
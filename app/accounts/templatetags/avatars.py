@@ -0,0 +1,22 @@
+from django import template
+from django.urls import reverse
+from django.utils.html import format_html
+
+from accounts import avatars
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar(user, px=32):
+    """Avatar rond de px pixels : variante WebP (JPEG en repli), jamais l'original."""
+    found = avatars.variant(user.avatar.name if user.avatar else "", int(px))
+    if found is None:
+        return ""
+    webp, jpg, _ = found
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}">'
+        '<img src="{}" alt="Avatar" width="{}" height="{}" loading="lazy" '
+        'style="border-radius:50%;object-fit:cover;border:1px solid var(--line);"></picture>',
+        reverse("avatar_file", args=[webp]), reverse("avatar_file", args=[jpg]), px, px,
+    )
@@ -10,6 +10,7 @@ urlpatterns = [
     path("profile/", views.profile_view, name="profile"),  # redirige vers settings
     path("settings/", views.settings_view, name="settings"),
     path("profile/edit/", views.profile_edit, name="profile_edit"),
+    path("avatars/<str:name>", views.avatar_file, name="avatar_file"),
 
     # Mot de passe
     path(
@@ -2,10 +2,13 @@ from django import forms
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
+from django.core.files.storage import default_storage
 from django.db.models import Q
-from django.http import HttpResponseForbidden
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified
 from django.shortcuts import get_object_or_404, redirect, render
 
+from . import avatars
 from .forms import ProfileUpdateForm, UserCreateForm, UserUpdateForm
 from .models import Organization  # <-- important : Organization est dans accounts.models
 
@@ -106,6 +109,24 @@ def admin_home(request):
             }
         )
 
+    if request.user.is_superuser or request.user.role == request.user.Roles.SUPERADMIN:
+        tiles.append(
+            {
+                "title": "Profils",
+                "subtitle": "Profils cProfile des pages lentes",
+                "url": "monitoring_profile_list",
+                "enabled": True,
+            }
+        )
+        tiles.append(
+            {
+                "title": "Requêtes lentes",
+                "subtitle": "Requêtes SQL lentes et plans EXPLAIN",
+                "url": "monitoring_slow_query_list",
+                "enabled": True,
+            }
+        )
+
     return render(request, "admin/home.html", {"tiles": tiles, "can_manage": True})
 
 # -------------------------
@@ -143,6 +164,37 @@ def profile_edit(request):
     return render(request, "users/profile_edit.html", {"form": form})
 
 
+def avatar_file(request, name):
+    """
+    Variante d'avatar. Nom à empreinte du contenu : immuable, cache navigateur
+    d'un an. Sans session ni base. Derrière nginx (MEDIA_ACCEL_REDIRECT), le
+    fichier est envoyé par nginx (X-Accel-Redirect) ; sinon FileResponse
+    (sendfile du serveur WSGI si disponible).
+    """
+    m = avatars.VARIANT_RE.match(name)
+    if not m:
+        raise Http404("Avatar inconnu.")
+
+    etag = f'"{name}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+    else:
+        path = f"avatars/{name}"
+        content_type = "image/webp" if m["ext"] == "webp" else "image/jpeg"
+        prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT", "")
+        if prefix:
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = prefix + path
+        else:
+            try:
+                response = FileResponse(default_storage.open(path, "rb"), content_type=content_type)
+            except FileNotFoundError:
+                raise Http404("Avatar inconnu.")
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
+
+
 # -------------------------
 # Organizations (safe form)
 # -------------------------
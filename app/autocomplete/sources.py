@@ -0,0 +1,88 @@
+"""
+Sources de l'autocomplétion : pour chaque relation, le périmètre visible par
+l'utilisateur (organisation, tout pour le superadmin) et les champs cherchés.
+
+Recherche par préfixe insensible à la casse (UPPER(champ) LIKE 'XX%'), servie
+par les index d'expression UPPER(...) text_pattern_ops déclarés sur les
+modèles. Le même périmètre sert à valider le choix envoyé (voir
+widgets.scope_field) : un id hors organisation est refusé.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+from accounts.models import Organization
+from fleet.models import Aircraft
+from kardex.models import Engine
+
+
+def _is_super(user):
+    return user.role == user.Roles.SUPERADMIN
+
+
+def _org_param(params):
+    try:
+        return int(params.get("organization") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _aircraft(user, params):
+    qs = Aircraft.objects.all()
+    if not _is_super(user):
+        qs = qs.filter(organization_id=user.organization_id)
+    elif _org_param(params):
+        qs = qs.filter(organization_id=_org_param(params))
+    return qs
+
+
+def _engines(user, params):
+    qs = Engine.objects.select_related("aircraft")
+    if not _is_super(user):
+        qs = qs.filter(aircraft__organization_id=user.organization_id)
+    elif _org_param(params):
+        qs = qs.filter(aircraft__organization_id=_org_param(params))
+    return qs
+
+
+def _users(user, params):
+    qs = get_user_model().objects.all()
+    if not _is_super(user):
+        qs = qs.filter(organization_id=user.organization_id)
+    elif _org_param(params):
+        qs = qs.filter(organization_id=_org_param(params))
+    return qs
+
+
+def _organizations(user, params):
+    qs = Organization.objects.all()
+    if not _is_super(user):
+        qs = qs.filter(pk=user.organization_id)
+    return qs
+
+
+class Source:
+    def __init__(self, queryset, search, ordering):
+        self.queryset = queryset      # (user, params) -> queryset visible
+        self.search = search          # champs comparés par préfixe
+        self.ordering = ordering
+
+    def visible(self, user, params=None):
+        return self.queryset(user, params or {})
+
+    def filter(self, user, params, q):
+        qs = self.visible(user, params)
+        if q:
+            cond = Q()
+            for name in self.search:
+                cond |= Q(**{f"{name}__istartswith": q})
+            qs = qs.filter(cond)
+        return qs.order_by(*self.ordering)
+
+
+SOURCES = {
+    "aircraft": Source(_aircraft, ["registration"], [Upper("registration"), "pk"]),
+    "engine": Source(_engines, ["aircraft__registration", "serial_number"], [Upper("aircraft__registration"), "pk"]),
+    "user": Source(_users, ["username", "last_name"], [Upper("username"), "pk"]),
+    "organization": Source(_organizations, ["name"], [Upper("name"), "pk"]),
+}
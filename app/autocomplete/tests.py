@@ -0,0 +1,79 @@
+import datetime
+
+from django.test import TestCase, override_settings
+
+from accounts.models import Organization, User
+from fleet.forms import AircraftForm, FlightLogForm
+from fleet.models import Aircraft
+from kardex.forms import KardexEntryForm
+from kardex.models import Engine, KardexEntry
+
+
+@override_settings(ALERTING_CACHE_ENABLED=False)
+class AutocompleteScopeTests(TestCase):
+    """Même périmètre pour les options proposées et pour la validation du choix envoyé."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org, cls.other_org = Organization.objects.create(name="Club A"), Organization.objects.create(name="Club B")
+        cls.aircraft = Aircraft.objects.create(registration="F-AAAA", organization=cls.org)
+        cls.foreign = Aircraft.objects.create(registration="F-ABBB", organization=cls.other_org)
+        cls.engine = Engine.objects.create(aircraft=cls.aircraft, serial_number="E-1")
+        cls.foreign_engine = Engine.objects.create(aircraft=cls.foreign, serial_number="E-2")
+        cls.admin = User.objects.create_user("admin-a", role=User.Roles.ADMIN, organization=cls.org)
+        cls.pilot = User.objects.create_user("pilote-a", role=User.Roles.PILOT, organization=cls.org)
+        cls.foreign_pilot = User.objects.create_user("pilote-b", role=User.Roles.PILOT, organization=cls.other_org)
+        cls.superadmin = User.objects.create_user("super", role=User.Roles.SUPERADMIN)
+
+    def options(self, user, source, **params):
+        self.client.force_login(user)
+        response = self.client.get(f"/autocomplete/{source}/", params)
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_endpoint_returns_own_organization(self):
+        self.assertEqual(self.options(self.admin, "aircraft", q="f-a"), [self.aircraft.pk])
+        self.assertEqual(self.options(self.admin, "engine"), [self.engine.pk])
+        self.assertEqual(self.options(self.admin, "user", q="pilote"), [self.pilot.pk])
+        self.assertEqual(self.options(self.admin, "organization"), [self.org.pk])
+        # Le paramètre organization ne sert qu'au superadmin
+        self.assertEqual(self.options(self.admin, "aircraft", organization=self.other_org.pk), [self.aircraft.pk])
+        self.assertEqual(self.options(self.superadmin, "aircraft", organization=self.other_org.pk), [self.foreign.pk])
+        self.assertEqual(self.options(self.superadmin, "aircraft"), [self.aircraft.pk, self.foreign.pk])
+
+    def test_kardex_entry_form_rejects_foreign_targets(self):
+        data = {"action": KardexEntry.Action.INSPECT, "date": "2026-03-15"}
+        form = KardexEntryForm({**data, "aircraft": self.foreign.pk, "engine": self.foreign_engine.pk}, user=self.admin)
+        self.assertFalse(form.is_valid())
+        self.assertIn("aircraft", form.errors)
+        self.assertIn("engine", form.errors)
+
+    def test_aircraft_form_rejects_foreign_organization_and_owner(self):
+        data = {"registration": "F-ACCC", "category": Aircraft.Category.choices[0][0], "initial_cycles": 0}
+        form = AircraftForm(
+            {**data, "organization": self.other_org.pk, "owner_user": self.foreign_pilot.pk}, user=self.admin,
+        )
+        self.assertFalse(form.is_valid())
+        self.assertEqual(set(form.errors), {"organization", "owner_user"})
+        self.assertTrue(AircraftForm({**data, "organization": self.org.pk, "owner_user": self.pilot.pk}, user=self.admin).is_valid())
+
+    def test_flight_log_form_rejects_foreign_pilot(self):
+        data = {"date": "2026-03-15", "cycles": 1, "duration_hhmm": "1:00"}
+        form = FlightLogForm({**data, "pilot": self.foreign_pilot.pk}, user=self.admin, aircraft=self.aircraft)
+        self.assertEqual(set(form.errors), {"pilot"})
+        form = FlightLogForm({**data, "pilot": self.pilot.pk}, user=self.admin, aircraft=self.aircraft)
+        self.assertTrue(form.is_valid())
+
+    def test_render_loads_selected_option_only(self):
+        for i in range(5):
+            User.objects.create_user(f"membre-{i}", role=User.Roles.PILOT, organization=self.org)
+        form = FlightLogForm(initial={"pilot": self.pilot.pk}, user=self.admin, aircraft=self.aircraft)
+        with self.assertNumQueries(1):
+            html = str(form["pilot"])
+        self.assertEqual(html.count("<option"), 2)  # option vide + pilote choisi
+        self.assertIn(f'value="{self.pilot.pk}" selected', html)
+        self.assertIn("data-autocomplete=", html)
+
+        with self.assertNumQueries(0):
+            html = str(FlightLogForm(user=self.admin, aircraft=self.aircraft)["pilot"])
+        self.assertEqual(html.count("<option"), 1)
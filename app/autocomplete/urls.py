@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("<str:source>/", views.autocomplete, name="autocomplete"),
+]
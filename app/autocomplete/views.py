@@ -0,0 +1,34 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+
+from monitoring.budgets import query_budget
+
+from .sources import SOURCES
+
+PAGE_SIZE = 20
+
+
+@login_required
+@query_budget(queries=6)
+def autocomplete(request, source: str):
+    """
+    Options d'une relation pour le widget AutocompleteSelect :
+    ?q=<préfixe>&page=<n> -> {"results": [{"id", "text"}], "more": bool}.
+    Une page = une requête LIMIT (PAGE_SIZE + 1 lignes pour savoir s'il y a une suite).
+    """
+    src = SOURCES.get(source)
+    if src is None:
+        raise Http404("Source inconnue.")
+
+    q = (request.GET.get("q") or "").strip()[:60]
+    try:
+        page = max(int(request.GET.get("page") or 1), 1)
+    except ValueError:
+        page = 1
+
+    start = (page - 1) * PAGE_SIZE
+    rows = list(src.filter(request.user, request.GET, q)[start:start + PAGE_SIZE + 1])
+    return JsonResponse({
+        "results": [{"id": obj.pk, "text": str(obj)} for obj in rows[:PAGE_SIZE]],
+        "more": len(rows) > PAGE_SIZE,
+    })
@@ -0,0 +1,57 @@
+import copy
+
+from django import forms
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .sources import SOURCES
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    <select> d'une relation sans la liste complète : seule l'option choisie
+    est rendue, les autres sont chargées à la frappe depuis /autocomplete/<source>/
+    (script autocomplete/_script.html, inclus par base.html).
+    """
+
+    def __init__(self, source, params=None, attrs=None):
+        super().__init__(attrs)
+        self.source = source
+        self.params = params or {}
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        url = reverse("autocomplete", args=[self.source])
+        params = {k: v for k, v in self.params.items() if v}
+        if params:
+            url += "?" + urlencode(params)
+        context["widget"]["attrs"]["data-autocomplete"] = url
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        # Option vide + valeur courante seulement : une requête par pk, jamais toute la table
+        selected = [v for v in value if str(v).isdigit()]
+        choices = self.choices
+        limited = copy.copy(choices)
+        limited.queryset = choices.queryset.filter(pk__in=selected) if selected else choices.queryset.none()
+        self.choices = limited
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+    def use_required_attribute(self, initial):
+        # Select parcourt les choix pour trouver l'option vide : pas de requête ici
+        return forms.Widget.use_required_attribute(self, initial) and self.choices.field.empty_label is not None
+
+
+def autocomplete_field(form, name, source, user, **params):
+    """
+    Branche le champ relationnel name sur la source : widget d'autocomplétion
+    et queryset limité au périmètre de l'utilisateur (validation du choix).
+    """
+    field = form.fields[name]
+    attrs = field.widget.attrs
+    field.widget = AutocompleteSelect(source, params=params, attrs=attrs)
+    field.widget.is_required = field.required
+    field.queryset = SOURCES[source].visible(user, params)
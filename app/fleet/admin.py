@@ -1,8 +1,20 @@
 from django.contrib import admin
-from .models import Aircraft
+from .models import Aerodrome, Aircraft
 
 @admin.register(Aircraft)
 class AircraftAdmin(admin.ModelAdmin):
     list_display = ("registration", "manufacturer", "model", "category", "organization", "owner_user")
-    search_fields = ("registration", "manufacturer", "model", "serial_number")
+    list_select_related = ("organization", "owner_user")
+    # Préfixe d'immatriculation : index fleet_aircraft_reg_prefix_idx
+    search_fields = ("^registration",)
     list_filter = ("category", "organization")
+    autocomplete_fields = ("organization", "owner_user")
+
+
+@admin.register(Aerodrome)
+class AerodromeAdmin(admin.ModelAdmin):
+    # Créés par trigger à la première saisie : seul le nom se complète ici
+    list_display = ("code", "name", "created_at")
+    list_editable = ("name",)
+    search_fields = ("code", "name")
+    readonly_fields = ("code",)
@@ -1,5 +1,10 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 class FleetConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fleet'
+
+    def ready(self):
+        from .partitions import ensure_after_migrate
+        post_migrate.connect(ensure_after_migrate, sender=self, dispatch_uid="fleet_log_partitions")
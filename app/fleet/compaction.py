@@ -0,0 +1,170 @@
+"""
+Compactage des journaux anciens (opt-in : commande compact_logs).
+
+Pour chaque aéronef (journal de vol) et chaque moteur (journal moteur), les
+lignes d'une année antérieure à l'horizon sont :
+- sérialisées en JSONL gzip dans FlightLogArchive / EngineLogArchive ;
+- remplacées dans le journal par une ligne de synthèse (is_summary) au
+  31/12 de l'année, portant exactement la somme des minutes et des cycles.
+
+Les totaux (SUM sur le journal) restent donc exacts sans changer une requête.
+Le détail se relit depuis l'archive (fiche aéronef, export JSONL) et
+restore_year() réinjecte les lignes d'origine (mêmes ids).
+"""
+import datetime
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.db.models.functions import ExtractYear
+
+from kardex.models import Engine, EngineLog, EngineLogArchive
+
+from . import rollups
+from .models import Aircraft, FlightLog, FlightLogArchive
+
+# cycles est un PositiveSmallIntegerField : une synthèse au-delà est découpée
+MAX_SUMMARY_CYCLES = 32767
+# Lignes par UPDATE lors de la remise des horodatages d'origine (restore_year)
+RESTORE_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class LogKind:
+    log_model: type
+    archive_model: type
+    owner_field: str        # FK du journal / de l'archive vers le propriétaire
+    summary_label: str
+
+    def rows(self, owner, year):
+        start, end = datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+        return self.log_model.objects.filter(**{self.owner_field: owner}, date__gte=start, date__lt=end)
+
+
+FLIGHT = LogKind(FlightLog, FlightLogArchive, "aircraft", "vols")
+ENGINE = LogKind(EngineLog, EngineLogArchive, "engine", "lignes moteur")
+
+
+def serialize(row):
+    return {f.attname: f.value_from_object(row) for f in row._meta.concrete_fields}
+
+
+def deserialize(model, record):
+    """Instance (non sauvegardée) reconstruite depuis une ligne d'archive."""
+    values = {}
+    for f in model._meta.concrete_fields:
+        if f.attname in record:
+            values[f.attname] = f.to_python(record[f.attname])
+    return model(**values)
+
+
+def _summary_rows(kind, owner, archive):
+    remarks = f"Synthèse {archive.year} : {archive.row_count} {kind.summary_label} archivés"
+    minutes, cycles = archive.total_minutes, archive.total_cycles
+    rows = []
+    while True:
+        chunk = min(cycles, MAX_SUMMARY_CYCLES)
+        rows.append(kind.log_model(
+            **{kind.owner_field: owner},
+            date=datetime.date(archive.year, 12, 31),
+            duration_minutes=minutes,
+            cycles=chunk,
+            remarks=remarks,
+            is_summary=True,
+        ))
+        minutes, cycles = 0, cycles - chunk
+        if cycles <= 0:
+            return rows
+
+
+@transaction.atomic
+def compact_year(kind, owner, year):
+    """
+    Compacte une année d'un propriétaire. Idempotent : les lignes arrivées
+    après un premier compactage sont fusionnées dans l'archive existante.
+    Retourne le nombre de lignes archivées par cet appel.
+    """
+    live = list(kind.rows(owner, year).filter(is_summary=False).order_by("date", "id").select_for_update())
+    if not live:
+        return 0
+
+    archive, _created = kind.archive_model.objects.select_for_update().get_or_create(
+        **{kind.owner_field: owner}, year=year
+    )
+    archive.set_records(archive.records() + [serialize(r) for r in live])
+    archive.save()
+
+    rows = kind.rows(owner, year)
+    # Mêmes vols, autre stockage : cumuls mensuels inchangés (fleet.rollups)
+    with rollups.suspended():
+        rows.filter(is_summary=True).delete()
+        rows.filter(pk__in=[r.pk for r in live]).delete()
+        kind.log_model.objects.bulk_create(_summary_rows(kind, owner, archive))
+    return len(live)
+
+
+def _restore_timestamps(kind, owner, year, rows):
+    """
+    bulk_create() remplace created_at / updated_at (auto_now_add, auto_now) par
+    l'heure courante : valeurs d'origine remises par UPDATE (update() ne les
+    touche pas), RESTORE_BATCH_SIZE lignes par requête.
+    rows : [(id, {attname: valeur archivée})].
+    """
+    for start in range(0, len(rows), RESTORE_BATCH_SIZE):
+        batch = rows[start:start + RESTORE_BATCH_SIZE]
+        values = {}
+        for f in _auto_timestamp_fields(kind.log_model):
+            whens = [When(pk=pk, then=Value(stamps[f.attname])) for pk, stamps in batch if stamps[f.attname]]
+            if whens:
+                values[f.attname] = Case(*whens, default=f.attname, output_field=f)
+        if values:
+            kind.rows(owner, year).filter(pk__in=[pk for pk, _stamps in batch]).update(**values)
+
+
+def _auto_timestamp_fields(model):
+    return [f for f in model._meta.concrete_fields if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)]
+
+
+@transaction.atomic
+def restore_year(kind, owner, year):
+    """Annule le compactage : lignes d'origine réinsérées (mêmes ids et horodatages), synthèse et archive supprimées."""
+    archive = kind.archive_model.objects.select_for_update().filter(**{kind.owner_field: owner}, year=year).first()
+    if archive is None:
+        return 0
+    records = archive.records()
+    rows = [deserialize(kind.log_model, r) for r in records]
+    # Avant bulk_create, qui écrase les champs auto_now* des instances
+    stamps = [(row.pk, {f.attname: getattr(row, f.attname) for f in _auto_timestamp_fields(kind.log_model)}) for row in rows]
+    with rollups.suspended():
+        kind.rows(owner, year).filter(is_summary=True).delete()
+        kind.log_model.objects.bulk_create(rows)
+        _restore_timestamps(kind, owner, year, stamps)
+    archive.delete()
+    return len(records)
+
+
+def compactable_years(kind, owner, before_year):
+    """Années < before_year ayant encore des lignes détaillées."""
+    return list(
+        kind.log_model.objects.filter(**{kind.owner_field: owner}, is_summary=False, date__lt=datetime.date(before_year, 1, 1))
+        .annotate(year=ExtractYear("date")).values_list("year", flat=True).distinct().order_by("year")
+    )
+
+
+def compact_all(horizon_years, aircraft=None, dry_run=False, stdout=None):
+    """
+    Compacte tout ce qui est plus vieux que horizon_years années civiles
+    (journaux de vol et moteur). Retourne {"flight": n, "engine": n}.
+    """
+    before_year = datetime.date.today().year - horizon_years + 1
+    aircraft_qs = Aircraft.objects.all() if aircraft is None else Aircraft.objects.filter(pk=aircraft.pk)
+    engine_qs = Engine.objects.filter(aircraft__in=aircraft_qs)
+    totals = {"flight": 0, "engine": 0}
+    for key, kind, owners in (("flight", FLIGHT, aircraft_qs), ("engine", ENGINE, engine_qs)):
+        for owner in owners.iterator():
+            for year in compactable_years(kind, owner, before_year):
+                n = kind.rows(owner, year).filter(is_summary=False).count() if dry_run else compact_year(kind, owner, year)
+                totals[key] += n
+                if stdout is not None and n:
+                    stdout.write(f"{owner} {year} : {n} lignes{' (simulation)' if dry_run else ''}")
+    return totals
@@ -0,0 +1,145 @@
+"""
+Échéances des visites : heures, cycles et calendrier, la première atteinte l'emporte.
+
+Une visite peut combiner les trois critères (ex. « 100 h ou 12 mois ») ; un
+critère est actif dès qu'il a un intervalle ou une échéance. Le statut est
+le pire des critères actifs : dépassé, échu (reste 0), sinon à jour.
+
+L'échéancier de la flotte (« tout ce qui tombe dans les 30 jours ») ne lit que
+les échéances calendaires des visites (VisitRule.due_date) et des composants
+(Component.limit_date) : un parcours d'intervalle sur leur index partiel.
+"""
+import calendar
+import datetime
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from kardex.alerting import aircrafts_current_totals
+from kardex.models import Component
+
+from .forms import fmt_hhmm
+from .models import VisitCompletion, VisitRule
+
+SEVERITY = {"ok": 0, "due": 1, "overdue": 2}
+
+
+def add_calendar_months(d, months):
+    """d + months mois, ramené au dernier jour du mois si besoin (31/01 + 1 -> 28 ou 29/02)."""
+    index = d.year * 12 + d.month - 1 + months
+    year, month = index // 12, index % 12 + 1
+    return datetime.date(year, month, min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def fmt_remaining(unit, value):
+    """Reste (valeur absolue) lisible : « 12:30 », « 40 cy », « 12 j »."""
+    value = abs(value)
+    if unit == "minutes":
+        return fmt_hhmm(value)
+    return f"{value} cy" if unit == "cycles" else f"{value} j"
+
+
+def _status(remain):
+    return "ok" if remain > 0 else ("due" if remain == 0 else "overdue")
+
+
+def visit_status(rule, total_minutes, total_cycles, today=None):
+    """
+    {"status", "remaining": [(unité, reste)], "limiting": (unité, reste) | None}
+    unités : "minutes", "cycles", "days" ; limiting = critère qui fixe le statut.
+    Critère actif : intervalle renseigné, ou échéance ponctuelle saisie (soldée
+    à la réalisation, voir next_due).
+    """
+    today = today or timezone.localdate()
+    remaining = []
+    if rule.interval_minutes or rule.due_at_minutes:
+        remaining.append(("minutes", int(rule.due_at_minutes or 0) - int(total_minutes)))
+    if rule.interval_cycles or rule.due_at_cycles:
+        remaining.append(("cycles", int(rule.due_at_cycles or 0) - int(total_cycles)))
+    if rule.due_date:
+        remaining.append(("days", (rule.due_date - today).days))
+
+    if not remaining:
+        return {"status": "ok", "remaining": [], "limiting": None}
+    limiting = max(remaining, key=lambda r: SEVERITY[_status(r[1])])
+    return {"status": _status(limiting[1]), "remaining": remaining, "limiting": limiting}
+
+
+def visit_label(rule, evaluation):
+    """Libellé court (tuiles de la flotte) : « 100h dans 12:30 / 40 j », « 100h dépassée de 3 j »."""
+    status = evaluation["status"]
+    if status == "due":
+        return f"{rule.name} échue"
+    if status == "overdue":
+        unit, remain = evaluation["limiting"]
+        return f"{rule.name} dépassée de {fmt_remaining(unit, remain)}"
+    parts = " / ".join(fmt_remaining(unit, remain) for unit, remain in evaluation["remaining"])
+    return f"{rule.name} dans {parts}" if parts else rule.name
+
+
+def next_due(rule, done_minutes, done_cycles, done_date):
+    """
+    Prochaines échéances (minutes, cycles, date) après une réalisation. Un
+    critère sans intervalle est soldé (0 / None) : sinon le total au moment de
+    la réalisation resterait comme échéance et la visite serait dépassée au
+    premier vol.
+    """
+    return (
+        done_minutes + rule.interval_minutes if rule.interval_minutes else 0,
+        done_cycles + rule.interval_cycles if rule.interval_cycles else 0,
+        add_calendar_months(done_date, rule.interval_months) if rule.interval_months else None,
+    )
+
+
+def complete_visits(done, remarks=""):
+    """
+    Enregistre des réalisations de visites, en une transaction :
+    done = {id règle: (date, minutes cellule | None, cycles | None)} ; None =
+    totaux actuels de l'aéronef. Requêtes : verrou des règles (une), totaux
+    (une, groupée), INSERT des réalisations (un), UPDATE des échéances (un).
+    Retourne les règles mises à jour.
+    """
+    if not done:
+        return []
+    with transaction.atomic():
+        rules = list(VisitRule.objects.select_for_update(of=("self",)).select_related("aircraft").filter(pk__in=done))
+        needs_totals = [r.aircraft for r in rules if done[r.pk][1] is None or done[r.pk][2] is None]
+        totals = aircrafts_current_totals({a.pk: a for a in needs_totals}.values())
+        now = timezone.now()
+
+        completions = []
+        for rule in rules:
+            done_date, minutes, cycles = done[rule.pk]
+            current = totals.get(rule.aircraft_id, (0, 0))
+            minutes = current[0] if minutes is None else minutes
+            cycles = current[1] if cycles is None else cycles
+            completions.append(VisitCompletion(
+                rule=rule, date=done_date, at_minutes=minutes, at_cycles=cycles, remarks=remarks,
+            ))
+            rule.due_at_minutes, rule.due_at_cycles, rule.due_date = next_due(rule, minutes, cycles, done_date)
+            rule.updated_at = now
+
+        VisitCompletion.objects.bulk_create(completions)
+        VisitRule.objects.bulk_update(rules, ["due_at_minutes", "due_at_cycles", "due_date", "updated_at"])
+    return rules
+
+
+def visits_due_by(aircraft_ids, horizon):
+    """Visites actives à échéance calendaire au plus tard à horizon (dépassées comprises), par date."""
+    return (
+        VisitRule.objects.filter(active=True, due_date__lte=horizon, aircraft_id__in=aircraft_ids)
+        .select_related("aircraft")
+        .order_by("due_date", "id")
+    )
+
+
+def components_due_by(aircraft_ids, horizon):
+    """Composants posés (cellule ou moteur) à limite calendaire au plus tard à horizon, par date."""
+    return (
+        Component.objects.filter(limit_date__lte=horizon)
+        .exclude(status=Component.Status.SCRAPPED)
+        .filter(Q(installed_aircraft_id__in=aircraft_ids) | Q(installed_engine__aircraft_id__in=aircraft_ids))
+        .select_related("installed_aircraft", "installed_engine__aircraft")
+        .order_by("limit_date", "id")
+    )
@@ -1,7 +1,7 @@
 from django import forms
 from django.contrib.auth import get_user_model
-from accounts.models import Organization
-from .models import Aircraft, FlightLog, VisitRule
+from autocomplete.widgets import autocomplete_field
+from .models import Aircraft, FlightLog, VisitProgram, VisitProgramItem, VisitRule
 
 User = get_user_model()
 
@@ -52,6 +52,14 @@ def minutes_to_hhmm(minutes: int) -> str:
     return f"{h}:{m:02d}"
 
 
+def fmt_hhmm(minutes: int) -> str:
+    """Affichage (pages, flux, exports) : signé, heures sur 2 chiffres au moins (« -03:15 »)."""
+    minutes = int(minutes or 0)
+    sign = "-" if minutes < 0 else ""
+    minutes = abs(minutes)
+    return f"{sign}{minutes // 60:02d}:{minutes % 60:02d}"
+
+
 # ------------------------
 # Aircraft
 # ------------------------
@@ -83,9 +91,10 @@ class AircraftForm(forms.ModelForm):
         user = kwargs.pop("user", None)
         super().__init__(*args, **kwargs)
 
-        # Organisation limitée si non superadmin
-        if user and getattr(user, "role", None) != getattr(user, "Roles").SUPERADMIN:
-            self.fields["organization"].queryset = Organization.objects.filter(id=user.organization_id)
+        # Organisation / propriétaire : autocomplétion limitée à l'organisation si non superadmin
+        if user:
+            autocomplete_field(self, "organization", "organization", user)
+            autocomplete_field(self, "owner_user", "user", user)
 
         # Pré-remplissage HH:MM depuis minutes stockées
         if self.instance and self.instance.pk:
@@ -129,8 +138,14 @@ class FlightLogForm(forms.ModelForm):
         }
 
     def __init__(self, *args, **kwargs):
+        user = kwargs.pop("user", None)
+        aircraft = kwargs.pop("aircraft", None)
         super().__init__(*args, **kwargs)
 
+        # Pilote : utilisateurs de l'organisation de l'aéronef
+        if user and aircraft:
+            autocomplete_field(self, "pilot", "user", user, organization=aircraft.organization_id)
+
         # Si on édite un log existant (rare), on pré-remplit HH:MM
         if self.instance and self.instance.pk:
             self.fields["duration_hhmm"].initial = minutes_to_hhmm(self.instance.duration_minutes or 0)
@@ -151,6 +166,20 @@ class FlightLogForm(forms.ModelForm):
         return instance
 
 
+class SyncFlightLogForm(forms.ModelForm):
+    """Ligne de journal poussée par une tablette (fleet.sync) : durée déjà en minutes."""
+
+    class Meta:
+        model = FlightLog
+        fields = ["date", "from_icao", "to_icao", "duration_minutes", "cycles", "remarks"]
+
+    def clean_duration_minutes(self):
+        minutes = self.cleaned_data["duration_minutes"]
+        if minutes <= 0:
+            raise forms.ValidationError("La durée doit être > 0.")
+        return minutes
+
+
 # ------------------------
 # Visits
 # ------------------------
@@ -174,10 +203,12 @@ class VisitRuleForm(forms.ModelForm):
 
     class Meta:
         model = VisitRule
-        fields = ["name", "interval_cycles", "due_at_cycles", "active"]
+        fields = ["name", "interval_cycles", "due_at_cycles", "interval_months", "due_date", "active"]
         widgets = {
             "interval_cycles": forms.NumberInput(attrs={"min": 0}),
             "due_at_cycles": forms.NumberInput(attrs={"min": 0}),
+            "interval_months": forms.NumberInput(attrs={"min": 0, "placeholder": "12"}),
+            "due_date": forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
         }
 
     def __init__(self, *args, **kwargs):
@@ -208,10 +239,16 @@ class VisitRuleForm(forms.ModelForm):
 
     def clean_interval_hhmm(self):
         val = (self.cleaned_data.get("interval_hhmm") or "").strip()
-        minutes = hhmm_to_minutes(val) if val else 0
-        if minutes <= 0:
-            raise forms.ValidationError("L’intervalle doit être > 0.")
-        return minutes
+        return hhmm_to_minutes(val) if val else 0
+
+    def clean(self):
+        cleaned = super().clean()
+        # Heures, cycles, calendrier : au moins un intervalle (la première échéance atteinte l'emporte)
+        if not (cleaned.get("interval_hhmm") or cleaned.get("interval_cycles") or cleaned.get("interval_months")):
+            raise forms.ValidationError("Renseigner au moins un intervalle : heures, cycles ou mois.")
+        if cleaned.get("interval_months") and not cleaned.get("due_date"):
+            self.add_error("due_date", "Échéance calendaire requise avec un intervalle en mois.")
+        return cleaned
 
     def clean_due_at_hhmm(self):
         val = (self.cleaned_data.get("due_at_hhmm") or "").strip()
@@ -227,6 +264,73 @@ class VisitRuleForm(forms.ModelForm):
         return instance
 
 
+class VisitProgramForm(forms.ModelForm):
+    """Programme d'entretien type ; organisation choisie par le superadmin seulement (vide = commun)."""
+
+    class Meta:
+        model = VisitProgram
+        fields = ["name", "model", "category", "organization"]
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop("user", None)
+        super().__init__(*args, **kwargs)
+        if user is None or user.role != user.Roles.SUPERADMIN:
+            del self.fields["organization"]
+        else:
+            autocomplete_field(self, "organization", "organization", user)
+
+
+class VisitProgramItemForm(forms.ModelForm):
+    """Visite d'un programme : mêmes saisies que VisitRuleForm (HH:MM, cycles, mois)."""
+    interval_hhmm = forms.CharField(
+        label="Intervalle (HH:MM)",
+        required=False,
+        widget=forms.TextInput(attrs={"placeholder": "100:00"}),
+    )
+
+    class Meta:
+        model = VisitProgramItem
+        fields = ["name", "interval_cycles", "interval_months"]
+        widgets = {
+            "interval_cycles": forms.NumberInput(attrs={"min": 0}),
+            "interval_months": forms.NumberInput(attrs={"min": 0, "placeholder": "12"}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        self.program = kwargs.pop("program")
+        super().__init__(*args, **kwargs)
+        self.fields["interval_hhmm"].initial = minutes_to_hhmm(self.instance.interval_minutes or 0)
+
+    def clean_name(self):
+        name = (self.cleaned_data.get("name") or "").strip()
+        if not name:
+            raise forms.ValidationError("Le nom est obligatoire.")
+        qs = VisitProgramItem.objects.filter(program=self.program, name__iexact=name)
+        if self.instance.pk:
+            qs = qs.exclude(pk=self.instance.pk)
+        if qs.exists():
+            raise forms.ValidationError("Une visite avec ce nom existe déjà dans ce programme.")
+        return name
+
+    def clean_interval_hhmm(self):
+        val = (self.cleaned_data.get("interval_hhmm") or "").strip()
+        return hhmm_to_minutes(val) if val else 0
+
+    def clean(self):
+        cleaned = super().clean()
+        if not (cleaned.get("interval_hhmm") or cleaned.get("interval_cycles") or cleaned.get("interval_months")):
+            raise forms.ValidationError("Renseigner au moins un intervalle : heures, cycles ou mois.")
+        return cleaned
+
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        instance.program = self.program
+        instance.interval_minutes = self.cleaned_data.get("interval_hhmm", 0)
+        if commit:
+            instance.save()
+        return instance
+
+
 class VisitCompleteForm(forms.Form):
     # on ne change pas tes noms existants pour éviter de casser fleet/views.py
     minutes_done_total = forms.CharField(
@@ -239,6 +343,11 @@ class VisitCompleteForm(forms.Form):
         min_value=0,
         required=False,
     )
+    date = forms.DateField(
+        label="Date de réalisation",
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"}),
+    )
 
     def clean_minutes_done_total(self):
         val = (self.cleaned_data.get("minutes_done_total") or "").strip()
@@ -246,3 +355,24 @@ class VisitCompleteForm(forms.Form):
         if minutes < 0:
             raise forms.ValidationError("Valeur invalide.")
         return minutes
+
+
+class VisitBulkCompleteForm(forms.Form):
+    """Campagne de visites : date et remarques communes aux lignes cochées."""
+    date = forms.DateField(label="Date de réalisation", widget=forms.DateInput(attrs={"type": "date"}))
+    remarks = forms.CharField(label="Remarques", required=False, widget=forms.TextInput(attrs={"placeholder": "OT, atelier..."}))
+
+
+class VisitBulkRowForm(forms.Form):
+    """
+    Une ligne (préfixe = id de la règle). Date vide : date commune ; totaux
+    vides : totaux actuels de l'aéronef.
+    """
+    selected = forms.BooleanField(required=False)
+    date = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    minutes_done_total = forms.CharField(required=False, widget=forms.TextInput(attrs={"size": 8}))
+    cycles_done_total = forms.IntegerField(required=False, min_value=0, widget=forms.NumberInput(attrs={"min": 0, "style": "width:90px;"}))
+
+    def clean_minutes_done_total(self):
+        val = (self.cleaned_data.get("minutes_done_total") or "").strip()
+        return hhmm_to_minutes(val) if val else None
@@ -0,0 +1,178 @@
+"""
+Tableau de bord de la flotte en direct (aircraft_list) : flux SSE par organisation.
+
+Pas de sondage : le flux s'abonne au bus d'invalidation (NOTIFY nav_cache,
+kardex.invalidation) du process. À chaque écriture, les ids reçus sont
+ramenés aux aéronefs de l'organisation, leurs tuiles recalculées (niveaux
+kardex et totaux via kardex.cache) et seules les tuiles modifiées sont
+poussées au navigateur. Le coût suit le rythme des saisies, pas le nombre
+d'écrans ouverts.
+"""
+import json
+import queue
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from kardex import invalidation
+from kardex.alerting import (
+    aggregate_levels, aircraft_current_totals, aircrafts_current_totals, component_level, engine_level,
+    engines_current_totals,
+)
+from kardex.models import Component, Engine
+
+from .due import SEVERITY, visit_label, visit_status
+from .forms import fmt_hhmm
+from .models import Aircraft, VisitRule
+
+# Regroupe les messages d'une saisie (vol + logs moteurs + kardex) en un envoi
+DEBOUNCE_SECONDS = 0.5
+HEARTBEAT_SECONDS = 15
+
+
+def aircraft_queryset(user):
+    qs = Aircraft.objects.select_related("organization", "owner_user").prefetch_related(
+        "installed_components", "engines", "engines__installed_components"
+    )
+    if user.role != user.Roles.SUPERADMIN:
+        qs = qs.filter(organization_id=user.organization_id)
+    return qs
+
+
+def _visit_summary(rules, total_minutes, total_cycles):
+    """Visite la plus pressante (mêmes règles que la fiche aéronef) : statut + libellé."""
+    today = timezone.localdate()
+    best = None
+    for r in rules:
+        evaluation = visit_status(r, total_minutes, total_cycles, today)
+        # Pire statut d'abord, puis le moins d'heures restantes, puis le moins de jours
+        remain = dict(evaluation["remaining"])
+        key = (-SEVERITY[evaluation["status"]], remain.get("minutes", float("inf")), remain.get("days", float("inf")))
+        if best is None or key < best[0]:
+            best = (key, r, evaluation)
+    if best is None:
+        return "none", ""
+    _key, rule, evaluation = best
+    return evaluation["status"], visit_label(rule, evaluation)
+
+
+def tile(aircraft, rules, engine_totals=None, totals=None):
+    """
+    Données d'une tuile de la flotte (rendu initial et messages SSE).
+    engine_totals : {id moteur: (minutes, cycles)} et totals : (minutes, cycles)
+    de l'aéronef, déjà calculés pour la page (tiles()).
+    """
+    engines = list(aircraft.engines.all())
+    if engine_totals is None:
+        engine_totals = engines_current_totals(engines)
+    components = list(aircraft.installed_components.all())
+    levels = [engine_level(e, *engine_totals[e.pk]) for e in engines]
+    for e in engines:
+        components.extend(e.installed_components.all())
+    levels.extend(component_level(c) for c in components)
+    total_minutes, total_cycles = totals if totals is not None else aircraft_current_totals(aircraft)
+    summary_status, summary_label = _visit_summary(rules, total_minutes, total_cycles)
+    return {
+        "id": aircraft.pk,
+        "level": aggregate_levels(levels),
+        "total_hhmm": fmt_hhmm(total_minutes),
+        "total_cycles": total_cycles,
+        "visit_status": summary_status,
+        "visit_label": summary_label,
+        # Pour retrouver l'aéronef d'un moteur / composant déposé depuis
+        "_engines": sorted(e.pk for e in engines),
+        "_components": sorted(c.pk for c in components),
+    }
+
+
+def tiles(aircraft_qs):
+    """{id: tuile} ; règles de visite actives, totaux aéronefs et totaux moteurs chargés en une requête chacun."""
+    aircraft = list(aircraft_qs)
+    rules = {}
+    for r in VisitRule.objects.filter(aircraft__in=[a.pk for a in aircraft], active=True):
+        rules.setdefault(r.aircraft_id, []).append(r)
+    engine_totals = engines_current_totals([e for a in aircraft for e in a.engines.all()])
+    totals = aircrafts_current_totals(aircraft)
+    return {a.pk: tile(a, rules.get(a.pk, []), engine_totals, totals[a.pk]) for a in aircraft}
+
+
+def public(t):
+    return {k: v for k, v in t.items() if not k.startswith("_")}
+
+
+def _affected_aircraft(keys, state):
+    """Ids d'aéronefs touchés par des clés ("aircraft"|"engine"|"component", id)."""
+    ids = {i for kind, i in keys if kind == "aircraft"}
+    engines = {i for kind, i in keys if kind == "engine"}
+    components = {i for kind, i in keys if kind == "component"}
+
+    # Propriétaire connu du dernier envoi (composant déposé, moteur retiré)...
+    for aircraft_id, t in state.items():
+        if engines.intersection(t["_engines"]) or components.intersection(t["_components"]):
+            ids.add(aircraft_id)
+    # ... et propriétaire actuel (composant posé, moteur ajouté)
+    if engines:
+        ids.update(Engine.objects.filter(pk__in=engines).values_list("aircraft_id", flat=True))
+    if components:
+        for a_id, e_a_id in Component.objects.filter(pk__in=components).values_list(
+            "installed_aircraft_id", "installed_engine__aircraft_id"
+        ):
+            ids.update(x for x in (a_id, e_a_id) if x)
+    return ids
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def event_stream(user):
+    """
+    Générateur SSE. Premier message : toutes les tuiles (l'écran rattrape ce qui
+    a changé depuis le rendu de la page). Ensuite : tuiles modifiées, aéronefs
+    supprimés ({"id": .., "deleted": true}). Le flux se ferme après
+    FLEET_LIVE_MAX_SECONDS ; EventSource se reconnecte seul.
+    """
+    subscription = invalidation.subscribe()
+    try:
+        state = tiles(aircraft_queryset(user))
+        close_old_connections()  # ne pas garder une connexion du pool entre deux messages
+        yield "retry: 2000\n" + _event("tiles", [public(t) for t in state.values()])
+
+        deadline = time.monotonic() + getattr(settings, "FLEET_LIVE_MAX_SECONDS", 300)
+        while time.monotonic() < deadline:
+            try:
+                first = subscription.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+
+            time.sleep(DEBOUNCE_SECONDS)
+            keys = [first]
+            while True:
+                try:
+                    keys.append(subscription.get_nowait())
+                except queue.Empty:
+                    break
+
+            if invalidation.RESYNC in keys:
+                # Bus reconnecté : des messages ont pu être perdus
+                affected = set(state) | set(aircraft_queryset(user).values_list("pk", flat=True))
+            else:
+                affected = _affected_aircraft(keys, state)
+            if not affected:
+                continue
+
+            fresh = tiles(aircraft_queryset(user).filter(pk__in=affected))
+            changed = [public(t) for pk, t in fresh.items() if public(state.get(pk, {})) != public(t)]
+            deleted = [{"id": pk, "deleted": True} for pk in affected if pk in state and pk not in fresh]
+            state.update(fresh)
+            for d in deleted:
+                state.pop(d["id"], None)
+            close_old_connections()
+            if changed or deleted:
+                yield _event("tiles", changed + deleted)
+    finally:
+        invalidation.unsubscribe(subscription)
+        close_old_connections()
@@ -0,0 +1,34 @@
+from kardex.invalidation import evict_on_commit
+from kardex.models import EngineLog
+
+
+def mirror_engine_logs(entry, user=None):
+    """
+    Crée un log moteur par moteur de l'aéronef à partir d'une ligne de
+    journal de vol (saisie web ou synchronisation). Retourne le nombre créé.
+    """
+    engines = list(entry.aircraft.engines.all())
+    if not engines:
+        return 0
+
+    auto_remarks = []
+    if entry.from_icao or entry.to_icao:
+        auto_remarks.append(f"Vol {entry.from_icao or '—'} -> {entry.to_icao or '—'}")
+    if entry.remarks:
+        auto_remarks.append(entry.remarks.strip())
+    remarks = " | ".join([x for x in auto_remarks if x]) or "Auto depuis journal de vol (cellule)"
+
+    EngineLog.objects.bulk_create([
+        EngineLog(
+            engine=e,
+            date=entry.date,
+            duration_minutes=entry.duration_minutes,
+            cycles=entry.cycles,
+            remarks=remarks,
+            created_by=user,
+        )
+        for e in engines
+    ])
+    # bulk_create n'émet pas post_save : éviction locale explicite (NOTIFY par trigger)
+    evict_on_commit(("engine", e.pk) for e in engines)
+    return len(engines)
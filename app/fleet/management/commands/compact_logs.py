@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from fleet import compaction
+from fleet.models import Aircraft
+from kardex.models import Engine
+
+
+class Command(BaseCommand):
+    help = (
+        "Compacte les journaux (vol + moteur) plus anciens que l'horizon : lignes archivées "
+        "(JSONL gzip) et remplacées par une synthèse annuelle aux totaux exacts. "
+        "--restore réinjecte le détail d'une année."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-years", type=int, default=None,
+            help="Années civiles conservées en détail (défaut : LOG_COMPACTION_HORIZON_YEARS)",
+        )
+        parser.add_argument("--aircraft", help="Immatriculation (défaut : toute la flotte)")
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--restore", type=int, metavar="ANNÉE", help="Restaure l'année (avec --aircraft)")
+
+    def handle(self, *args, **opts):
+        aircraft = None
+        if opts["aircraft"]:
+            try:
+                aircraft = Aircraft.objects.get(registration=opts["aircraft"])
+            except Aircraft.DoesNotExist:
+                raise CommandError(f"Aéronef introuvable : {opts['aircraft']}")
+
+        if opts["restore"]:
+            if aircraft is None:
+                raise CommandError("--restore nécessite --aircraft.")
+            n = compaction.restore_year(compaction.FLIGHT, aircraft, opts["restore"])
+            for engine in Engine.objects.filter(aircraft=aircraft):
+                n += compaction.restore_year(compaction.ENGINE, engine, opts["restore"])
+            self.stdout.write(self.style.SUCCESS(f"{n} lignes restaurées."))
+            return
+
+        horizon = opts["horizon_years"]
+        if horizon is None:
+            horizon = getattr(settings, "LOG_COMPACTION_HORIZON_YEARS", 0)
+        if not horizon or horizon < 1:
+            raise CommandError("Compactage désactivé : définir LOG_COMPACTION_HORIZON_YEARS ou --horizon-years (>= 1).")
+
+        totals = compaction.compact_all(horizon, aircraft=aircraft, dry_run=opts["dry_run"], stdout=self.stdout)
+        verb = "à archiver" if opts["dry_run"] else "archivées"
+        self.stdout.write(self.style.SUCCESS(
+            f"Lignes {verb} : {totals['flight']} (vol), {totals['engine']} (moteur)."
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from fleet.partitions import ensure_log_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Crée les partitions annuelles des journaux (vol / moteur) : année courante + N, "
+        "et sort de la partition par défaut les années qui y sont tombées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years-ahead", type=int, default=1)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **opts):
+        created = ensure_log_partitions(using=opts["database"], years_ahead=opts["years_ahead"])
+        for table, years in created.items():
+            if years:
+                self.stdout.write(self.style.SUCCESS(f"{table} : partitions créées pour {', '.join(map(str, years))}"))
+            else:
+                self.stdout.write(f"{table} : à jour")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from fleet import movements, rollups
+from fleet.models import Aircraft
+from kardex.models import Engine
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les cumuls mensuels d'utilisation (vol + moteur) et l'index des "
+        "mouvements par terrain depuis le journal et les archives compactées. "
+        "Les triggers les tiennent à jour ensuite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--aircraft", help="Immatriculation (défaut : toute la flotte)")
+
+    def handle(self, *args, **opts):
+        aircraft_qs = Aircraft.objects.all()
+        if opts["aircraft"]:
+            aircraft_qs = aircraft_qs.filter(registration=opts["aircraft"])
+            if not aircraft_qs.exists():
+                raise CommandError(f"Aéronef introuvable : {opts['aircraft']}")
+
+        months = {"flight": 0, "engine": 0, "movements": 0}
+        # Un propriétaire par transaction : le verrou des cumuls reste bref
+        for pk in aircraft_qs.values_list("pk", flat=True).iterator():
+            months["flight"] += rollups.rebuild(rollups.FLIGHT, pk)
+            months["movements"] += movements.rebuild(pk)
+        for pk in Engine.objects.filter(aircraft__in=aircraft_qs).values_list("pk", flat=True).iterator():
+            months["engine"] += rollups.rebuild(rollups.ENGINE, pk)
+        self.stdout.write(self.style.SUCCESS(
+            f"Mois recalculés : {months['flight']} (vol), {months['engine']} (moteur), "
+            f"{months['movements']} (mouvements terrain × mois)."
+        ))
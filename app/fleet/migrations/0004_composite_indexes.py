@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0003_visitrule_visitcompletion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(fields=['aircraft', '-date', '-id'], include=('duration_minutes', 'cycles'), name='fleet_flog_aircraft_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitrule',
+            index=models.Index(condition=models.Q(('active', True)), fields=['aircraft', 'name'], name='fleet_vrule_active_idx'),
+        ),
+        # Index composites d'abord, puis suppression des index simples qu'ils couvrent
+        migrations.AlterField(
+            model_name='flightlog',
+            name='aircraft',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='logs', to='fleet.aircraft'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+from navigabilite.db import partitioning
+
+
+def forwards(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        partitioning.partition_by_year(cursor, "fleet_flightlog")
+
+
+def backwards(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        partitioning.unpartition(cursor, "fleet_flightlog")
+
+
+class Migration(migrations.Migration):
+    """
+    Journal de vol partitionné par année (RANGE sur date) : copie des lignes
+    existantes dans fleet_flightlog_y<année> + partition par défaut.
+    PK en base : (id, date). Sur une grosse table, prévoir une fenêtre de
+    maintenance (la table est recopiée).
+    """
+
+    dependencies = [
+        ("fleet", "0004_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0005_partition_flightlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='flightlog',
+            name='is_summary',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='FlightLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Année')),
+                ('row_count', models.PositiveIntegerField(default=0, verbose_name='Lignes archivées')),
+                ('total_minutes', models.PositiveIntegerField(default=0, verbose_name='Total (minutes)')),
+                ('total_cycles', models.PositiveIntegerField(default=0, verbose_name='Total (cycles)')),
+                ('payload', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('aircraft', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='log_archives', to='fleet.aircraft')),
+            ],
+            options={
+                'ordering': ['-year'],
+                'abstract': False,
+                'unique_together': {('aircraft', 'year')},
+            },
+        ),
+    ]
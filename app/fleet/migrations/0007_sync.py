@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0006_log_compaction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table_name', models.CharField(max_length=63)),
+                ('object_id', models.BigIntegerField()),
+                ('sync_xid', models.BigIntegerField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='aircraft',
+            name='sync_xid',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='flightlog',
+            name='client_uuid',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='flightlog',
+            name='sync_xid',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='visitrule',
+            name='sync_xid',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='flightlog',
+            index=models.Index(fields=['pilot', 'sync_xid'], name='fleet_flog_pilot_sync_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='flightlog',
+            constraint=models.UniqueConstraint(fields=('client_uuid', 'date'), name='fleet_flog_client_uuid_uniq'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+# Tables synchronisées vers les tablettes (voir fleet.sync)
+SYNCED_TABLES = ["fleet_aircraft", "fleet_visitrule", "fleet_flightlog", "kardex_component"]
+
+FUNCTIONS = """
+CREATE OR REPLACE FUNCTION nav_sync_touch() RETURNS trigger AS $$
+BEGIN
+    NEW.sync_xid := pg_current_xact_id()::text::bigint;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION nav_sync_tombstone() RETURNS trigger AS $$
+BEGIN
+    -- TG_ARGV[0] : nom logique (sur une partition, TG_TABLE_NAME = fleet_flightlog_y2024)
+    INSERT INTO fleet_synctombstone (table_name, object_id, sync_xid, created_at)
+    VALUES (TG_ARGV[0], OLD.id, pg_current_xact_id()::text::bigint, now());
+    RETURN OLD;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGERS = """
+CREATE TRIGGER {table}_sync_touch BEFORE INSERT OR UPDATE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION nav_sync_touch();
+CREATE TRIGGER {table}_sync_delete AFTER DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION nav_sync_tombstone('{table}');
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER IF EXISTS {table}_sync_touch ON {table};
+DROP TRIGGER IF EXISTS {table}_sync_delete ON {table};
+"""
+
+
+class Migration(migrations.Migration):
+    """
+    sync_xid = transaction de la dernière écriture, posé par trigger : couvre
+    save(), update(), bulk_create() et le SQL brut. Les suppressions laissent
+    une trace dans fleet_synctombstone.
+    """
+
+    dependencies = [
+        ("fleet", "0007_sync"),
+        ("kardex", "0008_sync"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            FUNCTIONS + "".join(TRIGGERS.format(table=t) for t in SYNCED_TABLES),
+            "".join(DROP_TRIGGERS.format(table=t) for t in SYNCED_TABLES)
+            + "DROP FUNCTION IF EXISTS nav_sync_touch(); DROP FUNCTION IF EXISTS nav_sync_tombstone();",
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:43
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_autocomplete_indexes'),
+        ('fleet', '0008_sync_triggers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aircraft',
+            index=models.Index(models.F('organization'), django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('registration'), name='text_pattern_ops'), name='fleet_aircraft_org_reg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aircraft',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('registration'), name='text_pattern_ops'), name='fleet_aircraft_reg_prefix_idx'),
+        ),
+        # Index composites d'abord, puis suppression de l'index simple qu'ils couvrent
+        migrations.AlterField(
+            model_name='aircraft',
+            name='organization',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='aircraft', to='accounts.organization'),
+        ),
+        # Index composites d'abord, puis suppression de l'index simple qu'ils couvrent
+        migrations.AlterField(
+            model_name='aircraft',
+            name='organization',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='aircraft', to='accounts.organization'),
+        ),
+    ]
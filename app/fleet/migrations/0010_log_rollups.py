@@ -0,0 +1,100 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Cumuls mensuels des journaux (voir fleet.rollups)
+FUNCTION = """
+CREATE OR REPLACE FUNCTION nav_log_rollup() RETURNS trigger AS $$
+DECLARE
+    -- TG_ARGV[0] : table des cumuls, TG_ARGV[1] : colonne du propriétaire
+    old_owner bigint;
+    new_owner bigint;
+BEGIN
+    -- Compactage / restauration : les lignes changent de place, pas de valeur
+    IF current_setting('nav.rollup_suspended', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        old_owner := (to_jsonb(OLD) ->> TG_ARGV[1])::bigint;
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_owner := (to_jsonb(NEW) ->> TG_ARGV[1])::bigint;
+    END IF;
+    IF TG_OP = 'UPDATE' AND (old_owner, date_trunc('month', OLD.date), OLD.duration_minutes, OLD.cycles, OLD.is_summary)
+            IS NOT DISTINCT FROM (new_owner, date_trunc('month', NEW.date), NEW.duration_minutes, NEW.cycles, NEW.is_summary) THEN
+        RETURN NULL;  -- remarques, pilote... : cumul inchangé
+    END IF;
+
+    -- Retrait : UPDATE seul (cumul déjà supprimé avec son propriétaire : rien à faire)
+    IF TG_OP <> 'INSERT' AND NOT OLD.is_summary THEN
+        EXECUTE format(
+            'UPDATE %1$I SET minutes = minutes - $3, cycles = cycles - $4, entries = entries - 1 '
+            'WHERE %2$I = $1 AND month = $2', TG_ARGV[0], TG_ARGV[1]
+        ) USING old_owner, date_trunc('month', OLD.date)::date, OLD.duration_minutes, OLD.cycles;
+    END IF;
+    IF TG_OP <> 'DELETE' AND NOT NEW.is_summary THEN
+        EXECUTE format(
+            'INSERT INTO %1$I (%2$I, month, minutes, cycles, entries) VALUES ($1, $2, $3, $4, 1) '
+            'ON CONFLICT (%2$I, month) DO UPDATE SET minutes = %1$I.minutes + EXCLUDED.minutes, '
+            'cycles = %1$I.cycles + EXCLUDED.cycles, entries = %1$I.entries + 1', TG_ARGV[0], TG_ARGV[1]
+        ) USING new_owner, date_trunc('month', NEW.date)::date, NEW.duration_minutes, NEW.cycles;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGER = """
+CREATE TRIGGER {table}_rollup AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION nav_log_rollup('{rollup}', '{owner}');
+"""
+
+DROP_TRIGGER = "DROP TRIGGER IF EXISTS {table}_rollup ON {table};"
+
+# Cumuls initiaux depuis le détail du journal (années compactées : rebuild_log_rollups)
+BACKFILL = """
+INSERT INTO {rollup} ({owner}, month, minutes, cycles, entries)
+SELECT {owner}, date_trunc('month', date)::date, SUM(duration_minutes), SUM(cycles), COUNT(*)
+FROM {table} WHERE NOT is_summary GROUP BY 1, 2;
+"""
+
+FLIGHT = {"table": "fleet_flightlog", "rollup": "fleet_flightlogmonth", "owner": "aircraft_id"}
+
+
+class Migration(migrations.Migration):
+    """
+    Cumuls mensuels tenus par trigger (save(), update(), bulk_create(), SQL
+    brut). Trigger cloné sur chaque partition du journal, y compris les
+    partitions créées ensuite.
+    """
+
+    dependencies = [
+        ('fleet', '0009_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightLogMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mois')),
+                ('minutes', models.BigIntegerField(default=0, verbose_name='Minutes')),
+                ('cycles', models.BigIntegerField(default=0, verbose_name='Cycles')),
+                ('entries', models.IntegerField(default=0, verbose_name='Lignes')),
+                ('aircraft', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='log_months', to='fleet.aircraft')),
+            ],
+            options={
+                'ordering': ['month'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='flightlogmonth',
+            constraint=models.UniqueConstraint(fields=('aircraft', 'month'), name='fleet_flog_month_uniq'),
+        ),
+        migrations.RunSQL(
+            FUNCTION + TRIGGER.format(**FLIGHT) + BACKFILL.format(**FLIGHT),
+            DROP_TRIGGER.format(**FLIGHT) + "DROP FUNCTION IF EXISTS nav_log_rollup();",
+        ),
+    ]
@@ -0,0 +1,194 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Index des mouvements par terrain (voir fleet.movements)
+FUNCTIONS = """
+CREATE OR REPLACE FUNCTION nav_aerodrome_id(raw text, create_missing boolean) RETURNS bigint AS $$
+DECLARE
+    normalized text := upper(btrim(coalesce(raw, '')));
+    found bigint;
+BEGIN
+    IF normalized = '' THEN
+        RETURN NULL;
+    END IF;
+    SELECT id INTO found FROM fleet_aerodrome WHERE code = normalized;
+    IF found IS NULL AND create_missing THEN
+        INSERT INTO fleet_aerodrome (code, name, created_at) VALUES (normalized, '', now())
+            ON CONFLICT (code) DO NOTHING RETURNING id INTO found;
+        IF found IS NULL THEN  -- créé entre-temps par une autre transaction
+            SELECT id INTO found FROM fleet_aerodrome WHERE code = normalized;
+        END IF;
+    END IF;
+    RETURN found;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION nav_movement_apply(
+    aircraft bigint, day date, from_code text, to_code text, flight_minutes integer, flight_cycles integer, sign integer
+) RETURNS void AS $$
+DECLARE
+    m date := date_trunc('month', day)::date;
+    dep bigint := nav_aerodrome_id(from_code, sign > 0);
+    arr bigint := nav_aerodrome_id(to_code, sign > 0);
+BEGIN
+    -- Retrait : UPDATE seul (lignes déjà supprimées avec l'aéronef : rien à faire)
+    IF sign < 0 THEN
+        UPDATE fleet_aerodromemovement SET departures = departures - 1
+            WHERE aircraft_id = aircraft AND aerodrome_id = dep AND month = m;
+        UPDATE fleet_aerodromemovement SET arrivals = arrivals - 1, landings = landings - flight_cycles
+            WHERE aircraft_id = aircraft AND aerodrome_id = arr AND month = m;
+        UPDATE fleet_routemonth SET flights = flights - 1, minutes = minutes - flight_minutes
+            WHERE aircraft_id = aircraft AND origin_id = dep AND destination_id = arr AND month = m;
+        RETURN;
+    END IF;
+    IF dep IS NOT NULL THEN
+        INSERT INTO fleet_aerodromemovement AS t (aircraft_id, aerodrome_id, month, departures, arrivals, landings)
+            VALUES (aircraft, dep, m, 1, 0, 0)
+            ON CONFLICT (aircraft_id, aerodrome_id, month) DO UPDATE SET departures = t.departures + 1;
+    END IF;
+    IF arr IS NOT NULL THEN
+        INSERT INTO fleet_aerodromemovement AS t (aircraft_id, aerodrome_id, month, departures, arrivals, landings)
+            VALUES (aircraft, arr, m, 0, 1, flight_cycles)
+            ON CONFLICT (aircraft_id, aerodrome_id, month)
+            DO UPDATE SET arrivals = t.arrivals + 1, landings = t.landings + EXCLUDED.landings;
+    END IF;
+    IF dep IS NOT NULL AND arr IS NOT NULL THEN
+        INSERT INTO fleet_routemonth AS t (aircraft_id, origin_id, destination_id, month, flights, minutes)
+            VALUES (aircraft, dep, arr, m, 1, flight_minutes)
+            ON CONFLICT (aircraft_id, origin_id, destination_id, month)
+            DO UPDATE SET flights = t.flights + 1, minutes = t.minutes + EXCLUDED.minutes;
+    END IF;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION nav_log_movements() RETURNS trigger AS $$
+BEGIN
+    -- Compactage / restauration : même suspension que les cumuls mensuels (fleet.rollups)
+    IF current_setting('nav.rollup_suspended', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'UPDATE' AND (
+        OLD.aircraft_id, date_trunc('month', OLD.date), upper(btrim(OLD.from_icao)), upper(btrim(OLD.to_icao)),
+        OLD.duration_minutes, OLD.cycles, OLD.is_summary
+    ) IS NOT DISTINCT FROM (
+        NEW.aircraft_id, date_trunc('month', NEW.date), upper(btrim(NEW.from_icao)), upper(btrim(NEW.to_icao)),
+        NEW.duration_minutes, NEW.cycles, NEW.is_summary
+    ) THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'INSERT' AND NOT OLD.is_summary THEN
+        PERFORM nav_movement_apply(OLD.aircraft_id, OLD.date, OLD.from_icao, OLD.to_icao, OLD.duration_minutes, OLD.cycles, -1);
+    END IF;
+    IF TG_OP <> 'DELETE' AND NOT NEW.is_summary THEN
+        PERFORM nav_movement_apply(NEW.aircraft_id, NEW.date, NEW.from_icao, NEW.to_icao, NEW.duration_minutes, NEW.cycles, 1);
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER fleet_flightlog_movements AFTER INSERT OR UPDATE OR DELETE ON fleet_flightlog
+    FOR EACH ROW EXECUTE FUNCTION nav_log_movements();
+"""
+
+DROP_FUNCTIONS = """
+DROP TRIGGER IF EXISTS fleet_flightlog_movements ON fleet_flightlog;
+DROP FUNCTION IF EXISTS nav_log_movements();
+DROP FUNCTION IF EXISTS nav_movement_apply(bigint, date, text, text, integer, integer, integer);
+DROP FUNCTION IF EXISTS nav_aerodrome_id(text, boolean);
+"""
+
+# Index initial depuis le détail du journal (années compactées : rebuild_log_rollups)
+BACKFILL = """
+CREATE TEMPORARY TABLE nav_movement_src ON COMMIT DROP AS
+SELECT aircraft_id, date_trunc('month', date)::date AS month, upper(btrim(from_icao)) AS dep,
+       upper(btrim(to_icao)) AS arr, duration_minutes, cycles
+FROM fleet_flightlog WHERE NOT is_summary;
+
+INSERT INTO fleet_aerodrome (code, name, created_at)
+SELECT code, '', now() FROM (SELECT dep AS code FROM nav_movement_src UNION SELECT arr FROM nav_movement_src) c
+WHERE code <> '' ON CONFLICT (code) DO NOTHING;
+
+INSERT INTO fleet_aerodromemovement (aircraft_id, aerodrome_id, month, departures, arrivals, landings)
+SELECT s.aircraft_id, a.id, s.month, SUM(s.departures), SUM(s.arrivals), SUM(s.landings)
+FROM (
+    SELECT aircraft_id, month, dep AS code, 1 AS departures, 0 AS arrivals, 0 AS landings FROM nav_movement_src
+    UNION ALL
+    SELECT aircraft_id, month, arr, 0, 1, cycles FROM nav_movement_src
+) s JOIN fleet_aerodrome a ON a.code = s.code
+GROUP BY 1, 2, 3;
+
+INSERT INTO fleet_routemonth (aircraft_id, origin_id, destination_id, month, flights, minutes)
+SELECT s.aircraft_id, o.id, d.id, s.month, COUNT(*), SUM(s.duration_minutes)
+FROM nav_movement_src s
+JOIN fleet_aerodrome o ON o.code = s.dep
+JOIN fleet_aerodrome d ON d.code = s.arr
+GROUP BY 1, 2, 3, 4;
+"""
+
+
+class Migration(migrations.Migration):
+    """
+    Terrains et mouvements tenus par trigger à chaque écriture du journal de
+    vol, comme les cumuls mensuels (migration 0010).
+    """
+
+    dependencies = [
+        ('fleet', '0010_log_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Aerodrome',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=8, unique=True, verbose_name='Code ICAO/IATA')),
+                ('name', models.CharField(blank=True, max_length=120, verbose_name='Nom')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RouteMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mois')),
+                ('flights', models.IntegerField(default=0, verbose_name='Vols')),
+                ('minutes', models.BigIntegerField(default=0, verbose_name='Minutes')),
+                ('aircraft', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='routes', to='fleet.aircraft')),
+                ('destination', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='fleet.aerodrome')),
+                ('origin', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='fleet.aerodrome')),
+            ],
+            options={
+                'ordering': ['month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AerodromeMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mois')),
+                ('departures', models.IntegerField(default=0, verbose_name='Départs')),
+                ('arrivals', models.IntegerField(default=0, verbose_name='Arrivées')),
+                ('landings', models.IntegerField(default=0, verbose_name='Atterrissages')),
+                ('aerodrome', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='movements', to='fleet.aerodrome')),
+                ('aircraft', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='movements', to='fleet.aircraft')),
+            ],
+            options={
+                'ordering': ['month'],
+                'indexes': [models.Index(fields=['aerodrome', 'month'], name='fleet_movement_field_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='aerodromemovement',
+            constraint=models.UniqueConstraint(fields=('aircraft', 'aerodrome', 'month'), name='fleet_movement_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='routemonth',
+            constraint=models.UniqueConstraint(fields=('aircraft', 'origin', 'destination', 'month'), name='fleet_route_month_uniq'),
+        ),
+        migrations.RunSQL(FUNCTIONS + BACKFILL, DROP_FUNCTIONS),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-19 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0011_aerodrome_movements'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visitrule',
+            name='due_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Échéance calendaire'),
+        ),
+        migrations.AddField(
+            model_name='visitrule',
+            name='interval_months',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Optionnel (0 si non utilisé)', verbose_name='Intervalle calendaire (mois)'),
+        ),
+        migrations.AddIndex(
+            model_name='visitrule',
+            index=models.Index(condition=models.Q(('active', True), ('due_date__isnull', False)), fields=['due_date'], name='fleet_vrule_due_date_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-19 07:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_admin_search_indexes'),
+        ('fleet', '0012_calendar_due'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitProgram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, verbose_name='Nom du programme')),
+                ('model', models.CharField(blank=True, help_text='Vide = tous les modèles', max_length=120, verbose_name="Modèle d'aéronef")),
+                ('category', models.CharField(blank=True, choices=[('ULM', 'ULM'), ('SEP', 'Monomoteur piston (SEP)'), ('MEP', 'Multimoteur piston (MEP)')], max_length=8, verbose_name='Catégorie')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='visit_programs', to='accounts.organization')),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VisitProgramItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, verbose_name='Nom de la visite')),
+                ('interval_minutes', models.PositiveIntegerField(default=0, verbose_name='Intervalle (minutes)')),
+                ('interval_cycles', models.PositiveIntegerField(default=0, verbose_name='Intervalle (cycles)')),
+                ('interval_months', models.PositiveSmallIntegerField(default=0, verbose_name='Intervalle calendaire (mois)')),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='fleet.visitprogram')),
+            ],
+            options={
+                'ordering': ['program', 'name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='visitrule',
+            name='program_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='rules', to='fleet.visitprogramitem'),
+        ),
+        migrations.AddConstraint(
+            model_name='visitprogramitem',
+            constraint=models.UniqueConstraint(fields=('program', 'name'), name='fleet_program_item_uniq'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-19 09:10
+
+from django.db import migrations
+
+# Les réalisations enregistrées jusqu'ici écrivaient « total réalisé + 0 »
+# comme échéance d'un critère sans intervalle (ex. cycles d'une visite 50h) :
+# la visite passait « dépassée » au premier vol. On solde ces échéances quand
+# elles valent exactement le total de la dernière réalisation.
+CLEAR_STALE = """
+WITH last AS (
+    SELECT DISTINCT ON (rule_id) rule_id, at_minutes, at_cycles
+    FROM fleet_visitcompletion ORDER BY rule_id, date DESC, id DESC
+)
+UPDATE fleet_visitrule r SET
+    due_at_minutes = CASE WHEN r.interval_minutes = 0 AND r.due_at_minutes = last.at_minutes THEN 0 ELSE r.due_at_minutes END,
+    due_at_cycles = CASE WHEN r.interval_cycles = 0 AND r.due_at_cycles = last.at_cycles THEN 0 ELSE r.due_at_cycles END
+FROM last
+WHERE last.rule_id = r.id
+  AND ((r.interval_minutes = 0 AND r.due_at_minutes = last.at_minutes AND r.due_at_minutes <> 0)
+       OR (r.interval_cycles = 0 AND r.due_at_cycles = last.at_cycles AND r.due_at_cycles <> 0));
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0013_visit_programs'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CLEAR_STALE, migrations.RunSQL.noop),
+    ]
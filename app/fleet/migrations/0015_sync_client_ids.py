@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-19 07:21
+
+from django.db import migrations, models
+
+# Lignes déjà poussées ; un UUID présent à deux dates garde sa première ligne
+BACKFILL = """
+INSERT INTO fleet_syncclientid (client_uuid, flight_log_id, created_at)
+SELECT DISTINCT ON (client_uuid) client_uuid, id, created_at
+FROM fleet_flightlog
+WHERE client_uuid IS NOT NULL
+ORDER BY client_uuid, id;
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0014_clear_stale_visit_due'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncClientId',
+            fields=[
+                ('client_uuid', models.UUIDField(primary_key=True, serialize=False)),
+                ('flight_log_id', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunSQL(BACKFILL, migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-19 07:26
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0015_sync_client_ids'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='visitrule',
+            name='fleet_vrule_active_idx',
+        ),
+    ]
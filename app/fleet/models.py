@@ -1,5 +1,12 @@
+import gzip
+import json
+
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import OpClass
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.db.models.functions import Upper
 from accounts.models import Organization
 
 class Aircraft(models.Model):
@@ -19,14 +26,25 @@ class Aircraft(models.Model):
     initial_minutes = models.PositiveIntegerField("HDV initiales (minutes)", default=0)
     initial_cycles  = models.PositiveIntegerField("Cycles initiaux", default=0)
 
-    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="aircraft")
+    # Pas d'index simple : couvert par fleet_aircraft_org_reg_idx (organization en tête)
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="aircraft", db_index=False)
     owner_user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="owned_aircraft")
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Transaction de la dernière écriture (trigger SQL, voir fleet.sync)
+    sync_xid = models.BigIntegerField(default=0, editable=False, db_index=True)
 
     class Meta:
         ordering = ["registration"]
+        indexes = [
+            # Autocomplétion : UPPER(registration) LIKE 'F-%', dans l'organisation ou sur tout le parc
+            models.Index(
+                F("organization"), OpClass(Upper("registration"), name="text_pattern_ops"),
+                name="fleet_aircraft_org_reg_idx",
+            ),
+            models.Index(OpClass(Upper("registration"), name="text_pattern_ops"), name="fleet_aircraft_reg_prefix_idx"),
+        ]
 
     def __str__(self):
         return self.registration
@@ -34,7 +52,8 @@ class Aircraft(models.Model):
 
 class FlightLog(models.Model):
     """Ligne de journal de vol (totalise HDV & cycles)."""
-    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name="logs")
+    # Pas d'index simple : couvert par fleet_flog_aircraft_date_idx (aircraft en tête)
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name="logs", db_index=False)
     date = models.DateField("Date")
     from_icao = models.CharField("Départ (ICAO/IATA)", max_length=8, blank=True)
     to_icao   = models.CharField("Arrivée (ICAO/IATA)", max_length=8, blank=True)
@@ -43,33 +62,244 @@ class FlightLog(models.Model):
     pilot = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="flights")
     remarks = models.TextField("Remarques", blank=True)
 
+    # Ligne de synthèse d'une année compactée (voir FlightLogArchive)
+    is_summary = models.BooleanField(default=False)
+
+    # Identifiant généré par la tablette (synchronisation hors-ligne, idempotence)
+    client_uuid = models.UUIDField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    sync_xid = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-date", "-id"]
+        indexes = [
+            # Journal d'un aéronef dans l'ordre d'affichage (sans tri) ; INCLUDE
+            # durée/cycles : les totaux (SUM par aéronef) en index-only scan.
+            models.Index(
+                fields=["aircraft", "-date", "-id"],
+                include=["duration_minutes", "cycles"],
+                name="fleet_flog_aircraft_date_idx",
+            ),
+            # Delta de synchronisation : "mes vols modifiés depuis le curseur"
+            models.Index(fields=["pilot", "sync_xid"], name="fleet_flog_pilot_sync_idx"),
+        ]
+        constraints = [
+            # La clé de partition (date) doit figurer dans toute contrainte unique
+            models.UniqueConstraint(fields=["client_uuid", "date"], name="fleet_flog_client_uuid_uniq"),
+        ]
 
     def __str__(self):
         return f"{self.aircraft.registration} {self.date} {self.duration_minutes} min / {self.cycles} cycle(s)"
     
+class LogArchiveBase(models.Model):
+    """
+    Lignes de journal d'une année, compactées (fleet.compaction) : JSONL
+    compressé en gzip. Les totaux restent dans le journal sous forme de
+    lignes de synthèse (is_summary) ; le détail se relit ici.
+    """
+    year = models.PositiveSmallIntegerField("Année")
+    row_count = models.PositiveIntegerField("Lignes archivées", default=0)
+    total_minutes = models.PositiveIntegerField("Total (minutes)", default=0)
+    total_cycles = models.PositiveIntegerField("Total (cycles)", default=0)
+    payload = models.BinaryField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["-year"]
+
+    def records_jsonl(self) -> str:
+        if not self.payload:
+            return ""
+        return gzip.decompress(bytes(self.payload)).decode("utf-8")
+
+    def records(self):
+        """Lignes archivées (dicts attname -> valeur JSON)."""
+        return [json.loads(line) for line in self.records_jsonl().splitlines() if line]
+
+    def set_records(self, records):
+        data = "\n".join(json.dumps(r, cls=DjangoJSONEncoder, ensure_ascii=False) for r in records)
+        self.payload = gzip.compress(data.encode("utf-8"))
+        self.row_count = len(records)
+        self.total_minutes = sum(int(r["duration_minutes"] or 0) for r in records)
+        self.total_cycles = sum(int(r["cycles"] or 0) for r in records)
+
+
+class FlightLogArchive(LogArchiveBase):
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name="log_archives")
+
+    class Meta(LogArchiveBase.Meta):
+        unique_together = [("aircraft", "year")]
+
+    def __str__(self):
+        return f"{self.aircraft.registration} {self.year} ({self.row_count} vols archivés)"
+
+
+class MonthlyUsageBase(models.Model):
+    """
+    Cumul mensuel d'un journal (heures, cycles, lignes), tenu à jour par trigger
+    à chaque écriture (fleet.rollups). Les lignes de synthèse (is_summary) n'y
+    entrent pas : leurs vols y figurent déjà, au mois réel.
+    """
+    month = models.DateField("Mois")  # 1er du mois
+    minutes = models.BigIntegerField("Minutes", default=0)
+    cycles = models.BigIntegerField("Cycles", default=0)
+    entries = models.IntegerField("Lignes", default=0)
+
+    class Meta:
+        abstract = True
+        ordering = ["month"]
+
+
+class FlightLogMonth(MonthlyUsageBase):
+    # Pas d'index simple : couvert par la contrainte unique (aircraft, month)
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name="log_months", db_index=False)
+
+    class Meta(MonthlyUsageBase.Meta):
+        constraints = [
+            # Cible de l'upsert du trigger ; sert aussi les lectures par aéronef et période
+            models.UniqueConstraint(fields=["aircraft", "month"], name="fleet_flog_month_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.aircraft_id} {self.month:%Y-%m} {self.minutes} min / {self.cycles} cy"
+
+
+class Aerodrome(models.Model):
+    """Terrain cité dans les journaux (code normalisé : majuscules, sans espaces), créé à la première saisie."""
+    code = models.CharField("Code ICAO/IATA", max_length=8, unique=True)
+    name = models.CharField("Nom", max_length=120, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["code"]
+
+    def __str__(self):
+        return f"{self.code} - {self.name}" if self.name else self.code
+
+
+class AerodromeMovement(models.Model):
+    """Départs / arrivées d'un aéronef sur un terrain et un mois (fleet.movements, trigger)."""
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name="movements", db_index=False)
+    aerodrome = models.ForeignKey(Aerodrome, on_delete=models.PROTECT, related_name="movements", db_index=False)
+    month = models.DateField("Mois")
+    departures = models.IntegerField("Départs", default=0)
+    arrivals = models.IntegerField("Arrivées", default=0)
+    # Cycles des vols arrivés : tours de piste / touch-and-go compris (redevances)
+    landings = models.IntegerField("Atterrissages", default=0)
+
+    class Meta:
+        ordering = ["month"]
+        constraints = [
+            models.UniqueConstraint(fields=["aircraft", "aerodrome", "month"], name="fleet_movement_uniq"),
+        ]
+        indexes = [
+            # Atterrissages d'un terrain par mois (redevances)
+            models.Index(fields=["aerodrome", "month"], name="fleet_movement_field_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.aircraft_id} @ {self.aerodrome_id} {self.month:%Y-%m}"
+
+
+class RouteMonth(models.Model):
+    """Vols d'un aéronef sur une liaison (départ -> arrivée) et un mois."""
+    aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name="routes", db_index=False)
+    origin = models.ForeignKey(Aerodrome, on_delete=models.PROTECT, related_name="+", db_index=False)
+    destination = models.ForeignKey(Aerodrome, on_delete=models.PROTECT, related_name="+", db_index=False)
+    month = models.DateField("Mois")
+    flights = models.IntegerField("Vols", default=0)
+    minutes = models.BigIntegerField("Minutes", default=0)
+
+    class Meta:
+        ordering = ["month"]
+        constraints = [
+            # Cible de l'upsert ; aircraft en tête : liaisons d'un aéronef sur une période
+            models.UniqueConstraint(fields=["aircraft", "origin", "destination", "month"], name="fleet_route_month_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.aircraft_id} {self.origin_id}->{self.destination_id} {self.month:%Y-%m}"
+
+
+class VisitProgram(models.Model):
+    """
+    Programme d'entretien type (50h, 100h, annuelle...) par modèle et / ou
+    catégorie d'aéronef, appliqué en masse (fleet.programs). Sans organisation :
+    programme commun, géré par le superadmin.
+    """
+    name = models.CharField("Nom du programme", max_length=120)
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, null=True, blank=True, related_name="visit_programs"
+    )
+    model = models.CharField("Modèle d'aéronef", max_length=120, blank=True, help_text="Vide = tous les modèles")
+    category = models.CharField("Catégorie", max_length=8, choices=Aircraft.Category.choices, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class VisitProgramItem(models.Model):
+    """Visite d'un programme : devient une VisitRule liée sur chaque aéronef."""
+    program = models.ForeignKey(VisitProgram, on_delete=models.CASCADE, related_name="items")
+    name = models.CharField("Nom de la visite", max_length=120)
+    interval_minutes = models.PositiveIntegerField("Intervalle (minutes)", default=0)
+    interval_cycles = models.PositiveIntegerField("Intervalle (cycles)", default=0)
+    interval_months = models.PositiveSmallIntegerField("Intervalle calendaire (mois)", default=0)
+
+    class Meta:
+        ordering = ["program", "name"]
+        constraints = [
+            models.UniqueConstraint(fields=["program", "name"], name="fleet_program_item_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.program} - {self.name}"
+
+
 class VisitRule(models.Model):
     """Règle de visite périodique (ex: 50h, 100h) spécifique à un aéronef."""
     aircraft = models.ForeignKey(Aircraft, on_delete=models.CASCADE, related_name="visit_rules")
     name = models.CharField("Nom de la visite", max_length=120)  # ex: "50h", "100h"
+    # Visite issue d'un programme : intervalles tenus par le programme (fleet.programs)
+    program_item = models.ForeignKey(
+        VisitProgramItem, on_delete=models.SET_NULL, null=True, blank=True, related_name="rules"
+    )
     interval_minutes = models.PositiveIntegerField("Intervalle (minutes)", help_text="Ex: 50h = 3000")
     interval_cycles = models.PositiveIntegerField("Intervalle (cycles)", default=0, help_text="Optionnel (0 si non utilisé)")
 
+    interval_months = models.PositiveSmallIntegerField("Intervalle calendaire (mois)", default=0, help_text="Optionnel (0 si non utilisé)")
+
     due_at_minutes = models.PositiveIntegerField("Échéance actuelle (minutes totales cellule)")
     due_at_cycles = models.PositiveIntegerField("Échéance actuelle (cycles totaux cellule)", default=0)
+    due_date = models.DateField("Échéance calendaire", null=True, blank=True)
 
     active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    sync_xid = models.BigIntegerField(default=0, editable=False, db_index=True)
 
     class Meta:
         ordering = ["aircraft", "name"]
+        # Son index (aircraft, name) sert aussi les visites actives d'un aéronef triées par nom
         unique_together = [("aircraft", "name")]
+        indexes = [
+            # Échéancier calendaire de la flotte (fleet.due) : un parcours d'intervalle sur la date
+            models.Index(
+                fields=["due_date"], condition=models.Q(active=True, due_date__isnull=False), name="fleet_vrule_due_date_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.aircraft.registration} - {self.name}"
@@ -90,3 +320,27 @@ class VisitCompletion(models.Model):
     def __str__(self):
         return f"{self.rule} @ {self.at_minutes} min"
 
+
+class SyncTombstone(models.Model):
+    """Suppression d'une ligne synchronisée (trigger SQL), pour le delta des tablettes."""
+    table_name = models.CharField(max_length=63)
+    object_id = models.BigIntegerField()
+    sync_xid = models.BigIntegerField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.table_name}#{self.object_id}"
+
+
+class SyncClientId(models.Model):
+    """
+    UUID client d'une ligne de journal poussée par une tablette (fleet.sync).
+    Table non partitionnée : la contrainte unique de FlightLog inclut la date
+    (clé de partition) et laisse passer le même UUID poussé avec deux dates.
+    """
+    client_uuid = models.UUIDField(primary_key=True)
+    flight_log_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.client_uuid} -> {self.flight_log_id}"
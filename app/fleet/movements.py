@@ -0,0 +1,140 @@
+"""
+Index des mouvements par terrain, tiré des champs départ / arrivée du journal de vol.
+
+Aerodrome : un code normalisé (majuscules, sans espaces) par terrain, créé à
+la première saisie qui le cite ; le nom se complète dans l'admin.
+AerodromeMovement (départs, arrivées, atterrissages par aéronef, terrain et
+mois) et RouteMonth (vols et minutes par liaison et mois) sont tenus à jour
+par trigger (migration fleet.0011), comme les cumuls mensuels (fleet.rollups) :
+même suspension pendant le compactage, même recalcul (rebuild_log_rollups).
+
+Les rapports ne lisent que ces tables : jamais de GROUP BY sur le journal.
+"""
+import datetime
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Trim, TruncMonth, Upper
+
+from .models import Aerodrome, AerodromeMovement, FlightLog, FlightLogArchive, RouteMonth
+from .rollups import month_start
+
+
+def normalize_code(code):
+    """Même normalisation que le trigger : upper(btrim(code))."""
+    return (code or "").strip().upper()
+
+
+# ---------------------------------------------------------------------------
+# Recalcul
+# ---------------------------------------------------------------------------
+
+def _flights(aircraft_id):
+    """[(mois, départ, arrivée, vols, minutes, cycles)] : détail vivant + archives."""
+    grouped = {}
+    live = (
+        FlightLog.objects.filter(aircraft_id=aircraft_id, is_summary=False)
+        .annotate(m=TruncMonth("date"), dep=Upper(Trim("from_icao")), arr=Upper(Trim("to_icao")))
+        .order_by().values("m", "dep", "arr")
+        .annotate(n=Count("id"), minutes=Sum("duration_minutes"), cycles=Sum("cycles"))
+    )
+    for row in live:
+        grouped[(row["m"], row["dep"], row["arr"])] = [row["n"], row["minutes"], row["cycles"]]
+    for archive in FlightLogArchive.objects.filter(aircraft_id=aircraft_id):
+        for record in archive.records():
+            key = (
+                month_start(datetime.date.fromisoformat(record["date"])),
+                normalize_code(record.get("from_icao")),
+                normalize_code(record.get("to_icao")),
+            )
+            acc = grouped.setdefault(key, [0, 0, 0])
+            acc[0] += 1
+            acc[1] += int(record["duration_minutes"] or 0)
+            acc[2] += int(record["cycles"] or 0)
+    return [(m, dep, arr, *values) for (m, dep, arr), values in grouped.items()]
+
+
+def rebuild(aircraft_id):
+    """Recalcule les mouvements et liaisons d'un aéronef (verrou : voir fleet.rollups.rebuild)."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"LOCK TABLE {AerodromeMovement._meta.db_table}, {RouteMonth._meta.db_table} "
+                "IN SHARE ROW EXCLUSIVE MODE"
+            )
+        flights = _flights(aircraft_id)
+        codes = {c for _m, dep, arr, *_v in flights for c in (dep, arr) if c}
+        Aerodrome.objects.bulk_create([Aerodrome(code=c) for c in codes], ignore_conflicts=True)
+        ids = dict(Aerodrome.objects.filter(code__in=codes).values_list("code", "pk"))
+
+        movements, routes = {}, {}
+        for m, dep, arr, n, minutes, cycles in flights:
+            if dep:
+                movements.setdefault((ids[dep], m), [0, 0, 0])[0] += n
+            if arr:
+                acc = movements.setdefault((ids[arr], m), [0, 0, 0])
+                acc[1] += n
+                acc[2] += cycles
+            if dep and arr:
+                acc = routes.setdefault((ids[dep], ids[arr], m), [0, 0])
+                acc[0] += n
+                acc[1] += minutes
+
+        AerodromeMovement.objects.filter(aircraft_id=aircraft_id).delete()
+        RouteMonth.objects.filter(aircraft_id=aircraft_id).delete()
+        AerodromeMovement.objects.bulk_create([
+            AerodromeMovement(aircraft_id=aircraft_id, aerodrome_id=a, month=m, departures=v[0], arrivals=v[1], landings=v[2])
+            for (a, m), v in movements.items()
+        ], batch_size=1000)
+        RouteMonth.objects.bulk_create([
+            RouteMonth(aircraft_id=aircraft_id, origin_id=o, destination_id=d, month=m, flights=v[0], minutes=v[1])
+            for (o, d, m), v in routes.items()
+        ], batch_size=1000)
+    return len(movements)
+
+
+# ---------------------------------------------------------------------------
+# Rapports
+# ---------------------------------------------------------------------------
+
+def aerodrome_totals(aircraft_ids, first, last):
+    """Mouvements par terrain sur [first, last] (mois), du plus fréquenté au moins fréquenté."""
+    rows = (
+        AerodromeMovement.objects.filter(aircraft_id__in=aircraft_ids, month__gte=month_start(first), month__lte=last)
+        .order_by().values("aerodrome_id", code=F("aerodrome__code"), name=F("aerodrome__name"))
+        .annotate(departures=Sum("departures"), arrivals=Sum("arrivals"), landings=Sum("landings"))
+    )
+    result = [dict(r, movements=r["departures"] + r["arrivals"]) for r in rows]
+    result.sort(key=lambda r: (-r["movements"], r["code"]))
+    return [r for r in result if r["movements"]]
+
+
+def top_routes(aircraft_ids, first, last, limit=10):
+    """Liaisons les plus volées (départ -> arrivée) sur la période."""
+    return list(
+        RouteMonth.objects.filter(aircraft_id__in=aircraft_ids, month__gte=month_start(first), month__lte=last)
+        .order_by().values(origin_code=F("origin__code"), destination_code=F("destination__code"))
+        .annotate(flights=Sum("flights"), minutes=Sum("minutes"))
+        .filter(flights__gt=0)
+        .order_by("-flights", "origin_code", "destination_code")[:limit]
+    )
+
+
+def landings_by_month(aircraft_ids, aerodrome, first, last):
+    """
+    Atterrissages sur un terrain par aéronef et par mois (redevances) :
+    [{"aircraft_id", "registration", "months": {date: (arrivées, atterrissages)}}].
+    """
+    by_aircraft = {}
+    rows = (
+        AerodromeMovement.objects.filter(
+            aerodrome=aerodrome, aircraft_id__in=aircraft_ids, month__gte=month_start(first), month__lte=last,
+        )
+        .filter(arrivals__gt=0)
+        .values_list("aircraft_id", "aircraft__registration", "month", "arrivals", "landings")
+        .order_by("aircraft__registration", "month")
+    )
+    for aircraft_id, registration, m, arrivals, landings in rows:
+        entry = by_aircraft.setdefault(aircraft_id, {"aircraft_id": aircraft_id, "registration": registration, "months": {}})
+        entry["months"][m] = (arrivals, landings)
+    return list(by_aircraft.values())
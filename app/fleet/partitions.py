@@ -0,0 +1,39 @@
+"""
+Partitions annuelles des journaux (FlightLog, EngineLog) : voir
+navigabilite.db.partitioning. Appelé après chaque migrate et par la commande
+ensure_log_partitions (à planifier, ex. chaque mois).
+"""
+import datetime
+
+from django.apps import apps
+from django.db import connections, transaction
+
+from navigabilite.db import partitioning
+
+
+def log_tables():
+    return [
+        apps.get_model("fleet", "FlightLog")._meta.db_table,
+        apps.get_model("kardex", "EngineLog")._meta.db_table,
+    ]
+
+
+def ensure_log_partitions(using="default", years_ahead=1):
+    """
+    Partitions jusqu'à l'année courante + years_ahead, et une partition dédiée
+    pour chaque année échouée dans la partition par défaut.
+    Retourne {table: [années créées]}.
+    """
+    this_year = datetime.date.today().year
+    created = {}
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for table in log_tables():
+            years = set(range(this_year, this_year + years_ahead + 1))
+            years.update(partitioning.default_partition_years(cursor, table))
+            created[table] = partitioning.ensure_year_partitions(cursor, table, years)
+    return created
+
+
+def ensure_after_migrate(sender, using="default", **kwargs):
+    """Receiver post_migrate (FleetConfig.ready)."""
+    ensure_log_partitions(using=using)
@@ -0,0 +1,148 @@
+"""
+Programmes d'entretien types (VisitProgram) appliqués en masse à la flotte.
+
+- apply() : une VisitRule par aéronef et par visite du programme, écrites en
+  un seul bulk_create (INSERT ... ON CONFLICT (aircraft_id, name)). Une visite
+  de même nom déjà présente sur l'aéronef est rattachée au programme et prend
+  ses intervalles.
+- propagate() : la modification d'une visite du programme est reportée sur
+  toutes les règles liées (nom, intervalles) en un bulk_update.
+
+Première échéance d'une règle créée : totaux actuels de l'aéronef + intervalle
+(date du jour + mois), lus pour toute la sélection en une requête groupée.
+Règle existante (rattachée ou modifiée) : les échéances en cours ne bougent
+pas, le nouvel intervalle vaut à la prochaine réalisation ; mais un critère
+qui apparaît (intervalle 0 -> n, sans échéance) reçoit sa première échéance
+comme une règle créée, et un critère retiré (n -> 0) est soldé (voir
+fleet.due.visit_status : une échéance non nulle rend le critère actif).
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from kardex.alerting import aircrafts_current_totals
+
+from .due import add_calendar_months
+from .models import VisitRule
+
+BATCH_SIZE = 1000
+PROGRAM_FIELDS = ["program_item", "interval_minutes", "interval_cycles", "interval_months"]
+DUE_FIELDS = ["due_at_minutes", "due_at_cycles", "due_date"]
+
+
+def matching_aircraft(program, scope):
+    """Aéronefs de scope (queryset) concernés par le programme : modèle et catégorie, s'ils sont renseignés."""
+    qs = scope
+    if program.model:
+        qs = qs.filter(model__iexact=program.model)
+    if program.category:
+        qs = qs.filter(category=program.category)
+    return qs
+
+
+def _first_due(item, minutes, cycles, today):
+    """Échéances d'une règle créée : totaux actuels + intervalle, date du jour + mois ; 0 / None sans intervalle."""
+    return (
+        minutes + item.interval_minutes if item.interval_minutes else 0,
+        cycles + item.interval_cycles if item.interval_cycles else 0,
+        add_calendar_months(today, item.interval_months) if item.interval_months else None,
+    )
+
+
+def _opens(rule, item):
+    """(heures, cycles) : critère qui apparaît sur la règle (intervalle 0 -> n, aucune échéance saisie)."""
+    return (
+        bool(item.interval_minutes and not rule.interval_minutes and not rule.due_at_minutes),
+        bool(item.interval_cycles and not rule.interval_cycles and not rule.due_at_cycles),
+    )
+
+
+def _merged_due(rule, item, totals, today):
+    """Échéances d'une règle existante qui prend les intervalles de item (voir docstring du module)."""
+    first = _first_due(item, *totals, today)
+    merged = []
+    for was, now, due, initial in zip(
+        (rule.interval_minutes, rule.interval_cycles, rule.interval_months),
+        (item.interval_minutes, item.interval_cycles, item.interval_months),
+        (rule.due_at_minutes, rule.due_at_cycles, rule.due_date),
+        first,
+    ):
+        opened = now and not was and not due
+        closed = was and not now
+        merged.append(initial if opened or closed else due)
+    return tuple(merged)
+
+
+def apply(program, aircraft, today=None):
+    """
+    Applique le programme aux aéronefs (liste) : (règles créées, règles existantes rattachées).
+    Requêtes : totaux (une, groupée), règles existantes (une, verrouillées), écriture (une par BATCH_SIZE lignes).
+    """
+    today = today or timezone.localdate()
+    items = list(program.items.all())
+    if not items or not aircraft:
+        return 0, 0
+    totals = aircrafts_current_totals(aircraft)
+    names = [item.name for item in items]
+
+    with transaction.atomic():
+        # Verrou : une réalisation concurrente ne peut pas être écrasée par les échéances lues ici
+        existing = {
+            (r.aircraft_id, r.name): r
+            for r in VisitRule.objects.select_for_update().filter(aircraft__in=aircraft, name__in=names)
+        }
+        rules = []
+        for a in aircraft:
+            for item in items:
+                current = existing.get((a.pk, item.name))
+                if current is None:
+                    due = _first_due(item, *totals[a.pk], today)
+                else:
+                    due = _merged_due(current, item, totals[a.pk], today)
+                rules.append(VisitRule(
+                    aircraft=a,
+                    name=item.name,
+                    program_item=item,
+                    interval_minutes=item.interval_minutes,
+                    interval_cycles=item.interval_cycles,
+                    interval_months=item.interval_months,
+                    due_at_minutes=due[0],
+                    due_at_cycles=due[1],
+                    due_date=due[2],
+                ))
+        VisitRule.objects.bulk_create(
+            rules,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["aircraft", "name"],
+            update_fields=PROGRAM_FIELDS + DUE_FIELDS,
+        )
+    return len(rules) - len(existing), len(existing)
+
+
+def propagate(item, today=None):
+    """
+    Reporte nom et intervalles d'une visite du programme sur ses règles liées ; nombre de règles modifiées.
+    Requêtes : règles liées (une, verrouillées), totaux si un critère heures / cycles apparaît (une,
+    groupée), écriture (une par BATCH_SIZE lignes). Nom déjà pris sur un aéronef : IntegrityError.
+    """
+    today = today or timezone.localdate()
+    rules = list(VisitRule.objects.select_for_update(of=("self",)).select_related("aircraft").filter(program_item=item))
+    opening = {r.aircraft_id: r.aircraft for r in rules if any(_opens(r, item))}
+    totals = aircrafts_current_totals(opening.values()) if opening else {}
+    now = timezone.now()
+
+    changed = []
+    for rule in rules:
+        due = _merged_due(rule, item, totals.get(rule.aircraft_id, (0, 0)), today)
+        values = (item.name, item.interval_minutes, item.interval_cycles, item.interval_months, *due)
+        if values == (rule.name, rule.interval_minutes, rule.interval_cycles, rule.interval_months,
+                      rule.due_at_minutes, rule.due_at_cycles, rule.due_date):
+            continue
+        (rule.name, rule.interval_minutes, rule.interval_cycles, rule.interval_months,
+         rule.due_at_minutes, rule.due_at_cycles, rule.due_date) = values
+        rule.updated_at = now
+        changed.append(rule)
+    VisitRule.objects.bulk_update(
+        changed, ["name", *PROGRAM_FIELDS[1:], *DUE_FIELDS, "updated_at"], batch_size=BATCH_SIZE,
+    )
+    return len(changed)
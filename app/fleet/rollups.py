@@ -0,0 +1,236 @@
+"""
+Cumuls mensuels d'utilisation (heures, cycles) par aéronef et par moteur.
+
+FlightLogMonth / EngineLogMonth sont tenus à jour par trigger (migration
+fleet.0010) à chaque écriture du journal : save(), update(), bulk_create()
+et SQL brut. Les écrans d'utilisation ne lisent que ces cumuls : 10 ans de
+flotte = quelques centaines de lignes, quel que soit le nombre de vols.
+
+- Compactage / restauration (fleet.compaction) : les lignes changent de
+  place sans changer de valeur, le trigger est suspendu (suspended()).
+- rebuild() recalcule depuis le détail du journal et des archives compactées
+  (commande rebuild_log_rollups) : reprise après un import hors trigger,
+  contrôle de cohérence.
+- Cumuls glissants 30 / 90 / 365 jours : mois entiers lus dans les cumuls,
+  mois entamé au début de la fenêtre lu dans le journal (index par
+  propriétaire et date). Si ce mois est compacté, son détail n'est plus dans
+  le journal : il est alors compté au prorata des jours.
+"""
+import calendar
+import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from kardex.models import EngineLog, EngineLogArchive, EngineLogMonth
+
+from .models import FlightLog, FlightLogArchive, FlightLogMonth
+
+WINDOWS = (30, 90, 365)
+
+
+@dataclass(frozen=True)
+class RollupKind:
+    log_model: type
+    archive_model: type
+    rollup_model: type
+    owner_field: str
+
+    @property
+    def owner_attname(self):
+        return f"{self.owner_field}_id"
+
+
+FLIGHT = RollupKind(FlightLog, FlightLogArchive, FlightLogMonth, "aircraft")
+ENGINE = RollupKind(EngineLog, EngineLogArchive, EngineLogMonth, "engine")
+
+
+def month_start(d):
+    return d.replace(day=1)
+
+
+def add_months(d, n):
+    index = d.year * 12 + d.month - 1 + n
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first, last):
+    """Premiers jours des mois de first à last inclus."""
+    months = []
+    current = month_start(first)
+    while current <= last:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+@contextmanager
+def suspended():
+    """Écritures du journal sans effet sur les cumuls, jusqu'à la fin du bloc (même transaction)."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('nav.rollup_suspended', 'on', true)")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('nav.rollup_suspended', 'off', true)")
+
+
+# ---------------------------------------------------------------------------
+# Recalcul
+# ---------------------------------------------------------------------------
+
+def _computed(kind, owner_id):
+    """{mois: [minutes, cycles, lignes]} depuis le détail vivant + les archives."""
+    months = {}
+    live = (
+        kind.log_model.objects.filter(**{kind.owner_attname: owner_id}, is_summary=False)
+        .annotate(m=TruncMonth("date")).order_by().values("m")
+        .annotate(minutes=Sum("duration_minutes"), cycles=Sum("cycles"), n=Count("id"))
+    )
+    for row in live:
+        months[row["m"]] = [row["minutes"], row["cycles"], row["n"]]
+    for archive in kind.archive_model.objects.filter(**{kind.owner_attname: owner_id}):
+        for record in archive.records():
+            m = month_start(datetime.date.fromisoformat(record["date"]))
+            acc = months.setdefault(m, [0, 0, 0])
+            acc[0] += int(record["duration_minutes"] or 0)
+            acc[1] += int(record["cycles"] or 0)
+            acc[2] += 1
+    return months
+
+
+def rebuild(kind, owner_id):
+    """
+    Recalcule les cumuls d'un propriétaire. La table des cumuls est verrouillée
+    le temps du calcul : une écriture concurrente du journal attend, puis
+    applique son delta au cumul recalculé (rien de compté deux fois ni perdu).
+    Retourne le nombre de mois.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {kind.rollup_model._meta.db_table} IN SHARE ROW EXCLUSIVE MODE")
+        months = _computed(kind, owner_id)
+        kind.rollup_model.objects.filter(**{kind.owner_attname: owner_id}).delete()
+        kind.rollup_model.objects.bulk_create([
+            kind.rollup_model(**{kind.owner_attname: owner_id}, month=m, minutes=v[0], cycles=v[1], entries=v[2])
+            for m, v in sorted(months.items())
+        ])
+    return len(months)
+
+
+# ---------------------------------------------------------------------------
+# Lectures
+# ---------------------------------------------------------------------------
+
+def _filled(by_month, first, last):
+    return [
+        {
+            "month": m,
+            "minutes": int(by_month.get(m, {}).get("minutes") or 0),
+            "cycles": int(by_month.get(m, {}).get("cycles") or 0),
+            "entries": int(by_month.get(m, {}).get("entries") or 0),
+        }
+        for m in month_range(first, last)
+    ]
+
+
+def monthly(kind, owner_ids, first, last):
+    """
+    Série mensuelle (somme des propriétaires) de first à last inclus :
+    [{"month": date, "minutes", "cycles", "entries"}], mois vides à 0.
+    owner_ids : liste ou sous-requête (values("pk")).
+    """
+    rows = (
+        kind.rollup_model.objects.filter(
+            **{f"{kind.owner_attname}__in": owner_ids}, month__gte=month_start(first), month__lte=last
+        )
+        .order_by().values("month")
+        .annotate(minutes=Sum("minutes"), cycles=Sum("cycles"), entries=Sum("entries"))
+    )
+    return _filled({r["month"]: r for r in rows}, first, last)
+
+
+def monthly_per_owner(kind, owner_ids, first, last):
+    """{propriétaire: série mensuelle} en une requête."""
+    by_owner = {o: {} for o in owner_ids}
+    rows = kind.rollup_model.objects.filter(
+        **{f"{kind.owner_attname}__in": owner_ids}, month__gte=month_start(first), month__lte=last
+    ).values(kind.owner_attname, "month", "minutes", "cycles", "entries")
+    for r in rows:
+        by_owner[r[kind.owner_attname]][r["month"]] = r
+    return {o: _filled(by_month, first, last) for o, by_month in by_owner.items()}
+
+
+def _window(days, today):
+    """(début, premier mois entier) de la fenêtre glissante de days jours finissant à today."""
+    start = today - datetime.timedelta(days=days - 1)
+    first_full = start if start.day == 1 else add_months(start, 1)
+    return start, first_full
+
+
+def rolling(kind, owner_ids, today=None, windows=WINDOWS):
+    """
+    {propriétaire: {jours: {"minutes", "cycles"}}} : trois requêtes, quel que
+    soit le nombre de fenêtres (cumuls mensuels, journal des mois entamés,
+    années compactées).
+    """
+    today = today or timezone.localdate()
+    bounds = {days: _window(days, today) for days in windows}
+    result = {o: {days: {"minutes": 0, "cycles": 0} for days in windows} for o in owner_ids}
+    owner_key = kind.owner_attname
+
+    earliest = min(first_full for _start, first_full in bounds.values())
+    rollups = kind.rollup_model.objects.filter(
+        **{f"{owner_key}__in": owner_ids}, month__gte=month_start(earliest - datetime.timedelta(days=1)), month__lte=today
+    ).values_list(owner_key, "month", "minutes", "cycles")
+    month_totals = {}
+    for owner, m, minutes, cycles in rollups:
+        month_totals[(owner, m)] = (minutes, cycles)
+        for days, (_start, first_full) in bounds.items():
+            if m >= first_full:
+                result[owner][days]["minutes"] += minutes
+                result[owner][days]["cycles"] += cycles
+
+    partial = {days: (start, first_full) for days, (start, first_full) in bounds.items() if start < first_full}
+    if not partial:
+        return result
+
+    aggregates, edge = {}, Q()
+    for days, (start, first_full) in partial.items():
+        in_window = Q(date__gte=start, date__lt=first_full)
+        aggregates[f"m{days}"] = Sum("duration_minutes", filter=in_window)
+        aggregates[f"c{days}"] = Sum("cycles", filter=in_window)
+        edge |= in_window
+    edge_rows = {
+        row[owner_key]: row
+        for row in kind.log_model.objects.filter(edge, **{f"{owner_key}__in": owner_ids}, is_summary=False)
+        .order_by().values(owner_key).annotate(**aggregates)
+    }
+    compacted = _compacted(kind, owner_ids, {start.year for start, _first_full in partial.values()})
+
+    for owner in owner_ids:
+        row = edge_rows.get(owner, {})
+        for days, (start, first_full) in partial.items():
+            if (owner, start.year) in compacted:
+                # Détail archivé : seul le cumul du mois subsiste, compté au prorata des jours
+                minutes, cycles = month_totals.get((owner, month_start(start)), (0, 0))
+                share = (first_full - start).days / calendar.monthrange(start.year, start.month)[1]
+                minutes, cycles = round(minutes * share), round(cycles * share)
+            else:
+                minutes, cycles = row.get(f"m{days}") or 0, row.get(f"c{days}") or 0
+            result[owner][days]["minutes"] += minutes
+            result[owner][days]["cycles"] += cycles
+    return result
+
+
+def _compacted(kind, owner_ids, years):
+    """{(propriétaire, année)} des années compactées (archive présente)."""
+    return set(
+        kind.archive_model.objects.filter(**{f"{kind.owner_attname}__in": owner_ids}, year__in=years)
+        .values_list(kind.owner_attname, "year")
+    )
@@ -0,0 +1,217 @@
+"""
+Synchronisation hors-ligne des tablettes pilotes (vue fleet.views.sync).
+
+Curseur : identifiant de transaction PostgreSQL. Chaque ligne synchronisée
+porte sync_xid = transaction de sa dernière écriture (trigger, migration
+fleet.0008). Au début d'un pull, on lit le xmin du snapshot courant : toute
+transaction plus ancienne est terminée. Le pull suivant renvoie les lignes
+avec sync_xid >= ce curseur. Aucune écriture validée n'est donc manquée,
+même longue ou concurrente. Une ligne peut être renvoyée deux fois : le
+client applique un upsert par id.
+
+Push : lignes de journal de vol créées hors-ligne, identifiées par un UUID
+client. Un renvoi du même lot (réseau coupé avant la réponse) ne crée pas de
+doublon, même avec une autre date : l'UUID est enregistré dans SyncClientId
+(table non partitionnée, clé unique globale).
+"""
+import uuid
+
+from django.db import IntegrityError, connection, transaction
+
+from kardex.alerting import component_level
+from kardex.models import Component, EngineLog
+
+from .forms import SyncFlightLogForm
+from .logbook import mirror_engine_logs
+from .models import Aircraft, FlightLog, SyncClientId, SyncTombstone, VisitRule
+
+MAX_PUSH = 500
+
+
+def current_cursor() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        return cursor.fetchone()[0]
+
+
+def parse_cursor(value) -> int:
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _aircraft_for(user):
+    qs = Aircraft.objects.all()
+    if user.role != user.Roles.SUPERADMIN:
+        qs = qs.filter(organization_id=user.organization_id)
+    return qs
+
+
+def _aircraft_dict(a):
+    return {
+        "id": a.id,
+        "registration": a.registration,
+        "manufacturer": a.manufacturer,
+        "model": a.model,
+        "category": a.category,
+        "initial_minutes": a.initial_minutes,
+        "initial_cycles": a.initial_cycles,
+        "updated_at": a.updated_at,
+    }
+
+
+def _visit_rule_dict(r):
+    return {
+        "id": r.id,
+        "aircraft": r.aircraft_id,
+        "name": r.name,
+        "interval_minutes": r.interval_minutes,
+        "interval_cycles": r.interval_cycles,
+        "due_at_minutes": r.due_at_minutes,
+        "due_at_cycles": r.due_at_cycles,
+        "interval_months": r.interval_months,
+        "due_date": r.due_date,
+        "active": r.active,
+        "updated_at": r.updated_at,
+    }
+
+
+def _flight_log_dict(f):
+    return {
+        "id": f.id,
+        "client_id": f.client_uuid,
+        "aircraft": f.aircraft_id,
+        "date": f.date,
+        "from_icao": f.from_icao,
+        "to_icao": f.to_icao,
+        "duration_minutes": f.duration_minutes,
+        "cycles": f.cycles,
+        "remarks": f.remarks,
+        "updated_at": f.updated_at,
+    }
+
+
+def _deleted_ids(model, since):
+    """Ids supprimés depuis le curseur (hors lignes réapparues : restauration, déplacement de partition)."""
+    table = model._meta.db_table
+    ids = set(
+        SyncTombstone.objects.filter(table_name=table, sync_xid__gte=since).values_list("object_id", flat=True)
+    )
+    if ids:
+        ids -= set(model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+    return sorted(ids)
+
+
+def _left_components(in_scope, since):
+    """
+    Composants sortis du périmètre depuis le curseur : supprimés, ou modifiés
+    et plus montés sur un aéronef de l'utilisateur (dépose en stock, rebut,
+    autre organisation). Le client ignore les ids qu'il n'a jamais reçus.
+    """
+    moved = Component.objects.filter(sync_xid__gte=since).exclude(pk__in=in_scope.values("pk"))
+    return sorted(set(_deleted_ids(Component, since)) | set(moved.values_list("pk", flat=True)))
+
+
+def pull(user, since: int):
+    """Delta depuis since (0 = tout) : aéronefs, visites, niveaux composants, mes vols."""
+    cursor = current_cursor()
+    aircraft_qs = _aircraft_for(user)
+
+    aircraft = aircraft_qs.filter(sync_xid__gte=since) if since else aircraft_qs
+    rules = VisitRule.objects.filter(aircraft__in=aircraft_qs)
+    logs = FlightLog.objects.filter(pilot=user, aircraft__in=aircraft_qs, is_summary=False)
+    if since:
+        rules = rules.filter(sync_xid__gte=since)
+        logs = logs.filter(sync_xid__gte=since)
+
+    # Niveau d'un composant : change avec le composant lui-même (kardex),
+    # avec les heures de l'aéronef qui le porte (nouveau vol) ou avec celles
+    # de son moteur (journal moteur saisi seul).
+    components = in_scope = Component.objects.filter(installed_aircraft__in=aircraft_qs) | Component.objects.filter(
+        installed_engine__aircraft__in=aircraft_qs
+    )
+    if since:
+        flown = FlightLog.objects.filter(sync_xid__gte=since, aircraft__in=aircraft_qs).values("aircraft_id")
+        run = EngineLog.objects.filter(sync_xid__gte=since).values("engine_id")
+        components = components.filter(sync_xid__gte=since) | components.filter(installed_aircraft__in=flown) | (
+            components.filter(installed_engine__aircraft__in=flown)
+        ) | components.filter(installed_engine__in=run)
+    levels = [
+        {
+            "component": c.id,
+            "aircraft": c.installed_aircraft_id or c.installed_engine.aircraft_id,
+            "engine": c.installed_engine_id,
+            "name": c.name,
+            "level": component_level(c),
+        }
+        for c in components.distinct().select_related("installed_engine")
+    ]
+
+    deleted = {}
+    if since:
+        deleted = {
+            "aircraft": _deleted_ids(Aircraft, since),
+            "visit_rules": _deleted_ids(VisitRule, since),
+            "flight_logs": _deleted_ids(FlightLog, since),
+            "component_levels": _left_components(in_scope, since),
+        }
+
+    return {
+        "cursor": str(cursor),
+        "full": not since,
+        "aircraft": [_aircraft_dict(a) for a in aircraft],
+        "visit_rules": [_visit_rule_dict(r) for r in rules],
+        "component_levels": levels,
+        "flight_logs": [_flight_log_dict(f) for f in logs],
+        "deleted": deleted,
+    }
+
+
+def _pushed_log_id(client_uuid):
+    return SyncClientId.objects.filter(client_uuid=client_uuid).values_list("flight_log_id", flat=True).first()
+
+
+def _push_one(user, aircraft_by_id, item):
+    client_id = item.get("client_id")
+    try:
+        client_uuid = uuid.UUID(str(client_id))
+    except (TypeError, ValueError):
+        return {"client_id": client_id, "status": "error", "errors": {"client_id": ["UUID invalide."]}}
+
+    existing = _pushed_log_id(client_uuid)
+    if existing is not None:
+        return {"client_id": client_id, "status": "duplicate", "id": existing}
+
+    aircraft = aircraft_by_id.get(item.get("aircraft"))
+    if aircraft is None:
+        return {"client_id": client_id, "status": "error", "errors": {"aircraft": ["Aéronef inconnu ou non autorisé."]}}
+
+    form = SyncFlightLogForm(item)
+    if not form.is_valid():
+        return {"client_id": client_id, "status": "error", "errors": form.errors}
+
+    entry = form.save(commit=False)
+    entry.aircraft = aircraft
+    entry.pilot = user
+    entry.client_uuid = client_uuid
+    try:
+        with transaction.atomic():
+            entry.save()
+            mirror_engine_logs(entry, user)
+            # Clé unique hors partitions : un envoi concurrent du même UUID attend
+            # notre commit puis échoue ici, et sa ligne est annulée avec la transaction
+            SyncClientId.objects.create(client_uuid=client_uuid, flight_log_id=entry.id)
+    except IntegrityError:
+        existing = _pushed_log_id(client_uuid)
+        if existing is None:
+            raise
+        return {"client_id": client_id, "status": "duplicate", "id": existing}
+    return {"client_id": client_id, "status": "created", "id": entry.id}
+
+
+def push(user, items):
+    """Crée les lignes de journal poussées ; un résultat par élément, dans l'ordre."""
+    ids = [i.get("aircraft") for i in items if isinstance(i.get("aircraft"), int)]
+    aircraft_by_id = {a.id: a for a in _aircraft_for(user).filter(id__in=ids)}
+    return [_push_one(user, aircraft_by_id, item) for item in items]
@@ -0,0 +1,59 @@
+"""Tâches de fond de la flotte (exécutées par run_jobs, voir jobs.registry)."""
+import heapq
+
+from django.contrib.auth import get_user_model
+
+from jobs.exports import write_csv
+from jobs.registry import task
+
+from .compaction import deserialize
+from .forms import fmt_hhmm
+from .models import Aircraft, FlightLog
+
+
+@task("fleet.export_logbook", label="Export journal de vol (CSV)")
+def export_logbook(job, aircraft_id):
+    """
+    Journal de vol complet d'un aéronef, années compactées comprises (détail
+    relu depuis les archives, à la place des lignes de synthèse).
+    """
+    aircraft = Aircraft.objects.get(pk=aircraft_id)
+    live = (
+        FlightLog.objects.filter(aircraft=aircraft, is_summary=False)
+        .select_related("pilot")
+        .order_by("date", "id")
+    )
+    archived = [
+        deserialize(FlightLog, r)
+        for archive in aircraft.log_archives.order_by("year")
+        for r in archive.records()
+    ]
+    archived.sort(key=lambda f: (f.date, f.id))
+    pilots = dict(
+        get_user_model().objects.filter(pk__in={f.pilot_id for f in archived if f.pilot_id})
+        .values_list("pk", "username")
+    )
+    total = live.count() + len(archived)
+
+    def rows():
+        merged = heapq.merge(
+            ((f, False) for f in archived),
+            ((f, True) for f in live.iterator(chunk_size=2000)),
+            key=lambda item: (item[0].date, item[0].id),
+        )
+        for f, is_live in merged:
+            pilot = (f.pilot.username if f.pilot else "") if is_live else pilots.get(f.pilot_id, "")
+            yield [
+                f.date.isoformat(), f.from_icao, f.to_icao, fmt_hhmm(f.duration_minutes),
+                f.duration_minutes, f.cycles, pilot, f.remarks, "" if is_live else "oui",
+            ]
+
+    n = write_csv(
+        job,
+        f"{aircraft.registration}-journal.csv",
+        ["date", "depart", "arrivee", "duree", "minutes", "cycles", "pilote", "remarques", "archive"],
+        rows(),
+        total=total,
+    )
+    return {"rows": n, "archived_rows": len(archived), "aircraft": aircraft.registration}
+
@@ -0,0 +1,551 @@
+import datetime
+import threading
+import uuid
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import Organization, User
+from kardex.alerting import aircrafts_current_totals, engines_current_totals
+from kardex.models import Component, Engine, EngineLog, EngineLogMonth
+
+from . import compaction, programs, rollups, sync
+from .due import add_calendar_months, complete_visits, next_due, visit_status
+from .forms import fmt_hhmm
+from .models import (
+    AerodromeMovement, Aircraft, FlightLog, FlightLogArchive, FlightLogMonth, RouteMonth, SyncClientId,
+    VisitCompletion, VisitProgram, VisitRule,
+)
+
+TODAY = datetime.date(2026, 3, 15)
+
+
+def _fixtures(target):
+    target.org = Organization.objects.create(name="Aéroclub test")
+    target.aircraft = Aircraft.objects.create(registration="F-TEST", organization=target.org, model="DR400")
+    target.admin = User.objects.create_user("admin-test", password="x", role=User.Roles.ADMIN, organization=target.org)
+
+
+# Cache kardex désactivé : rien n'est commité dans un TestCase, donc pas de NOTIFY d'invalidation
+@override_settings(ALERTING_CACHE_ENABLED=False)
+class FleetTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _fixtures(cls)
+
+    def rule(self, **fields):
+        fields.setdefault("due_at_minutes", 0)
+        fields.setdefault("interval_minutes", 0)
+        return VisitRule.objects.create(aircraft=self.aircraft, name=fields.pop("name", "visite"), **fields)
+
+
+class FmtHhmmTests(TestCase):
+    def test_format(self):
+        self.assertEqual(
+            [fmt_hhmm(v) for v in (0, None, 5, 6005, -195)],
+            ["00:00", "00:00", "00:05", "100:05", "-03:15"],
+        )
+
+
+class VisitDueTests(FleetTestCase):
+    """Heures, cycles, calendrier : critère actif seulement s'il a un intervalle (ou une échéance saisie)."""
+
+    def complete(self, rule, minutes, cycles, date=TODAY):
+        complete_visits({rule.pk: (date, minutes, cycles)})
+        rule.refresh_from_db()
+        return rule
+
+    def test_hours_only(self):
+        rule = self.rule(interval_minutes=3000, due_at_minutes=3000)
+        self.assertEqual(visit_status(rule, 2900, 40, TODAY)["status"], "ok")
+        self.assertEqual(visit_status(rule, 3100, 40, TODAY)["status"], "overdue")
+
+        rule = self.complete(rule, 3100, 5)
+        self.assertEqual((rule.due_at_minutes, rule.due_at_cycles, rule.due_date), (6100, 0, None))
+        evaluation = visit_status(rule, 3160, 6, TODAY)
+        self.assertEqual(evaluation["status"], "ok")
+        self.assertEqual(evaluation["remaining"], [("minutes", 2940)])
+
+    def test_cycles_only(self):
+        rule = self.rule(interval_cycles=100, due_at_cycles=100)
+        self.assertEqual(visit_status(rule, 50000, 99, TODAY)["remaining"], [("cycles", 1)])
+
+        rule = self.complete(rule, 6000, 100)
+        self.assertEqual((rule.due_at_minutes, rule.due_at_cycles, rule.due_date), (0, 200, None))
+        self.assertEqual(visit_status(rule, 6060, 101, TODAY)["status"], "ok")
+        self.assertEqual(visit_status(rule, 6060, 201, TODAY)["status"], "overdue")
+
+    def test_calendar_only(self):
+        rule = self.rule(interval_months=12, due_date=datetime.date(2026, 3, 10))
+        evaluation = visit_status(rule, 1000, 10, TODAY)
+        self.assertEqual(evaluation["status"], "overdue")
+        self.assertEqual(evaluation["limiting"], ("days", -5))
+
+        rule = self.complete(rule, 1000, 10)
+        self.assertEqual((rule.due_at_minutes, rule.due_at_cycles, rule.due_date), (0, 0, datetime.date(2027, 3, 15)))
+        evaluation = visit_status(rule, 1060, 11, TODAY)
+        self.assertEqual(evaluation["status"], "ok")
+        self.assertEqual(evaluation["remaining"], [("days", 365)])
+
+    def test_mixed_first_reached_wins(self):
+        rule = self.rule(
+            interval_minutes=6000, due_at_minutes=6000, interval_months=12, due_date=datetime.date(2026, 3, 15),
+        )
+        self.assertEqual(visit_status(rule, 1000, 10, TODAY)["status"], "due")
+        self.assertEqual(visit_status(rule, 7000, 10, TODAY)["status"], "overdue")
+
+        rule = self.complete(rule, 1000, 10)
+        self.assertEqual((rule.due_at_minutes, rule.due_at_cycles, rule.due_date), (7000, 0, datetime.date(2027, 3, 15)))
+        self.assertEqual(visit_status(rule, 1001, 11, TODAY)["status"], "ok")
+        self.assertEqual(visit_status(rule, 7001, 11, TODAY)["limiting"], ("minutes", -1))
+
+    def test_one_off_due_is_cleared(self):
+        rule = self.rule(due_at_minutes=5000, due_date=datetime.date(2026, 6, 1))
+        self.assertEqual(next_due(rule, 4000, 20, TODAY), (0, 0, None))
+        rule = self.complete(rule, 4000, 20)
+        self.assertEqual(visit_status(rule, 9000, 99, TODAY), {"status": "ok", "remaining": [], "limiting": None})
+
+    def test_month_end_is_clamped(self):
+        rule = self.rule(interval_months=1, due_date=datetime.date(2026, 1, 31))
+        self.assertEqual(next_due(rule, 0, 0, datetime.date(2026, 1, 31))[2], datetime.date(2026, 2, 28))
+
+    def test_completion_recorded(self):
+        rule = self.complete(self.rule(interval_minutes=3000, due_at_minutes=3000), 3010, 12)
+        completion = VisitCompletion.objects.get(rule=rule)
+        self.assertEqual((completion.date, completion.at_minutes, completion.at_cycles), (TODAY, 3010, 12))
+
+
+class BulkCompleteViewTests(FleetTestCase):
+    """Réalisation groupée (/aircraft/visits/complete/) : échéances recalculées par critère."""
+
+    url = "/aircraft/visits/complete/"
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.other = Aircraft.objects.create(registration="F-AUTRE", organization=self.org)
+        FlightLog.objects.create(aircraft=self.aircraft, date=TODAY, duration_minutes=6000, cycles=50)
+        FlightLog.objects.create(aircraft=self.other, date=TODAY, duration_minutes=600, cycles=5)
+        self.hours = self.rule(name="50h", interval_minutes=3000, due_at_minutes=3000)
+        self.cycles = self.rule(name="100 cy", interval_cycles=100, due_at_cycles=40)
+        self.calendar = self.rule(name="annuelle", interval_months=12, due_date=datetime.date(2020, 1, 1))
+        self.mixed = VisitRule.objects.create(
+            aircraft=self.other, name="100h / 12 mois", interval_minutes=6000, due_at_minutes=500,
+            interval_months=12, due_date=datetime.date(2020, 1, 1),
+        )
+
+    def post(self, rows, date="2026-03-15"):
+        data = {"date": date, "remarks": "Campagne"}
+        for rule, fields in rows.items():
+            data[f"r{rule.pk}-selected"] = "on"
+            data.update({f"r{rule.pk}-{k}": v for k, v in fields.items()})
+        return self.client.post(self.url, data)
+
+    def statuses(self):
+        response = self.client.get(self.url)
+        return {row["rule"].pk: row["status"] for row in response.context["rows"]}
+
+    def test_due_values_after_bulk_completion(self):
+        self.assertEqual(set(self.statuses().values()), {"overdue"})
+
+        response = self.post({
+            self.hours: {},
+            self.cycles: {},
+            self.calendar: {"date": "2026-02-10"},
+            self.mixed: {"minutes_done_total": "9:00", "cycles_done_total": "4"},
+        })
+        self.assertEqual(response.status_code, 302)
+        for rule in (self.hours, self.cycles, self.calendar, self.mixed):
+            rule.refresh_from_db()
+
+        self.assertEqual((self.hours.due_at_minutes, self.hours.due_at_cycles, self.hours.due_date), (9000, 0, None))
+        self.assertEqual((self.cycles.due_at_minutes, self.cycles.due_at_cycles, self.cycles.due_date), (0, 150, None))
+        self.assertEqual(
+            (self.calendar.due_at_minutes, self.calendar.due_at_cycles, self.calendar.due_date),
+            (0, 0, datetime.date(2027, 2, 10)),
+        )
+        self.assertEqual(
+            (self.mixed.due_at_minutes, self.mixed.due_at_cycles, self.mixed.due_date),
+            (540 + 6000, 0, add_calendar_months(TODAY, 12)),
+        )
+        completions = VisitCompletion.objects.filter(remarks="Campagne")
+        self.assertEqual(
+            sorted(completions.values_list("rule_id", "date", "at_minutes", "at_cycles")),
+            sorted([
+                (self.hours.pk, TODAY, 6000, 50),
+                (self.cycles.pk, TODAY, 6000, 50),
+                (self.calendar.pk, datetime.date(2026, 2, 10), 6000, 50),
+                (self.mixed.pk, TODAY, 540, 4),
+            ]),
+        )
+
+        # Un vol de plus ne rend aucune visite dépassée (critères sans intervalle soldés)
+        FlightLog.objects.create(aircraft=self.aircraft, date=TODAY, duration_minutes=60, cycles=1)
+        FlightLog.objects.create(aircraft=self.other, date=TODAY, duration_minutes=60, cycles=1)
+        self.assertEqual(set(self.statuses().values()), {"ok"})
+
+    def test_invalid_row_writes_nothing(self):
+        response = self.post({self.hours: {}, self.cycles: {"minutes_done_total": "12h"}})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(VisitCompletion.objects.exists())
+        self.hours.refresh_from_db()
+        self.assertEqual(self.hours.due_at_minutes, 3000)
+
+    def test_unchecked_and_foreign_rules_are_ignored(self):
+        foreign_org = Organization.objects.create(name="Autre club")
+        foreign = VisitRule.objects.create(
+            aircraft=Aircraft.objects.create(registration="F-EXT", organization=foreign_org),
+            name="50h", interval_minutes=3000, due_at_minutes=3000,
+        )
+        self.post({self.hours: {}, foreign: {}})
+        self.assertEqual(list(VisitCompletion.objects.values_list("rule_id", flat=True)), [self.hours.pk])
+
+    def test_pilot_is_refused(self):
+        pilot = User.objects.create_user("pilote-test", role=User.Roles.PILOT, organization=self.org)
+        self.client.force_login(pilot)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class VisitCompleteViewTests(FleetTestCase):
+    def setUp(self):
+        self.client.force_login(self.admin)
+        FlightLog.objects.create(aircraft=self.aircraft, date=TODAY, duration_minutes=600, cycles=10)
+
+    def test_preview_of_cycles_only_rule_has_no_hours(self):
+        rule = self.rule(interval_cycles=100, due_at_cycles=100)
+        response = self.client.get(f"/aircraft/visits/{rule.pk}/complete/")
+        self.assertEqual((response.context["next_due_hhmm"], response.context["next_due_date"]), ("", None))
+
+    def test_preview_of_mixed_rule(self):
+        rule = self.rule(interval_minutes=3000, due_at_minutes=3000, interval_months=12, due_date=TODAY)
+        response = self.client.get(f"/aircraft/visits/{rule.pk}/complete/")
+        self.assertEqual(response.context["next_due_hhmm"], "60:00")
+        self.assertEqual(response.context["next_due_date"], add_calendar_months(timezone.localdate(), 12))
+
+    def test_post_clears_criteria_without_interval(self):
+        rule = self.rule(interval_minutes=3000, due_at_minutes=3000)
+        response = self.client.post(
+            f"/aircraft/visits/{rule.pk}/complete/", {"date": "2026-03-15", "minutes_done_total": "10:00", "cycles_done_total": "10"},
+        )
+        self.assertEqual(response.status_code, 302)
+        rule.refresh_from_db()
+        self.assertEqual((rule.due_at_minutes, rule.due_at_cycles, rule.due_date), (3600, 0, None))
+
+
+class LogsPanelTests(FleetTestCase):
+    def setUp(self):
+        self.client.force_login(self.admin)
+        FlightLog.objects.create(aircraft=self.aircraft, date=datetime.date(2025, 6, 1), duration_minutes=60)
+
+    def panel(self, year):
+        return self.client.get(f"/aircraft/{self.aircraft.pk}/panel/logs/", {"year": year})
+
+    def test_year_selects_rows(self):
+        response = self.panel("2025")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["log_year"], 2025)
+        self.assertEqual(len(response.context["logs"]), 1)
+
+    def test_out_of_range_year_falls_back_to_latest(self):
+        for year in ("10000", "9999", "0", "-5", "abc"):
+            response = self.panel(year)
+            self.assertEqual(response.status_code, 200, year)
+            self.assertEqual(response.context["log_year"], 2025, year)
+
+
+class AerodromeReportTests(FleetTestCase):
+    def test_out_of_range_year_falls_back_to_current(self):
+        self.client.force_login(self.admin)
+        for year in ("0", "99999", "-1", "abc"):
+            response = self.client.get("/aircraft/aerodromes/", {"year": year})
+            self.assertEqual(response.status_code, 200, year)
+            self.assertEqual(response.context["year"], timezone.localdate().year, year)
+
+
+class ProgramTests(FleetTestCase):
+    """Programmes : un critère qui apparaît sur une règle existante part des totaux actuels, comme à la création."""
+
+    def setUp(self):
+        FlightLog.objects.create(aircraft=self.aircraft, date=TODAY, duration_minutes=6000, cycles=50)
+        self.program = VisitProgram.objects.create(name="DR400", organization=self.org)
+
+    def item(self, **fields):
+        return self.program.items.create(name=fields.pop("name", "50h"), **fields)
+
+    def due(self, rule):
+        rule.refresh_from_db()
+        return rule.due_at_minutes, rule.due_at_cycles, rule.due_date
+
+    def test_apply_creates_and_links(self):
+        item = self.item(interval_minutes=3000)
+        self.item(name="annuelle", interval_months=12)
+        running = self.rule(name="50h", interval_minutes=3000, due_at_minutes=7000)
+        calendar_only = self.rule(name="annuelle", due_date=datetime.date(2026, 6, 1))
+
+        self.assertEqual(programs.apply(self.program, [self.aircraft], today=TODAY), (0, 2))
+        self.assertEqual(self.due(running), (7000, 0, None))  # échéance en cours conservée
+        self.assertEqual(running.program_item, item)
+        self.assertEqual(self.due(calendar_only), (0, 0, datetime.date(2026, 6, 1)))
+
+        other = Aircraft.objects.create(registration="F-AUTRE", organization=self.org)
+        self.assertEqual(programs.apply(self.program, [self.aircraft, other], today=TODAY), (2, 2))
+        self.assertEqual(
+            [self.due(r) for r in other.visit_rules.order_by("name")],
+            [(3000, 0, None), (0, 0, datetime.date(2027, 3, 15))],
+        )
+
+    def test_apply_opens_criterion_on_linked_rule(self):
+        self.item(interval_minutes=3000, interval_months=12)
+        rule = self.rule(name="50h", interval_cycles=100, due_at_cycles=80)
+        programs.apply(self.program, [self.aircraft], today=TODAY)
+        # heures et calendrier apparaissent, cycles retirés par le programme
+        self.assertEqual(self.due(rule), (9000, 0, datetime.date(2027, 3, 15)))
+        self.assertEqual(visit_status(rule, 6000, 50, TODAY)["status"], "ok")
+
+    def test_propagate_interval_changes(self):
+        item = self.item(interval_months=12)
+        programs.apply(self.program, [self.aircraft], today=TODAY)
+        rule = self.aircraft.visit_rules.get()
+        self.assertEqual(self.due(rule), (0, 0, datetime.date(2027, 3, 15)))
+
+        item.interval_minutes = 3000
+        item.save()
+        self.assertEqual(programs.propagate(item, today=TODAY), 1)
+        self.assertEqual(self.due(rule), (9000, 0, datetime.date(2027, 3, 15)))
+        self.assertEqual(visit_status(rule, 6000, 50, TODAY)["status"], "ok")
+        self.assertEqual(programs.propagate(item, today=TODAY), 0)
+
+        item.interval_months = 0
+        item.interval_cycles = 100
+        item.save()
+        programs.propagate(item, today=TODAY)
+        self.assertEqual(self.due(rule), (9000, 150, None))
+        self.assertEqual((rule.interval_minutes, rule.interval_cycles, rule.interval_months), (3000, 100, 0))
+
+    def test_propagate_rename_collision(self):
+        item = self.item(interval_minutes=3000)
+        programs.apply(self.program, [self.aircraft], today=TODAY)
+        self.rule(name="100h", interval_minutes=6000, due_at_minutes=6000)
+        item.name = "100h"
+        item.save()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            programs.propagate(item, today=TODAY)
+        self.assertEqual(self.aircraft.visit_rules.get(program_item=item).name, "50h")
+
+
+class CompactionTests(FleetTestCase):
+    """Compactage puis restauration d'une année : totaux, cumuls et mouvements inchangés."""
+
+    FLIGHTS = [
+        (datetime.date(2020, 3, 2), "LFPN", "LFPT", 60, 1),
+        (datetime.date(2020, 3, 20), "LFPT", "LFPN", 75, 1),
+        (datetime.date(2020, 7, 14), "LFPN", "LFPN", 45, 6),
+        (datetime.date(2024, 5, 1), "LFPN", "LFPT", 50, 1),
+    ]
+
+    def setUp(self):
+        self.engine = Engine.objects.create(aircraft=self.aircraft, name="Moteur")
+        for date, dep, arr, minutes, cycles in self.FLIGHTS:
+            FlightLog.objects.create(
+                aircraft=self.aircraft, date=date, from_icao=dep, to_icao=arr, duration_minutes=minutes, cycles=cycles,
+            )
+            EngineLog.objects.create(engine=self.engine, date=date, duration_minutes=minutes, cycles=cycles)
+
+    def state(self):
+        return {
+            "totals": (
+                aircrafts_current_totals([self.aircraft])[self.aircraft.pk],
+                engines_current_totals([self.engine])[self.engine.pk],
+            ),
+            "flight_months": list(FlightLogMonth.objects.values_list("month", "minutes", "cycles", "entries")),
+            "engine_months": list(EngineLogMonth.objects.values_list("month", "minutes", "cycles", "entries")),
+            "movements": sorted(AerodromeMovement.objects.values_list(
+                "aerodrome__code", "month", "departures", "arrivals", "landings",
+            )),
+            "routes": sorted(RouteMonth.objects.values_list("origin__code", "destination__code", "month", "flights", "minutes")),
+        }
+
+    def detail(self, model, **owner):
+        # Hors sync_xid : une ligne restaurée est réécrite, donc renvoyée aux tablettes.
+        # Horodatages à la milliseconde : précision du JSON des archives (DjangoJSONEncoder)
+        fields = [f.attname for f in model._meta.concrete_fields if f.attname != "sync_xid"]
+        rows = list(model.objects.filter(**owner, is_summary=False).order_by("id").values(*fields))
+        for row in rows:
+            for name in ("created_at", "updated_at"):
+                if name in row:
+                    row[name] = row[name].replace(microsecond=row[name].microsecond // 1000 * 1000)
+        return rows
+
+    def test_compact_then_restore(self):
+        before = self.state()
+        flights = self.detail(FlightLog, aircraft=self.aircraft)
+        engine_rows = self.detail(EngineLog, engine=self.engine)
+
+        self.assertEqual(compaction.compact_year(compaction.FLIGHT, self.aircraft, 2020), 3)
+        self.assertEqual(compaction.compact_year(compaction.ENGINE, self.engine, 2020), 3)
+        self.assertEqual(self.state(), before)
+        summary = FlightLog.objects.get(aircraft=self.aircraft, is_summary=True)
+        self.assertEqual((summary.date, summary.duration_minutes, summary.cycles), (datetime.date(2020, 12, 31), 180, 8))
+        self.assertEqual(FlightLog.objects.filter(aircraft=self.aircraft, is_summary=False).count(), 1)
+        # Les cumuls tenus par trigger valent ceux recalculés depuis le journal et les archives
+        for kind, owner in ((rollups.FLIGHT, self.aircraft), (rollups.ENGINE, self.engine)):
+            stored = {r.month: [r.minutes, r.cycles, r.entries] for r in kind.rollup_model.objects.all()}
+            self.assertEqual(stored, rollups._computed(kind, owner.pk))
+
+        self.assertEqual(compaction.restore_year(compaction.FLIGHT, self.aircraft, 2020), 3)
+        self.assertEqual(compaction.restore_year(compaction.ENGINE, self.engine, 2020), 3)
+        self.assertEqual(self.state(), before)
+        self.assertEqual(self.detail(FlightLog, aircraft=self.aircraft), flights)
+        self.assertEqual(self.detail(EngineLog, engine=self.engine), engine_rows)
+        self.assertFalse(FlightLog.objects.filter(is_summary=True).exists())
+        self.assertFalse(FlightLogArchive.objects.exists())
+
+    def test_late_rows_merge_into_archive(self):
+        compaction.compact_year(compaction.FLIGHT, self.aircraft, 2020)
+        FlightLog.objects.create(aircraft=self.aircraft, date=datetime.date(2020, 11, 5), duration_minutes=30, cycles=1)
+        before = self.state()
+
+        self.assertEqual(compaction.compact_year(compaction.FLIGHT, self.aircraft, 2020), 1)
+        archive = FlightLogArchive.objects.get(aircraft=self.aircraft, year=2020)
+        self.assertEqual((archive.row_count, archive.total_minutes), (4, 210))
+        self.assertEqual(FlightLog.objects.filter(aircraft=self.aircraft, is_summary=True).count(), 1)
+        self.assertEqual(self.state(), before)
+
+    def test_large_cycle_count_is_split(self):
+        FlightLog.objects.create(
+            aircraft=self.aircraft, date=datetime.date(2020, 8, 1), duration_minutes=10, cycles=compaction.MAX_SUMMARY_CYCLES,
+        )
+        before = self.state()
+        compaction.compact_year(compaction.FLIGHT, self.aircraft, 2020)
+        summaries = list(FlightLog.objects.filter(is_summary=True).values_list("duration_minutes", "cycles"))
+        self.assertEqual(sorted(summaries), [(0, 8), (190, compaction.MAX_SUMMARY_CYCLES)])
+        self.assertEqual(self.state(), before)
+
+
+@override_settings(ALERTING_CACHE_ENABLED=False)
+class SyncTests(TransactionTestCase):
+    """Curseur = transaction : chaque écriture doit être commitée (pas de TestCase)."""
+
+    def setUp(self):
+        _fixtures(self)
+        self.pilot = User.objects.create_user("pilote-test", role=User.Roles.PILOT, organization=self.org)
+        self.engine = Engine.objects.create(aircraft=self.aircraft, name="Moteur")
+        self.cell_part = Component.objects.create(
+            name="Train", installed_aircraft=self.aircraft, status=Component.Status.INSTALLED,
+        )
+        self.engine_part = Component.objects.create(
+            name="Magnéto", installed_engine=self.engine, status=Component.Status.INSTALLED,
+        )
+        self.cursor = int(sync.pull(self.pilot, 0)["cursor"])
+
+    def delta(self):
+        return sync.pull(self.pilot, self.cursor)
+
+    def level_ids(self, payload):
+        return {level["component"] for level in payload["component_levels"]}
+
+    def test_full_pull(self):
+        payload = sync.pull(self.pilot, 0)
+        self.assertTrue(payload["full"])
+        self.assertEqual([a["id"] for a in payload["aircraft"]], [self.aircraft.pk])
+        self.assertEqual(self.level_ids(payload), {self.cell_part.pk, self.engine_part.pk})
+
+    def test_empty_delta(self):
+        payload = self.delta()
+        self.assertFalse(payload["full"])
+        self.assertEqual((payload["aircraft"], payload["component_levels"], payload["flight_logs"]), ([], [], []))
+
+    def test_flight_log_in_delta(self):
+        log = FlightLog.objects.create(aircraft=self.aircraft, pilot=self.pilot, date=TODAY, duration_minutes=60)
+        payload = self.delta()
+        self.assertEqual([f["id"] for f in payload["flight_logs"]], [log.pk])
+        self.assertEqual(self.level_ids(payload), {self.cell_part.pk, self.engine_part.pk})
+
+        log_id = log.pk
+        log.delete()
+        self.assertEqual(self.delta()["deleted"]["flight_logs"], [log_id])
+
+    def test_engine_log_alone_moves_engine_components(self):
+        EngineLog.objects.create(engine=self.engine, date=TODAY, duration_minutes=30)
+        self.assertEqual(self.level_ids(self.delta()), {self.engine_part.pk})
+
+    def test_component_leaving_scope_is_deleted(self):
+        foreign = Component.objects.create(name="Radio")
+        self.cell_part.installed_aircraft = None
+        self.cell_part.status = Component.Status.STOCK
+        self.cell_part.save()
+        engine_part_id = self.engine_part.pk
+        self.engine_part.delete()
+
+        payload = self.delta()
+        self.assertEqual(payload["component_levels"], [])
+        self.assertEqual(payload["deleted"]["component_levels"], sorted([self.cell_part.pk, engine_part_id, foreign.pk]))
+
+        # Remonté : de nouveau dans les niveaux, plus dans les suppressions
+        self.cursor = int(payload["cursor"])
+        self.cell_part.installed_aircraft = self.aircraft
+        self.cell_part.save()
+        payload = self.delta()
+        self.assertEqual(self.level_ids(payload), {self.cell_part.pk})
+        self.assertEqual(payload["deleted"]["component_levels"], [])
+
+    def test_visit_rule_in_delta(self):
+        rule = VisitRule.objects.create(aircraft=self.aircraft, name="50h", interval_minutes=3000, due_at_minutes=3000)
+        self.assertEqual([r["id"] for r in self.delta()["visit_rules"]], [rule.pk])
+
+    def item(self, client_id, **fields):
+        return {
+            "client_id": str(client_id), "aircraft": self.aircraft.pk,
+            "date": "2026-03-15", "duration_minutes": 45, "cycles": 1, **fields,
+        }
+
+    def test_push_then_resend(self):
+        client_id = uuid.uuid4()
+        first, = sync.push(self.pilot, [self.item(client_id)])
+        self.assertEqual(first["status"], "created")
+        self.assertEqual(EngineLog.objects.filter(engine=self.engine).count(), 1)
+
+        # Renvoi du lot, y compris avec une date corrigée entre-temps sur la tablette
+        again, moved = sync.push(self.pilot, [self.item(client_id), self.item(client_id, date="2025-12-31")])
+        self.assertEqual((again["status"], again["id"]), ("duplicate", first["id"]))
+        self.assertEqual((moved["status"], moved["id"]), ("duplicate", first["id"]))
+        self.assertEqual(FlightLog.objects.filter(client_uuid=client_id).count(), 1)
+
+        pulled = self.delta()["flight_logs"]
+        self.assertEqual([(f["id"], f["client_id"]) for f in pulled], [(first["id"], client_id)])
+
+    def test_push_errors(self):
+        other = Aircraft.objects.create(registration="F-AUTRE", organization=Organization.objects.create(name="Autre"))
+        results = sync.push(self.pilot, [
+            self.item("pas-un-uuid"),
+            self.item(uuid.uuid4(), aircraft=other.pk),
+            self.item(uuid.uuid4(), duration_minutes=0),
+        ])
+        self.assertEqual([r["status"] for r in results], ["error"] * 3)
+        self.assertEqual(set(results[0]["errors"]), {"client_id"})
+        self.assertEqual(set(results[1]["errors"]), {"aircraft"})
+        self.assertEqual(set(results[2]["errors"]), {"duration_minutes"})
+        self.assertFalse(FlightLog.objects.exists())
+
+    def test_concurrent_push_same_uuid_different_dates(self):
+        client_id = uuid.uuid4()
+        barrier = threading.Barrier(2)
+        results = []
+
+        def push(date):
+            try:
+                barrier.wait()
+                results.extend(sync.push(self.pilot, [self.item(client_id, date=date)]))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=push, args=(d,)) for d in ("2026-03-15", "2025-06-01")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sorted(r["status"] for r in results), ["created", "duplicate"])
+        self.assertEqual(len({r["id"] for r in results}), 1)
+        self.assertEqual(FlightLog.objects.filter(client_uuid=client_id).count(), 1)
+        self.assertEqual(SyncClientId.objects.get(client_uuid=client_id).flight_log_id, results[0]["id"])
@@ -3,15 +3,33 @@ from . import views
 
 urlpatterns = [
     path("", views.aircraft_list, name="aircraft_list"),
+    path("live/", views.aircraft_live, name="aircraft_live"),
     path("create/", views.aircraft_create, name="aircraft_create"),
+    path("utilization/", views.utilization, name="fleet_utilization"),
+    path("utilization/data/", views.utilization_data, name="fleet_utilization_data"),
+    path("aerodromes/", views.aerodrome_report, name="aerodrome_report"),
+    path("due/", views.due_report, name="fleet_due"),
     path("<int:pk>/", views.aircraft_detail, name="aircraft_detail"),
     path("<int:pk>/edit/", views.aircraft_edit, name="aircraft_edit"),
+    path("<int:pk>/panel/<str:panel>/", views.aircraft_panel, name="aircraft_panel"),
 
     # Journal de vol
     path("<int:pk>/log/add/", views.flightlog_add, name="flightlog_add"),
+    path("<int:pk>/log/archive/<int:year>/", views.flightlog_archive_download, name="flightlog_archive_download"),
+    path("<int:pk>/log/export/", views.flightlog_export, name="flightlog_export"),
+
+    # Synchronisation hors-ligne (tablettes pilotes)
+    path("sync/", views.sync, name="fleet_sync"),
 
     # Visites (règles + complétion)
     path("<int:aircraft_pk>/visits/create/", views.visitrule_create, name="visitrule_create"),
     path("visits/<int:rule_id>/edit/", views.visitrule_edit, name="visitrule_edit"),
     path("visits/<int:rule_id>/complete/", views.visitrule_complete, name="visitrule_complete"),
+    path("visits/complete/", views.visit_bulk_complete, name="visit_bulk_complete"),
+
+    # Programmes d'entretien types
+    path("programs/", views.program_list, name="program_list"),
+    path("programs/<int:pk>/", views.program_detail, name="program_detail"),
+    path("programs/<int:pk>/apply/", views.program_apply, name="program_apply"),
+    path("programs/items/<int:item_id>/edit/", views.program_item_edit, name="program_item_edit"),
 ]
\ No newline at end of file
@@ -1,17 +1,41 @@
+import csv
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.utils import timezone
-from django.db import IntegrityError
-from django.db.models import Sum
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractYear
 from django.views.decorators.http import require_POST
 
-from .models import Aircraft, FlightLog, VisitRule, VisitCompletion
-from .forms import AircraftForm, FlightLogForm, VisitRuleForm, VisitCompleteForm
-
-from kardex.alerting import component_level, aggregate_levels
-from kardex.models import EngineLog
+from . import live
+from . import movements
+from . import programs
+from . import rollups
+from . import sync as delta_sync
+from .compaction import deserialize
+from .due import complete_visits, components_due_by, fmt_remaining, next_due, visit_status, visits_due_by
+from .logbook import mirror_engine_logs
+from .models import Aerodrome, Aircraft, FlightLog, VisitProgram, VisitProgramItem, VisitRule
+from .forms import (
+    AircraftForm, FlightLogForm, VisitBulkCompleteForm, VisitBulkRowForm, VisitCompleteForm, VisitProgramForm,
+    VisitProgramItemForm, VisitRuleForm, fmt_hhmm,
+)
+
+from idempotency.decorators import idempotent, mark_succeeded, new_key, wants_json
+from jobs.registry import enqueue
+from kardex.alerting import (
+    aircraft_current_totals, aircrafts_current_totals, aggregate_levels, component_level, engine_level, engine_remaining,
+    engines_current_totals,
+)
+from kardex.forms import EngineLogForm
+from kardex.models import Engine
+from monitoring.budgets import query_budget
 
 
 def _is_admin_or_super(user):
@@ -26,52 +50,231 @@ def _same_org_or_super(user, org_id):
     return user.is_authenticated and (user.role == user.Roles.SUPERADMIN or user.organization_id == org_id)
 
 
-def _current_totals(aircraft: Aircraft):
-    agg = aircraft.logs.aggregate(mins=Sum("duration_minutes"), cyc=Sum("cycles"))
-    log_minutes = agg["mins"] or 0
-    log_cycles = agg["cyc"] or 0
-    total_minutes = aircraft.initial_minutes + log_minutes
-    total_cycles = aircraft.initial_cycles + log_cycles
-    return total_minutes, total_cycles
+# Bornes de ?year= : _year_bounds lit le 1er janvier suivant (datetime.date va jusqu'à 9999)
+YEAR_MIN, YEAR_MAX = 1, 9998
 
 
-def _engine_current_totals(engine):
-    agg = engine.logs.aggregate(mins=Sum("duration_minutes"), cyc=Sum("cycles"))
-    log_minutes = agg["mins"] or 0
-    log_cycles = agg["cyc"] or 0
-    total_minutes = int(engine.initial_minutes or 0) + log_minutes
-    total_cycles = int(engine.initial_cycles or 0) + log_cycles
-    return total_minutes, total_cycles
+def _parse_year(value, default):
+    """Année lue dans ?year= ; default si absente, invalide ou hors [YEAR_MIN, YEAR_MAX]."""
+    try:
+        year = int(value)
+    except (TypeError, ValueError):
+        return default
+    return year if YEAR_MIN <= year <= YEAR_MAX else default
 
 
-def _fmt_hhmm(minutes: int) -> str:
-    minutes = int(minutes or 0)
-    sign = "-" if minutes < 0 else ""
-    minutes = abs(minutes)
-    return f"{sign}{minutes // 60:02d}:{minutes % 60:02d}"
+def _year_bounds(year: int):
+    """[1er janvier, 1er janvier suivant) : bornes littérales => une seule partition lue."""
+    return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
 
 
 @login_required
+@query_budget(queries=20, duplicates=3)
 def aircraft_list(request):
-    if request.user.role == request.user.Roles.SUPERADMIN:
-        qs = Aircraft.objects.select_related("organization", "owner_user").prefetch_related(
-            "installed_components", "engines", "engines__installed_components"
-        ).all()
+    aircraft = list(live.aircraft_queryset(request.user))
+    tiles = live.tiles(aircraft)
+    for a in aircraft:
+        a.tile = tiles[a.pk]
+
+    return render(request, "aircraft/list.html", {"aircraft": aircraft})
+
+
+@login_required
+def aircraft_live(request):
+    """
+    Flux SSE du tableau de bord (fleet.live) : tuiles modifiées seulement.
+    Une connexion ouverte par écran : servir avec des workers à threads
+    (gunicorn --worker-class gthread) pour ne pas bloquer un process par écran.
+    """
+    response = StreamingHttpResponse(live.event_stream(request.user), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx : pas de mise en tampon
+    return response
+
+
+def _utilization_scope(user):
+    qs = Aircraft.objects.all()
+    if user.role != user.Roles.SUPERADMIN:
+        qs = qs.filter(organization_id=user.organization_id)
+    return qs
+
+
+def _usage_series(label, kind, owner_id, months, rolling):
+    return {
+        "label": label,
+        "kind": kind,
+        "id": owner_id,
+        "minutes": [m["minutes"] for m in months],
+        "cycles": [m["cycles"] for m in months],
+        "entries": [m["entries"] for m in months],
+        "rolling": {str(days): v for days, v in rolling.items()},
+    }
+
+
+def _sum_rolling(per_owner):
+    total = {days: {"minutes": 0, "cycles": 0} for days in rollups.WINDOWS}
+    for windows in per_owner.values():
+        for days, v in windows.items():
+            total[days]["minutes"] += v["minutes"]
+            total[days]["cycles"] += v["cycles"]
+    return total
+
+
+@login_required
+def utilization(request):
+    """Graphique d'utilisation mensuelle (flotte ou aéronef) : données via utilization_data."""
+    aircraft = list(_utilization_scope(request.user).values("id", "registration"))
+    return render(request, "aircraft/utilization.html", {
+        "aircraft": aircraft,
+        "selected": request.GET.get("aircraft", ""),
+        "months": request.GET.get("months", ""),
+    })
+
+
+@login_required
+@query_budget(queries=15)
+def utilization_data(request):
+    """
+    JSON des cumuls mensuels (fleet.rollups) sur ?months= mois (120 par défaut) :
+    flotte de l'organisation, ou ?aircraft=<id> et ses moteurs. Jamais de lecture
+    du journal détaillé, hors mois entamé des cumuls glissants.
+    """
+    try:
+        count = min(max(int(request.GET.get("months", 120)), 1), 240)
+    except ValueError:
+        count = 120
+    today = timezone.localdate()
+    last = rollups.month_start(today)
+    first = rollups.add_months(last, -(count - 1))
+    scope = _utilization_scope(request.user)
+
+    aircraft_id = request.GET.get("aircraft")
+    if aircraft_id:
+        if not aircraft_id.isdigit():
+            raise Http404()
+        obj = get_object_or_404(Aircraft, pk=aircraft_id)
+        if not _same_org_or_super(request.user, obj.organization_id):
+            return HttpResponseForbidden("Accès refusé.")
+        engines = list(Engine.objects.filter(aircraft=obj).order_by("id"))
+        engine_ids = [e.pk for e in engines]
+        flight_rolling = rollups.rolling(rollups.FLIGHT, [obj.pk], today)
+        engine_rolling = rollups.rolling(rollups.ENGINE, engine_ids, today) if engines else {}
+        series = [_usage_series(
+            obj.registration, "aircraft", obj.pk,
+            rollups.monthly(rollups.FLIGHT, [obj.pk], first, last), flight_rolling[obj.pk],
+        )]
+        engine_months = rollups.monthly_per_owner(rollups.ENGINE, engine_ids, first, last)
+        for e in engines:
+            series.append(_usage_series(
+                f"{e.name or 'Moteur'} ({e.serial_number or 'SN ?'})", "engine", e.pk,
+                engine_months[e.pk], engine_rolling[e.pk],
+            ))
+        breakdown = []
     else:
-        qs = Aircraft.objects.select_related("organization", "owner_user").prefetch_related(
-            "installed_components", "engines", "engines__installed_components"
-        ).filter(organization=request.user.organization)
+        ids = list(scope.order_by("registration").values_list("pk", "registration"))
+        per_aircraft = rollups.rolling(rollups.FLIGHT, [pk for pk, _r in ids], today) if ids else {}
+        series = [_usage_series(
+            "Flotte", "fleet", None,
+            rollups.monthly(rollups.FLIGHT, scope.values("pk"), first, last), _sum_rolling(per_aircraft),
+        )]
+        breakdown = [
+            {"id": pk, "registration": reg, "rolling": {str(d): v for d, v in per_aircraft[pk].items()}}
+            for pk, reg in ids
+        ]
+
+    return JsonResponse({
+        "months": [m.strftime("%Y-%m") for m in rollups.month_range(first, last)],
+        "windows": list(rollups.WINDOWS),
+        "series": series,
+        "aircraft": breakdown,
+    })
 
-    for a in qs:
-        levels = []
-        for c in a.installed_components.all():
-            levels.append(component_level(c))
-        for e in a.engines.all():
-            for c in e.installed_components.all():
-                levels.append(component_level(c))
-        a.kardex_level = aggregate_levels(levels)
 
-    return render(request, "aircraft/list.html", {"aircraft": qs})
+@login_required
+@query_budget(queries=12)
+def aerodrome_report(request):
+    """
+    Mouvements par terrain, liaisons les plus volées et atterrissages par mois
+    sur un terrain (redevances ; ?format=csv), pour une année civile. Lit
+    uniquement l'index des mouvements (fleet.movements).
+    """
+    today = timezone.localdate()
+    year = _parse_year(request.GET.get("year"), today.year)
+    first, last = datetime.date(year, 1, 1), datetime.date(year, 12, 1)
+
+    scope = _utilization_scope(request.user)
+    aircraft = list(scope.values("id", "registration"))
+    selected = request.GET.get("aircraft", "")
+    if selected.isdigit() and any(a["id"] == int(selected) for a in aircraft):
+        aircraft_ids = [int(selected)]
+    else:
+        selected = ""
+        aircraft_ids = scope.values("pk")
+
+    code = movements.normalize_code(request.GET.get("aerodrome"))
+    aerodrome = Aerodrome.objects.filter(code=code).first() if code else None
+    landings = movements.landings_by_month(aircraft_ids, aerodrome, first, last) if aerodrome else []
+    months = rollups.month_range(first, last)
+
+    if aerodrome and request.GET.get("format") == "csv":
+        response = HttpResponse(content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="atterrissages-{aerodrome.code}-{year}.csv"'
+        response.write("\ufeff")  # BOM : ouverture directe dans Excel (locale FR)
+        writer = csv.writer(response, delimiter=";")
+        writer.writerow(["Aéronef", "Mois", "Arrivées", "Atterrissages"])
+        for row in landings:
+            for m, (arrivals, count) in row["months"].items():
+                writer.writerow([row["registration"], m.strftime("%Y-%m"), arrivals, count])
+        return response
+
+    for row in landings:
+        row["cells"] = [row["months"].get(m, (0, 0))[1] for m in months]
+        row["total"] = sum(row["cells"])
+
+    return render(request, "aircraft/aerodromes.html", {
+        "year": year,
+        "years": range(today.year, today.year - 10, -1),
+        "aircraft": aircraft,
+        "selected": selected,
+        "totals": movements.aerodrome_totals(aircraft_ids, first, last),
+        "routes": movements.top_routes(aircraft_ids, first, last),
+        "aerodrome": aerodrome,
+        "code": code,
+        "months": months,
+        "landings": landings,
+    })
+
+
+@login_required
+@query_budget(queries=8)
+def due_report(request):
+    """
+    Échéancier calendaire de la flotte : visites et composants à échéance dans
+    les ?days prochains jours (30 par défaut), dépassés compris. Deux parcours
+    d'intervalle sur les index de date (fleet.due).
+    """
+    today = timezone.localdate()
+    try:
+        days = min(max(int(request.GET.get("days", 30)), 1), 3650)
+    except ValueError:
+        days = 30
+    horizon = today + datetime.timedelta(days=days)
+    scope = _utilization_scope(request.user).values("pk")
+
+    visits = [
+        {"rule": r, "days": (r.due_date - today).days, "late": (today - r.due_date).days}
+        for r in visits_due_by(scope, horizon)
+    ]
+    components = [
+        {"obj": c, "days": (c.limit_date - today).days, "late": (today - c.limit_date).days}
+        for c in components_due_by(scope, horizon)
+    ]
+    return render(request, "aircraft/due.html", {
+        "days": days,
+        "horizon": horizon,
+        "visits": visits,
+        "components": components,
+    })
 
 
 @login_required
@@ -118,98 +321,224 @@ def aircraft_edit(request, pk: int):
     return render(request, "aircraft/form.html", {"form": form, "mode": "edit", "obj": obj})
 
 
-@login_required
-def aircraft_detail(request, pk: int):
-    obj = get_object_or_404(Aircraft, pk=pk)
-    if request.user.role != request.user.Roles.SUPERADMIN and obj.organization_id != request.user.organization_id:
-        return HttpResponseForbidden("Accès refusé.")
+def _archived_logs(aircraft, year):
+    """Lignes d'une année compactée, relues depuis l'archive (pilotes chargés en une requête)."""
+    archive = aircraft.log_archives.filter(year=year).first()
+    if archive is None:
+        return []
+    rows = [deserialize(FlightLog, r) for r in archive.records()]
+    pilots = get_user_model().objects.in_bulk({r.pilot_id for r in rows if r.pilot_id})
+    for r in rows:
+        r.pilot = pilots.get(r.pilot_id)
+    return rows
+
+
+def _totals_panel(obj):
+    total_minutes, total_cycles = aircraft_current_totals(obj)
+    return {
+        "total_minutes": total_minutes,
+        "total_hhmm": fmt_hhmm(total_minutes),
+        "total_cycles": total_cycles,
+        "base_hhmm": fmt_hhmm(obj.initial_minutes),
+        "log_hhmm": fmt_hhmm(total_minutes - obj.initial_minutes),
+        "log_cycles": (total_cycles - obj.initial_cycles),
+    }
 
-    total_minutes, total_cycles = _current_totals(obj)
 
+def _logs_panel(obj, year_param):
+    # Bilan par année (index-only) + lignes de l'année affichée seulement.
+    # Années compactées : n = vols archivés + vols saisis depuis.
+    archived = dict(obj.log_archives.values_list("year", "row_count"))
+    log_years = []
+    for y in (
+        obj.logs.annotate(year=ExtractYear("date")).values("year")
+        .annotate(n=Count("id", filter=Q(is_summary=False)), mins=Sum("duration_minutes"), cyc=Sum("cycles"))
+        .order_by("-year")
+    ):
+        y["n"] += archived.get(y["year"], 0)
+        log_years.append({**y, "hhmm": fmt_hhmm(y["mins"]), "archived": y["year"] in archived})
+
+    default_year = log_years[0]["year"] if log_years else timezone.localdate().year
+    log_year = _parse_year(year_param, default_year)
+
+    start, end = _year_bounds(log_year)
+    rows = list(obj.logs.filter(date__gte=start, date__lt=end, is_summary=False).select_related("pilot"))
+    if log_year in archived:
+        rows += _archived_logs(obj, log_year)
+        rows.sort(key=lambda r: (r.date, r.id), reverse=True)
     logs = []
-    for row in obj.logs.select_related("pilot").all():
-        logs.append({"row": row, "dur_hhmm": _fmt_hhmm(row.duration_minutes)})
+    for row in rows:
+        logs.append({"row": row, "dur_hhmm": fmt_hhmm(row.duration_minutes)})
+
+    return {
+        "logs": logs,
+        "log_year": log_year,
+        "log_years": log_years,
+        "log_year_archived": log_year in archived,
+    }
 
+
+def _visits_panel(obj):
+    total_minutes, total_cycles = aircraft_current_totals(obj)
+    today = timezone.localdate()
     visits = []
     for r in obj.visit_rules.filter(active=True).order_by("name"):
-        due = r.due_at_minutes or 0
-        remain = due - total_minutes
-        status = "ok" if remain > 0 else ("due" if remain == 0 else "overdue")
+        evaluation = visit_status(r, total_minutes, total_cycles, today)
         visits.append({
             "rule": r,
-            "remain_hhmm": _fmt_hhmm(remain),
-            "remain_abs_hhmm": _fmt_hhmm(abs(remain)),
-            "due_hhmm": _fmt_hhmm(due),
-            "interval_hhmm": _fmt_hhmm(r.interval_minutes or 0),
-            "status": status,
+            "status": evaluation["status"],
+            # Restes par critère (heures, cycles, jours) : le premier atteint fixe le statut
+            "remaining": [
+                {"unit": unit, "text": fmt_remaining(unit, remain), "overdue": remain < 0}
+                for unit, remain in evaluation["remaining"]
+            ],
+            "limiting": fmt_remaining(*evaluation["limiting"]) if evaluation["limiting"] else "",
+            "due_hhmm": fmt_hhmm(r.due_at_minutes or 0),
+            "interval_hhmm": fmt_hhmm(r.interval_minutes or 0),
         })
+    return {"visits": visits}
+
 
-    engines = obj.engines.prefetch_related("installed_components", "logs").all()
+def _components_panel(obj):
+    engines = list(obj.engines.prefetch_related("installed_components").all())
+    engine_totals = engines_current_totals(engines)  # une requête pour tous les moteurs
     airframe_components = obj.installed_components.all()
 
     comp_levels = {}
     levels_all = []
 
+    airframe_ctx = []
     for c in airframe_components:
         lvl = component_level(c)
         comp_levels[c.id] = lvl
         levels_all.append(lvl)
+        airframe_ctx.append({"obj": c, "level": lvl})
 
+    engines_ctx = []
     for e in engines:
+        components = []
         for c in e.installed_components.all():
             lvl = component_level(c)
             comp_levels[c.id] = lvl
             levels_all.append(lvl)
-
-    aircraft_kardex_level = aggregate_levels(levels_all)
-
-    engines_ctx = []
-    for e in engines:
-        em, ec = _engine_current_totals(e)
+            components.append({"obj": c, "level": lvl})
+        em, ec = engine_totals[e.pk]
+        lvl = engine_level(e, em, ec)
+        levels_all.append(lvl)
+        remaining = engine_remaining(e, em, ec)
         engines_ctx.append({
             "obj": e,
-            "total_hhmm": _fmt_hhmm(em),
+            "level": lvl,
+            "total_hhmm": fmt_hhmm(em),
             "total_cycles": ec,
+            "tso_hhmm": fmt_hhmm(em - e.overhaul_at_minutes),
+            "tbo_remain_hhmm": None if remaining["tbo"] is None else fmt_hhmm(remaining["tbo"]),
+            "life_remain_hhmm": None if remaining["life_minutes"] is None else fmt_hhmm(remaining["life_minutes"]),
+            "life_remain_cycles": remaining["life_cycles"],
+            "components": components,
         })
 
+    return {
+        "airframe_components": airframe_ctx,
+        "engines": engines_ctx,
+        "comp_levels": comp_levels,
+        "aircraft_kardex_level": aggregate_levels(levels_all),
+    }
+
+
+# Panneaux de la fiche aéronef, rechargeables seuls (aircraft_panel) après une saisie
+PANELS = {
+    "totals": lambda obj, request: _totals_panel(obj),
+    "logs": lambda obj, request: _logs_panel(obj, request.GET.get("year")),
+    "visits": lambda obj, request: _visits_panel(obj),
+    "components": lambda obj, request: _components_panel(obj),
+}
+
+
+def _panel_base(request, obj):
     can_add_log = _same_org_or_super(request.user, obj.organization_id)
-    can_manage_visits = _can_manage_visits(request.user) and _same_org_or_super(request.user, obj.organization_id)
-    log_form = FlightLogForm() if can_add_log else None
-
-    return render(
-        request,
-        "aircraft/detail.html",
-        {
-            "obj": obj,
-            "logs": logs,
-            "total_hhmm": _fmt_hhmm(total_minutes),
-            "total_cycles": total_cycles,
-            "base_hhmm": _fmt_hhmm(obj.initial_minutes),
-            "log_hhmm": _fmt_hhmm(total_minutes - obj.initial_minutes),
-            "log_cycles": (total_cycles - obj.initial_cycles),
-            "can_add_log": can_add_log,
-            "log_form": log_form,
-
-            "visits": visits,
-            "can_manage_visits": can_manage_visits,
-
-            "airframe_components": airframe_components,
-            "engines": engines_ctx,
-            "comp_levels": comp_levels,
-            "aircraft_kardex_level": aircraft_kardex_level,
-        },
+    return {
+        "obj": obj,
+        "can_add_log": can_add_log,
+        "can_manage_visits": _can_manage_visits(request.user) and _same_org_or_super(request.user, obj.organization_id),
+        "engine_log_form": EngineLogForm(auto_id=False) if can_add_log else None,  # un formulaire par moteur
+    }
+
+
+@login_required
+@query_budget(queries=30, duplicates=5)
+def aircraft_detail(request, pk: int):
+    obj = get_object_or_404(Aircraft, pk=pk)
+    if request.user.role != request.user.Roles.SUPERADMIN and obj.organization_id != request.user.organization_id:
+        return HttpResponseForbidden("Accès refusé.")
+
+    ctx = _panel_base(request, obj)
+    for build in PANELS.values():
+        ctx.update(build(obj, request))
+    ctx["log_form"] = FlightLogForm(user=request.user, aircraft=obj) if ctx["can_add_log"] else None
+    return render(request, "aircraft/detail.html", ctx)
+
+
+@login_required
+@query_budget(queries=20, duplicates=5)
+def aircraft_panel(request, pk: int, panel: str):
+    """Fragment HTML d'un seul panneau de la fiche (rechargé après une saisie asynchrone)."""
+    build = PANELS.get(panel)
+    if build is None:
+        raise Http404("Panneau inconnu.")
+    obj = get_object_or_404(Aircraft, pk=pk)
+    if not _same_org_or_super(request.user, obj.organization_id):
+        return HttpResponseForbidden("Accès refusé.")
+
+    ctx = _panel_base(request, obj)
+    ctx.update(build(obj, request))
+    return render(request, f"aircraft/_panel_{panel}.html", ctx)
+
+
+@login_required
+def flightlog_archive_download(request, pk: int, year: int):
+    """Détail d'une année compactée au format JSONL (une ligne de journal par ligne)."""
+    obj = get_object_or_404(Aircraft, pk=pk)
+    if not _same_org_or_super(request.user, obj.organization_id):
+        return HttpResponseForbidden("Accès refusé.")
+
+    archive = obj.log_archives.filter(year=year).first()
+    if archive is None:
+        raise Http404("Aucune archive pour cette année.")
+    response = HttpResponse(archive.records_jsonl(), content_type="application/x-ndjson; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{obj.registration}-{year}-journal.jsonl"'
+    return response
+
+
+@require_POST
+@login_required
+def flightlog_export(request, pk: int):
+    """Export CSV du journal complet : tâche de fond, suivi sur la page de la tâche."""
+    obj = get_object_or_404(Aircraft, pk=pk)
+    if not _same_org_or_super(request.user, obj.organization_id):
+        return HttpResponseForbidden("Accès refusé.")
+
+    job = enqueue(
+        "fleet.export_logbook", user=request.user,
+        label=f"Export journal de vol {obj.registration}", aircraft_id=obj.pk,
     )
+    messages.info(request, "Export lancé : le fichier sera téléchargeable ici une fois prêt.")
+    return redirect("job_detail", pk=job.pk)
 
 
 @require_POST
 @login_required
+@query_budget(queries=15)
+@idempotent("flightlog_add")
 def flightlog_add(request, pk: int):
     obj = get_object_or_404(Aircraft, pk=pk)
     if not _same_org_or_super(request.user, obj.organization_id):
         return HttpResponseForbidden("Accès refusé.")
 
-    form = FlightLogForm(request.POST)
+    form = FlightLogForm(request.POST, user=request.user, aircraft=obj)
     if not form.is_valid():
+        if wants_json(request):
+            return JsonResponse({"ok": False, "errors": form.errors.get_json_data()}, status=400)
         messages.error(request, "Formulaire invalide.")
         return redirect("aircraft_detail", pk=obj.pk)
 
@@ -218,31 +547,23 @@ def flightlog_add(request, pk: int):
     if not entry.pilot:
         entry.pilot = request.user
     entry.save()
+    mark_succeeded(request)
 
     # === Auto : créer un log moteur par moteur (si moteurs déclarés) ===
-    engines = obj.engines.all()
-    if engines.exists():
-        auto_remarks = []
-        if entry.from_icao or entry.to_icao:
-            auto_remarks.append(f"Vol {entry.from_icao or '—'} -> {entry.to_icao or '—'}")
-        if entry.remarks:
-            auto_remarks.append(entry.remarks.strip())
-        remarks = " | ".join([x for x in auto_remarks if x]) or "Auto depuis journal de vol (cellule)"
-
-        for e in engines:
-            EngineLog.objects.create(
-                engine=e,
-                date=entry.date,
-                duration_minutes=entry.duration_minutes,
-                cycles=entry.cycles,
-                remarks=remarks,
-                created_by=request.user,
-            )
-
-        messages.success(request, "Ligne de journal ajoutée + logs moteurs créés automatiquement.")
+    if mirror_engine_logs(entry, request.user):
+        message = "Ligne de journal ajoutée + logs moteurs créés automatiquement."
     else:
-        messages.success(request, "Ligne de journal ajoutée (aucun moteur déclaré).")
-
+        message = "Ligne de journal ajoutée (aucun moteur déclaré)."
+
+    if wants_json(request):
+        # Saisie asynchrone : la page recharge seulement les panneaux touchés
+        return JsonResponse({
+            "ok": True,
+            "message": message,
+            "year": entry.date.year,
+            "idempotency_key": new_key(),
+        })
+    messages.success(request, message)
     return redirect("aircraft_detail", pk=obj.pk)
 
 
@@ -296,43 +617,292 @@ def visitrule_complete(request, rule_id: int):
     if not (_can_manage_visits(request.user) and _same_org_or_super(request.user, aircraft.organization_id)):
         return HttpResponseForbidden("Accès refusé.")
 
-    total_minutes_now, total_cycles_now = _current_totals(aircraft)
+    total_minutes_now, total_cycles_now = aircraft_current_totals(aircraft)
+    today = timezone.localdate()
     due = rule.due_at_minutes or 0
     interval = rule.interval_minutes or 0
-    overdue = max(0, total_minutes_now - due)
-    next_due_preview = total_minutes_now + interval
+    overdue = max(0, total_minutes_now - due) if (interval or due) else 0
+    next_due_preview, _next_cycles, next_date_preview = next_due(rule, total_minutes_now, total_cycles_now, today)
 
     if request.method == "POST":
         form = VisitCompleteForm(request.POST)
         if form.is_valid():
-            minutes_done_total = form.minutes_done_total
-            cycles_done_total = form.cleaned_data.get("cycles_done_total") or total_cycles_now
-
-            VisitCompletion.objects.create(
-                rule=rule,
-                date=timezone.localdate(),
-                at_minutes=minutes_done_total,
-                at_cycles=cycles_done_total,
-                remarks=form.cleaned_data.get("remarks", ""),
-            )
-
-            rule.due_at_minutes = minutes_done_total + interval
-            rule.due_at_cycles = cycles_done_total + (rule.interval_cycles or 0)
-            rule.save(update_fields=["due_at_minutes", "due_at_cycles", "updated_at"])
+            complete_visits({rule.pk: (
+                form.cleaned_data.get("date") or today,
+                form.cleaned_data["minutes_done_total"],
+                form.cleaned_data.get("cycles_done_total") or total_cycles_now,
+            )})
 
             messages.success(request, "Visite enregistrée. Prochaine échéance mise à jour.")
             return redirect("aircraft_detail", pk=aircraft.pk)
     else:
-        form = VisitCompleteForm(initial={"minutes_done_total": total_minutes_now, "cycles_done_total": total_cycles_now})
+        form = VisitCompleteForm(initial={
+            "minutes_done_total": total_minutes_now, "cycles_done_total": total_cycles_now, "date": today,
+        })
 
     ctx = {
         "form": form,
         "aircraft": aircraft,
         "rule": rule,
-        "total_hhmm": _fmt_hhmm(total_minutes_now),
-        "due_hhmm": _fmt_hhmm(due),
-        "interval_hhmm": _fmt_hhmm(interval),
-        "overdue_hhmm": _fmt_hhmm(overdue),
-        "next_due_hhmm": _fmt_hhmm(next_due_preview),
+        "total_hhmm": fmt_hhmm(total_minutes_now),
+        "due_hhmm": fmt_hhmm(due),
+        "interval_hhmm": fmt_hhmm(interval),
+        "overdue_hhmm": fmt_hhmm(overdue),
+        "next_due_hhmm": fmt_hhmm(next_due_preview) if next_due_preview else "",
+        "overdue_days": max(0, (today - rule.due_date).days) if rule.due_date else 0,
+        "next_due_date": next_date_preview,
     }
     return render(request, "aircraft/visit_complete_form.html", ctx)
+
+
+# Réalisation groupée : lignes affichées au plus (filtrer par aéronef, programme, visite)
+BULK_COMPLETE_MAX_ROWS = 500
+
+
+@login_required
+@query_budget(queries=20)
+def visit_bulk_complete(request):
+    """
+    Campagne de maintenance : réalisation de plusieurs visites (plusieurs
+    aéronefs) en un envoi. Écriture en une transaction et quatre requêtes
+    (fleet.due.complete_visits), quel que soit le nombre de lignes cochées.
+    """
+    if not _can_manage_visits(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+
+    scope = _utilization_scope(request.user)
+    rules = VisitRule.objects.filter(active=True, aircraft__in=scope).select_related("aircraft")
+    filters = {key: request.GET.get(key, "").strip() for key in ("aircraft", "program", "name", "late")}
+    if filters["aircraft"].isdigit():
+        rules = rules.filter(aircraft_id=int(filters["aircraft"]))
+    if filters["program"].isdigit():
+        rules = rules.filter(program_item__program_id=int(filters["program"]))
+    if filters["name"]:
+        rules = rules.filter(name__iexact=filters["name"])
+    rules = list(rules.order_by("aircraft__registration", "name")[:BULK_COMPLETE_MAX_ROWS])
+
+    totals = aircrafts_current_totals({r.aircraft_id: r.aircraft for r in rules}.values())
+    today = timezone.localdate()
+    rows = []
+    for r in rules:
+        minutes, cycles = totals[r.aircraft_id]
+        evaluation = visit_status(r, minutes, cycles, today)
+        if filters["late"] and evaluation["status"] == "ok":
+            continue
+        rows.append({
+            "rule": r,
+            "status": evaluation["status"],
+            "limiting": fmt_remaining(*evaluation["limiting"]) if evaluation["limiting"] else "",
+            "total_hhmm": fmt_hhmm(minutes),
+            "total_cycles": cycles,
+            "form": VisitBulkRowForm(request.POST or None, prefix=f"r{r.pk}"),
+        })
+
+    form = VisitBulkCompleteForm(request.POST or None, initial={"date": today})
+    if request.method == "POST":
+        # Seules les lignes cochées sont validées (une saisie abandonnée ailleurs ne bloque pas)
+        checked = [row for row in rows if row["form"]["selected"].value()]
+        selected = [row for row in checked if row["form"].is_valid()]
+        row_errors = len(selected) != len(checked)
+        if not selected and not row_errors:
+            messages.error(request, "Aucune visite cochée.")
+        elif form.is_valid() and not row_errors:
+            default_date = form.cleaned_data["date"]
+            done = {
+                row["rule"].pk: (
+                    row["form"].cleaned_data["date"] or default_date,
+                    row["form"].cleaned_data["minutes_done_total"],
+                    row["form"].cleaned_data["cycles_done_total"],
+                )
+                for row in selected
+            }
+            complete_visits(done, remarks=form.cleaned_data["remarks"])
+            messages.success(request, f"{len(done)} visite(s) enregistrée(s). Échéances mises à jour.")
+            return redirect(f"{request.path}?{request.GET.urlencode()}")
+        else:
+            messages.error(request, "Formulaire invalide : rien n'a été enregistré.")
+
+    return render(request, "aircraft/visit_bulk_complete.html", {
+        "form": form,
+        "rows": rows,
+        "filters": filters,
+        "truncated": len(rules) == BULK_COMPLETE_MAX_ROWS,
+        "aircraft": scope.values("id", "registration"),
+        "programs": _visible_programs(request.user).values("id", "name"),
+    })
+
+
+# -------------------------
+# Programmes d'entretien types (fleet.programs)
+# -------------------------
+
+def _visible_programs(user):
+    qs = VisitProgram.objects.select_related("organization")
+    if user.role != user.Roles.SUPERADMIN:
+        qs = qs.filter(Q(organization__isnull=True) | Q(organization_id=user.organization_id))
+    return qs
+
+
+def _can_edit_program(user, program):
+    """Programme commun (sans organisation) : superadmin seulement."""
+    if not _can_manage_visits(user):
+        return False
+    return user.role == user.Roles.SUPERADMIN or (
+        program.organization_id is not None and program.organization_id == user.organization_id
+    )
+
+
+@login_required
+def program_list(request):
+    if not _can_manage_visits(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+
+    if request.method == "POST":
+        form = VisitProgramForm(request.POST, user=request.user)
+        if form.is_valid():
+            program = form.save(commit=False)
+            if request.user.role != request.user.Roles.SUPERADMIN:
+                program.organization = request.user.organization
+            program.save()
+            messages.success(request, "Programme créé : ajouter ses visites.")
+            return redirect("program_detail", pk=program.pk)
+    else:
+        form = VisitProgramForm(user=request.user)
+
+    program_qs = _visible_programs(request.user).annotate(
+        n_items=Count("items", distinct=True), n_aircraft=Count("items__rules__aircraft", distinct=True)
+    )
+    return render(request, "aircraft/programs.html", {"programs": program_qs, "form": form})
+
+
+@login_required
+@query_budget(queries=15)
+def program_detail(request, pk: int):
+    program = get_object_or_404(_visible_programs(request.user), pk=pk)
+    if not _can_manage_visits(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+    can_edit = _can_edit_program(request.user, program)
+
+    form = VisitProgramForm(instance=program, user=request.user)
+    item_form = VisitProgramItemForm(program=program)
+    if request.method == "POST":
+        if not can_edit:
+            return HttpResponseForbidden("Accès refusé.")
+        if request.POST.get("action") == "item":
+            item_form = VisitProgramItemForm(request.POST, program=program)
+            if item_form.is_valid():
+                item_form.save()
+                messages.success(request, "Visite ajoutée au programme (appliquer pour la créer sur les aéronefs).")
+                return redirect("program_detail", pk=program.pk)
+        else:
+            form = VisitProgramForm(request.POST, instance=program, user=request.user)
+            if form.is_valid():
+                form.save()
+                messages.success(request, "Programme mis à jour.")
+                return redirect("program_detail", pk=program.pk)
+
+    items = list(program.items.annotate(n_rules=Count("rules")))
+    for item in items:
+        item.interval_hhmm = fmt_hhmm(item.interval_minutes)
+    matching = programs.matching_aircraft(program, _utilization_scope(request.user)).values(
+        "id", "registration", "model", "category"
+    )
+    return render(request, "aircraft/program_detail.html", {
+        "program": program,
+        "can_edit": can_edit,
+        "form": form,
+        "item_form": item_form,
+        "items": items,
+        "matching": matching,
+    })
+
+
+@require_POST
+@login_required
+@query_budget(queries=10)
+def program_apply(request, pk: int):
+    """Crée ou rattache les visites du programme sur les aéronefs cochés (un seul INSERT ... ON CONFLICT)."""
+    program = get_object_or_404(_visible_programs(request.user), pk=pk)
+    if not _can_manage_visits(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+
+    ids = [int(x) for x in request.POST.getlist("aircraft") if x.isdigit()]
+    # Périmètre de l'utilisateur seulement, même si le formulaire a été modifié
+    aircraft = list(programs.matching_aircraft(program, _utilization_scope(request.user)).filter(pk__in=ids))
+    if not aircraft:
+        messages.error(request, "Aucun aéronef sélectionné.")
+        return redirect("program_detail", pk=program.pk)
+
+    created, linked = programs.apply(program, aircraft)
+    messages.success(
+        request, f"Programme appliqué à {len(aircraft)} aéronef(s) : {created} visite(s) créée(s), {linked} rattachée(s)."
+    )
+    return redirect("program_detail", pk=program.pk)
+
+
+@login_required
+def program_item_edit(request, item_id: int):
+    item = get_object_or_404(VisitProgramItem.objects.select_related("program"), pk=item_id)
+    program = item.program
+    if not _visible_programs(request.user).filter(pk=program.pk).exists() or not _can_edit_program(request.user, program):
+        return HttpResponseForbidden("Accès refusé.")
+
+    if request.method == "POST" and request.POST.get("action") == "delete":
+        # Les règles créées restent sur les aéronefs, détachées du programme
+        item.delete()
+        messages.success(request, "Visite retirée du programme (les visites des aéronefs sont conservées).")
+        return redirect("program_detail", pk=program.pk)
+
+    if request.method == "POST":
+        form = VisitProgramItemForm(request.POST, instance=item, program=program)
+        if form.is_valid():
+            try:
+                with transaction.atomic():
+                    form.save()
+                    updated = programs.propagate(item)
+            except IntegrityError:
+                form.add_error("name", "Ce nom est déjà utilisé par une autre visite sur un des aéronefs liés.")
+            else:
+                messages.success(request, f"Visite mise à jour : {updated} visite(s) d'aéronef modifiée(s).")
+                return redirect("program_detail", pk=program.pk)
+    else:
+        form = VisitProgramItemForm(instance=item, program=program)
+
+    return render(request, "aircraft/program_item_form.html", {"form": form, "item": item, "program": program})
+
+
+# -------------------------
+# Synchronisation hors-ligne (tablettes)
+# -------------------------
+
+def sync(request):
+    """
+    GET  ?cursor=<c>                       -> delta depuis c (sans curseur : tout)
+    POST {"cursor": c, "flight_logs": [...]} -> vols créés (idempotents par client_id)
+                                              + delta, en un seul aller-retour.
+    Session Django (POST : en-tête X-CSRFToken).
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentification requise."}, status=401)
+
+    if request.method == "GET":
+        return JsonResponse(delta_sync.pull(request.user, delta_sync.parse_cursor(request.GET.get("cursor"))))
+    if request.method != "POST":
+        return JsonResponse({"error": "Méthode non autorisée."}, status=405)
+
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "JSON invalide."}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({"error": "Objet JSON attendu."}, status=400)
+    items = payload.get("flight_logs") or []
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return JsonResponse({"error": "flight_logs doit être une liste d'objets."}, status=400)
+    if len(items) > delta_sync.MAX_PUSH:
+        return JsonResponse({"error": f"Au plus {delta_sync.MAX_PUSH} lignes par envoi."}, status=413)
+
+    results = delta_sync.push(request.user, items)
+    data = delta_sync.pull(request.user, delta_sync.parse_cursor(payload.get("cursor")))
+    data["pushed"] = results
+    return JsonResponse(data)
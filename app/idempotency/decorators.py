@@ -0,0 +1,113 @@
+import datetime
+import functools
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.contrib import messages
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+FIELD_NAME = "idempotency_key"
+HEADER_NAME = "Idempotency-Key"
+# Champs qui changent d'un envoi à l'autre sans changer l'écriture
+_IGNORED_FIELDS = {"csrfmiddlewaretoken", FIELD_NAME}
+
+
+def _request_key(request):
+    key = request.headers.get(HEADER_NAME) or request.POST.get(FIELD_NAME) or ""
+    return key.strip()[:64]
+
+
+def _request_hash(request, args, kwargs):
+    h = hashlib.sha256()
+    h.update(repr(sorted(kwargs.items())).encode())
+    for name in sorted(request.POST):
+        if name in _IGNORED_FIELDS:
+            continue
+        h.update(name.encode())
+        for value in request.POST.getlist(name):
+            h.update(b"\0" + value.encode())
+    return h.hexdigest()
+
+
+def new_key():
+    return uuid.uuid4().hex
+
+
+def wants_json(request):
+    """Envoi asynchrone (fetch) : réponse JSON attendue au lieu d'une redirection."""
+    return "application/json" in request.headers.get("Accept", "")
+
+
+def mark_succeeded(request):
+    """À appeler par la vue une fois l'écriture faite : seul ce cas mémorise la clé."""
+    request._idempotent_succeeded = True
+
+
+def _replay(request, stored):
+    if wants_json(request):
+        return JsonResponse({
+            "ok": True,
+            "replayed": True,
+            "message": "Déjà enregistré : envoi répété ignoré.",
+            "idempotency_key": new_key(),
+        })
+    if stored.location:
+        messages.info(request, "Déjà enregistré : envoi répété ignoré.")
+        return HttpResponseRedirect(stored.location)
+    return HttpResponse(status=stored.status_code or 204)
+
+
+def idempotent(scope):
+    """
+    Rend une vue d'écriture (POST) rejouable sans effet de bord.
+
+    Clé : en-tête Idempotency-Key ou champ caché idempotency_key
+    ({% idempotency_field %} dans le formulaire). Sans clé, la vue s'exécute
+    normalement.
+
+    La clé est insérée dans la même transaction que l'écriture. Un renvoi
+    concurrent attend sur la contrainte unique, puis reçoit le résultat
+    enregistré (même redirection) au lieu de réécrire. Seuls les succès
+    (mark_succeeded(request) dans la vue) sont mémorisés : un formulaire
+    invalide, même suivi d'une redirection, peut être corrigé puis renvoyé
+    avec la même clé.
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key = _request_key(request) if request.method == "POST" else ""
+            if not key or not request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+
+            request_hash = _request_hash(request, args, kwargs)
+            ttl = datetime.timedelta(hours=getattr(settings, "IDEMPOTENCY_TTL_HOURS", 24))
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        user=request.user, scope=scope, key=key,
+                        request_hash=request_hash, expires_at=timezone.now() + ttl,
+                    )
+                    response = view_func(request, *args, **kwargs)
+                    if getattr(request, "_idempotent_succeeded", False):
+                        record.status_code = response.status_code
+                        record.location = response.get("Location", "")[:500]
+                        record.save(update_fields=["status_code", "location"])
+                    else:
+                        transaction.set_rollback(True)
+                    return response
+            except IntegrityError:
+                stored = IdempotencyKey.objects.filter(user=request.user, scope=scope, key=key).first()
+                if stored is None:
+                    raise
+            if stored.request_hash != request_hash:
+                return HttpResponse("Clé d'idempotence déjà utilisée pour une autre requête.", status=422)
+            return _replay(request, stored)
+
+        return wrapper
+
+    return decorator
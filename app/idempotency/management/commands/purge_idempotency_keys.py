@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from idempotency.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Supprime les clés d'idempotence expirées (IDEMPOTENCY_TTL_HOURS)."
+
+    def handle(self, *args, **opts):
+        deleted, _ = IdempotencyKey.objects.filter(expires_at__lt=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} clé(s) supprimée(s)."))
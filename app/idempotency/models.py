@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    Résultat d'une écriture déjà exécutée, retrouvé par (utilisateur, portée, clé).
+    Compact : empreinte de la requête + statut / redirection, pas le corps du formulaire.
+    Purge : commande purge_idempotency_keys (expires_at).
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys")
+    scope = models.CharField(max_length=64)                  # ex: "flightlog_add"
+    key = models.CharField(max_length=64)
+    request_hash = models.CharField(max_length=64)           # sha256 des champs POST
+
+    status_code = models.PositiveSmallIntegerField(default=0)
+    location = models.CharField(max_length=500, blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "scope", "key"], name="idempotency_user_scope_key_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.key}"
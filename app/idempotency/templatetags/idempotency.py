@@ -0,0 +1,12 @@
+from django import template
+from django.utils.html import format_html
+
+from idempotency.decorators import FIELD_NAME, new_key
+
+register = template.Library()
+
+
+@register.simple_tag
+def idempotency_field():
+    """Champ caché : une clé par affichage du formulaire (les renvois gardent la même)."""
+    return format_html('<input type="hidden" name="{}" value="{}">', FIELD_NAME, new_key())
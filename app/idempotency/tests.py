@@ -0,0 +1,69 @@
+from django.test import TestCase, override_settings
+
+from accounts.models import Organization, User
+from fleet.models import Aircraft, FlightLog
+
+from .models import IdempotencyKey
+
+
+@override_settings(ALERTING_CACHE_ENABLED=False)
+class IdempotentViewTests(TestCase):
+    """Décorateur idempotent, sur la saisie du journal de vol (fleet.views.flightlog_add)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        org = Organization.objects.create(name="Aéroclub test")
+        cls.aircraft = Aircraft.objects.create(registration="F-TEST", organization=org)
+        cls.user = User.objects.create_user("pilote-test", role=User.Roles.PILOT, organization=org)
+        cls.url = f"/aircraft/{cls.aircraft.pk}/log/add/"
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post(self, key, duration="1:00", **extra):
+        data = {"date": "2026-03-15", "cycles": "1", "duration_hhmm": duration}
+        if key:
+            data["idempotency_key"] = key
+        return self.client.post(self.url, data, **extra)
+
+    def test_resend_is_replayed(self):
+        first = self.post("k1")
+        self.assertEqual(first.status_code, 302)
+        replay = self.post("k1")
+        self.assertEqual((replay.status_code, replay["Location"]), (302, first["Location"]))
+        self.assertEqual(FlightLog.objects.count(), 1)
+
+        stored = IdempotencyKey.objects.get(user=self.user, scope="flightlog_add", key="k1")
+        self.assertEqual((stored.status_code, stored.location), (302, first["Location"]))
+
+    def test_json_resend_is_replayed(self):
+        self.post("k1", HTTP_ACCEPT="application/json")
+        replay = self.post("k1", HTTP_ACCEPT="application/json").json()
+        self.assertTrue(replay["replayed"])
+        self.assertNotEqual(replay["idempotency_key"], "k1")
+        self.assertEqual(FlightLog.objects.count(), 1)
+
+    def test_reused_key_with_other_payload_is_rejected(self):
+        self.post("k1")
+        response = self.post("k1", duration="2:00")
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(list(FlightLog.objects.values_list("duration_minutes", flat=True)), [60])
+
+    def test_failed_write_keeps_key_usable(self):
+        self.post("k1", duration="abc")
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.post("k1")
+        self.assertEqual(FlightLog.objects.count(), 1)
+
+    def test_without_key_every_post_writes(self):
+        self.post("")
+        self.post("")
+        self.assertEqual(FlightLog.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_key_is_per_user(self):
+        self.post("k1")
+        other = User.objects.create_user("pilote-2", role=User.Roles.PILOT, organization=self.aircraft.organization)
+        self.client.force_login(other)
+        self.post("k1")
+        self.assertEqual(FlightLog.objects.count(), 2)
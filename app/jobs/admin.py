@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "progress", "created_by", "created_at", "finished_at")
+    # Pas de filtre sur name : AllValuesFieldListFilter ferait un SELECT DISTINCT sur toute la table
+    list_filter = ("status",)
+    list_select_related = ("created_by",)
+    search_fields = ("^name", "^label", "^locked_by")
+    readonly_fields = ("created_at", "started_at", "finished_at", "locked_at", "locked_by")
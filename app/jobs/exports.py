@@ -0,0 +1,27 @@
+"""Outils communs aux tâches d'export."""
+import csv
+import tempfile
+
+from django.core.files import File
+
+
+def write_csv(job, filename, header, rows, total=None, every=5000):
+    """
+    Écrit rows (itérable, consommé au fil de l'eau) dans un fichier temporaire
+    puis l'attache à job.result_file : mémoire constante, même sur 100k lignes.
+    Séparateur « ; » + BOM UTF-8 : ouverture directe dans Excel (locale FR).
+    Retourne le nombre de lignes écrites.
+    """
+    count = 0
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8-sig", newline="") as tmp:
+        writer = csv.writer(tmp, delimiter=";")
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if count % every == 0:
+                job.set_progress(count, total, f"{count} lignes")
+        tmp.flush()
+        tmp.seek(0)
+        job.save_result_file(filename, File(tmp.buffer, name=filename))
+    return count
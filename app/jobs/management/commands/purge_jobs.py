@@ -0,0 +1,26 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = "Supprime les tâches terminées depuis plus de JOBS_RETENTION_DAYS jours, avec leurs fichiers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="Rétention (défaut : JOBS_RETENTION_DAYS)")
+
+    def handle(self, *args, **opts):
+        days = opts["days"] if opts["days"] is not None else getattr(settings, "JOBS_RETENTION_DAYS", 7)
+        limit = timezone.now() - datetime.timedelta(days=days)
+        old = Job.objects.filter(status__in=[Job.Status.DONE, Job.Status.FAILED], finished_at__lt=limit)
+
+        files = 0
+        for job in old.exclude(result_file="").only("pk", "result_file").iterator():
+            job.result_file.delete(save=False)
+            files += 1
+        deleted, _ = old.delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} tâche(s) supprimée(s), {files} fichier(s)."))
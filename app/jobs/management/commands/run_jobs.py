@@ -0,0 +1,70 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from jobs import queue
+
+
+def _worker_process(index, stop, once, poll_seconds):
+    """Process enfant : ignore Ctrl-C (géré par le parent via stop)."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    queue.work(f"{socket.gethostname()}:{os.getpid()}:{index}", stop, once=once, poll_seconds=poll_seconds)
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker des tâches de fond (exports, recalculs) : réserve les tâches en file "
+        "(FOR UPDATE SKIP LOCKED) et les exécute. Plusieurs workers / machines possibles. "
+        "SIGTERM : arrêt après la tâche en cours."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=None,
+            help="Process worker en parallèle (défaut : JOBS_CONCURRENCY)",
+        )
+        parser.add_argument("--once", action="store_true", help="S'arrête quand la file est vide")
+        parser.add_argument("--poll", type=float, default=2.0, help="Attente (s) quand la file est vide")
+
+    def handle(self, *args, **opts):
+        concurrency = opts["concurrency"] or getattr(settings, "JOBS_CONCURRENCY", 1)
+        if concurrency < 1:
+            raise CommandError("--concurrency doit valoir au moins 1.")
+
+        if concurrency == 1:
+            stop = threading.Event()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: stop.set())
+            worker_id = f"{socket.gethostname()}:{os.getpid()}"
+            n = queue.work(worker_id, stop, once=opts["once"], poll_seconds=opts["poll"])
+            self.stdout.write(self.style.SUCCESS(f"{n} tâche(s) exécutée(s)."))
+            return
+
+        # Un process par worker : exports et recalculs sont CPU (GIL).
+        # Aucune connexion ouverte ne doit traverser le fork.
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        stop = ctx.Event()
+        processes = [
+            ctx.Process(target=_worker_process, args=(i, stop, opts["once"], opts["poll"]), daemon=False)
+            for i in range(concurrency)
+        ]
+        for p in processes:
+            p.start()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+        self.stdout.write(f"{concurrency} workers démarrés (pid {', '.join(str(p.pid) for p in processes)}).")
+
+        for p in processes:
+            p.join()
+        failed = [p.pid for p in processes if p.exitcode]
+        if failed:
+            raise CommandError(f"Worker(s) arrêté(s) en erreur : {failed}")
+        self.stdout.write(self.style.SUCCESS("Workers arrêtés."))
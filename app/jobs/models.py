@@ -0,0 +1,100 @@
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile, File
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Tâche de fond (export, recalcul, import) exécutée par la commande run_jobs.
+    La file est cette table : un worker réserve une ligne QUEUED avec
+    SELECT ... FOR UPDATE SKIP LOCKED (voir jobs.queue).
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "En attente"
+        RUNNING = "running", "En cours"
+        DONE = "done", "Terminée"
+        FAILED = "failed", "Échec"
+
+    name = models.CharField(max_length=100)                   # nom enregistré via @task
+    params = models.JSONField(default=dict, blank=True)
+    label = models.CharField(max_length=255, blank=True)      # libellé affiché
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    priority = models.SmallIntegerField(default=100)          # plus petit = plus tôt
+    run_after = models.DateTimeField(default=timezone.now)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)   # rafraîchi par set_progress (worker vivant)
+
+    progress = models.PositiveSmallIntegerField(default=0)    # %
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    result_file = models.FileField(upload_to="jobs/%Y/%m/", blank=True)
+    error = models.TextField(blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs"
+    )
+    organization = models.ForeignKey(
+        "accounts.Organization", on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            # Réservation : seules les lignes en attente, dans l'ordre de passage
+            models.Index(
+                fields=["priority", "run_after", "id"],
+                condition=Q(status="queued"),
+                name="jobs_job_queued_idx",
+            ),
+            models.Index(fields=["status", "locked_at"], name="jobs_job_status_locked_idx"),
+            models.Index(fields=["organization", "-created_at"], name="jobs_job_org_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.label or self.name} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in {self.Status.DONE, self.Status.FAILED}
+
+    @property
+    def result_filename(self):
+        return os.path.basename(self.result_file.name) if self.result_file else ""
+
+    def set_progress(self, done, total=None, message=None):
+        """
+        Avancement affiché sur la page de suivi. Rafraîchit aussi locked_at :
+        une tâche longue qui avance n'est jamais reprise comme « worker perdu ».
+        """
+        if total:
+            self.progress = max(0, min(100, int(done * 100 / total)))
+        else:
+            self.progress = max(0, min(100, int(done)))
+        fields = {"progress": self.progress, "locked_at": timezone.now()}
+        if message is not None:
+            self.message = fields["message"] = message[:255]
+        type(self).objects.filter(pk=self.pk).update(**fields)
+
+    def save_result_file(self, filename, content):
+        """
+        Fichier produit par la tâche (export), téléchargeable depuis la page de
+        suivi. content : bytes / str, ou File (fichier temporaire d'un gros export).
+        """
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if not isinstance(content, File):
+            content = ContentFile(content)
+        self.result_file.save(filename, content, save=False)
+        type(self).objects.filter(pk=self.pk).update(result_file=self.result_file.name)
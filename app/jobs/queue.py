@@ -0,0 +1,131 @@
+"""
+Exécution des tâches : réservation, exécution, reprises.
+
+Réservation : SELECT ... FOR UPDATE SKIP LOCKED sur les lignes QUEUED dont
+run_after est passé. Deux workers ne prennent jamais la même tâche et ne
+s'attendent pas : chacun saute les lignes déjà verrouillées par l'autre.
+La ligne passe RUNNING dans la même transaction, puis la tâche s'exécute hors
+transaction (aucun verrou gardé pendant un export de plusieurs minutes).
+
+Échec : nouvelle tentative après JOBS_RETRY_DELAY_SECONDS * 2^(tentative - 1),
+jusqu'à max_attempts, puis FAILED. Worker tué (OOM, déploiement) : la tâche
+RUNNING sans nouvelle depuis JOBS_STALE_SECONDS est remise en file.
+"""
+import datetime
+import logging
+import time
+import traceback
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_task
+
+logger = logging.getLogger("jobs")
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, "JOBS_RETRY_DELAY_SECONDS", 30)
+    return datetime.timedelta(seconds=base * 2 ** max(0, attempts - 1))
+
+
+def claim(worker_id):
+    """Réserve la prochaine tâche exécutable (ou None)."""
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now)
+            .order_by("priority", "run_after", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.Status.RUNNING
+        job.attempts += 1
+        job.locked_by = worker_id[:100]
+        job.locked_at = now
+        job.started_at = now
+        job.error = ""
+        job.save(update_fields=["status", "attempts", "locked_by", "locked_at", "started_at", "error"])
+    return job
+
+
+def _finish(job, **fields):
+    fields.setdefault("finished_at", timezone.now())
+    fields["locked_at"] = None  # locked_by conservé : dernier worker, pour diagnostic
+    # Garde-fou : une tâche reprise entre-temps (worker jugé perdu) n'est pas écrasée
+    Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, attempts=job.attempts).update(**fields)
+
+
+def _fail(job, error):
+    if job.attempts < job.max_attempts:
+        logger.warning("Tâche #%s %s : tentative %d/%d échouée", job.pk, job.name, job.attempts, job.max_attempts)
+        _finish(
+            job,
+            status=Job.Status.QUEUED,
+            run_after=timezone.now() + _retry_delay(job.attempts),
+            error=error,
+            finished_at=None,
+        )
+    else:
+        logger.error("Tâche #%s %s : échec définitif\n%s", job.pk, job.name, error)
+        _finish(job, status=Job.Status.FAILED, error=error)
+
+
+def run(job):
+    """Exécute une tâche réservée et enregistre son issue."""
+    spec = get_task(job.name)
+    if spec is None:
+        # Aucune chance de réussir à la tentative suivante
+        _finish(job, status=Job.Status.FAILED, error=f"Tâche inconnue : {job.name}")
+        return
+    try:
+        result = spec.func(job, **job.params)
+    except Exception:
+        _fail(job, traceback.format_exc())
+    else:
+        _finish(job, status=Job.Status.DONE, progress=100, result=result)
+
+
+def requeue_stale():
+    """Tâches RUNNING dont le worker ne donne plus signe de vie : remises en file (ou FAILED)."""
+    limit = timezone.now() - datetime.timedelta(seconds=getattr(settings, "JOBS_STALE_SECONDS", 600))
+    count = 0
+    with transaction.atomic():
+        stale = Job.objects.select_for_update(skip_locked=True).filter(status=Job.Status.RUNNING, locked_at__lt=limit)
+        for job in stale:
+            _fail(job, f"Worker perdu ({job.locked_by}) : pas de nouvelle depuis {job.locked_at:%d/%m/%Y %H:%M:%S}.")
+            count += 1
+    return count
+
+
+def work(worker_id, stop, once=False, poll_seconds=2.0):
+    """
+    Boucle d'un worker : réserve et exécute jusqu'à stop.set() (Event de
+    threading ou multiprocessing). La tâche en cours est toujours terminée.
+    once=True : s'arrête dès que la file est vide (cron, tests).
+    Retourne le nombre de tâches exécutées.
+    """
+    done = 0
+    last_stale_check = 0.0
+    while not stop.is_set():
+        close_old_connections()
+        if time.monotonic() - last_stale_check > 60:
+            requeue_stale()
+            last_stale_check = time.monotonic()
+
+        job = claim(worker_id)
+        if job is None:
+            if once:
+                break
+            stop.wait(poll_seconds)
+            continue
+
+        logger.info("Tâche #%s %s réservée par %s", job.pk, job.name, worker_id)
+        run(job)
+        done += 1
+    close_old_connections()
+    return done
@@ -0,0 +1,73 @@
+"""
+Déclaration et mise en file des tâches de fond.
+
+    # <app>/tasks.py (découvert au démarrage)
+    from jobs.registry import task
+
+    @task("fleet.export_logbook", label="Export journal de vol")
+    def export_logbook(job, aircraft_id):
+        ...
+        job.set_progress(done, total)
+        job.save_result_file("journal.csv", data)
+        return {"rows": n}          # => job.result
+
+    # dans une vue : retour immédiat, exécution par un worker (run_jobs)
+    job = enqueue("fleet.export_logbook", user=request.user, aircraft_id=obj.pk)
+
+Les paramètres sont stockés en JSON : ids et valeurs simples, pas d'objets.
+Une tâche peut être relancée (max_attempts) : elle doit pouvoir repartir de zéro.
+"""
+from dataclasses import dataclass
+
+from .models import Job
+
+_registry = {}
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    name: str
+    func: object
+    label: str
+    max_attempts: int
+    priority: int
+
+
+def task(name, label="", max_attempts=3, priority=100):
+    def decorator(func):
+        if name in _registry and _registry[name].func is not func:
+            raise ValueError(f"Tâche déjà enregistrée : {name}")
+        _registry[name] = TaskSpec(name, func, label or name, max_attempts, priority)
+        return func
+
+    return decorator
+
+
+def get_task(name):
+    return _registry.get(name)
+
+
+def registered_tasks():
+    return dict(_registry)
+
+
+def enqueue(name, user=None, label="", run_after=None, **params):
+    """
+    Ajoute une tâche à la file et la retourne. Dans une transaction, la tâche
+    n'est visible des workers qu'au commit (rien ne part si la vue échoue).
+    """
+    spec = get_task(name)
+    if spec is None:
+        raise KeyError(f"Tâche inconnue : {name}")
+    fields = {
+        "name": name,
+        "params": params,
+        "label": (label or spec.label)[:255],
+        "max_attempts": spec.max_attempts,
+        "priority": spec.priority,
+        "created_by": user,
+        "organization_id": getattr(user, "organization_id", None),
+    }
+    if run_after is not None:
+        fields["run_after"] = run_after
+    return Job.objects.create(**fields)
@@ -0,0 +1,129 @@
+import datetime
+import threading
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Job
+from .registry import enqueue, task
+
+
+@task("jobs.tests.ok", max_attempts=2)
+def _ok(job, value):
+    return {"value": value}
+
+
+@task("jobs.tests.boom", max_attempts=2)
+def _boom(job):
+    raise RuntimeError("boom")
+
+
+class ClaimTests(TransactionTestCase):
+    """Réservation concurrente : une vraie seconde connexion tient le verrou."""
+
+    def test_skip_locked_row(self):
+        first = enqueue("jobs.tests.ok", value=1)
+        second = enqueue("jobs.tests.ok", value=2)
+        locked, release = threading.Event(), threading.Event()
+
+        def hold():
+            try:
+                with transaction.atomic():
+                    list(Job.objects.select_for_update().filter(pk=first.pk))
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        try:
+            self.assertTrue(locked.wait(10))
+            claimed = queue.claim("worker-2")
+        finally:
+            release.set()
+            holder.join()
+
+        self.assertEqual(claimed.pk, second.pk)
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.Status.QUEUED)
+        self.assertEqual(queue.claim("worker-1").pk, first.pk)
+        self.assertIsNone(queue.claim("worker-1"))
+
+
+class QueueTests(TestCase):
+    def test_claim_order_and_state(self):
+        later = enqueue("jobs.tests.ok", value=1)
+        urgent = Job.objects.create(name="jobs.tests.ok", params={"value": 2}, priority=10)
+        enqueue("jobs.tests.ok", run_after=timezone.now() + datetime.timedelta(hours=1), value=3)
+
+        job = queue.claim("worker-1")
+        self.assertEqual(job.pk, urgent.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.locked_by), (Job.Status.RUNNING, 1, "worker-1"))
+        self.assertEqual(queue.claim("worker-1").pk, later.pk)
+        self.assertIsNone(queue.claim("worker-1"))
+
+    def test_run_success_and_retry(self):
+        ok, boom = enqueue("jobs.tests.ok", value=7), enqueue("jobs.tests.boom")
+        queue.run(queue.claim("w"))
+        with self.assertLogs("jobs", "WARNING"):
+            queue.run(queue.claim("w"))
+        ok.refresh_from_db()
+        boom.refresh_from_db()
+        self.assertEqual((ok.status, ok.result, ok.progress), (Job.Status.DONE, {"value": 7}, 100))
+        self.assertEqual((boom.status, boom.attempts), (Job.Status.QUEUED, 1))
+        self.assertGreater(boom.run_after, timezone.now())
+        self.assertIn("boom", boom.error)
+
+        Job.objects.filter(pk=boom.pk).update(run_after=timezone.now())
+        with self.assertLogs("jobs", "ERROR"):
+            queue.run(queue.claim("w"))
+        boom.refresh_from_db()
+        self.assertEqual((boom.status, boom.attempts), (Job.Status.FAILED, 2))
+
+    def test_unknown_task_fails_at_once(self):
+        job = Job.objects.create(name="jobs.tests.inconnue")
+        queue.run(queue.claim("w"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 1))
+
+    @override_settings(JOBS_STALE_SECONDS=600)
+    def test_requeue_stale(self):
+        lost = enqueue("jobs.tests.ok", value=1)
+        exhausted = enqueue("jobs.tests.ok", value=2)
+        alive = enqueue("jobs.tests.ok", value=3)
+        for job in (lost, exhausted, alive):
+            queue.claim("w-perdu")
+        old = timezone.now() - datetime.timedelta(seconds=601)
+        Job.objects.filter(pk__in=[lost.pk, exhausted.pk]).update(locked_at=old)
+        Job.objects.filter(pk=exhausted.pk).update(attempts=2)
+
+        with self.assertLogs("jobs", "WARNING"):
+            self.assertEqual(queue.requeue_stale(), 2)
+        lost.refresh_from_db()
+        exhausted.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(lost.status, Job.Status.QUEUED)
+        self.assertIn("w-perdu", lost.error)
+        self.assertIsNone(lost.locked_at)
+        self.assertEqual(exhausted.status, Job.Status.FAILED)
+        self.assertEqual(alive.status, Job.Status.RUNNING)
+
+    def test_late_finish_of_requeued_job_is_ignored(self):
+        job = enqueue("jobs.tests.ok", value=1)
+        stale = queue.claim("w-lent")
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - datetime.timedelta(days=1))
+        with self.assertLogs("jobs", "WARNING"):
+            queue.requeue_stale()
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        retry = queue.claim("w-2")
+
+        queue.run(stale)  # l'ancien worker termine après la reprise
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.Status.RUNNING, "w-2"))
+        queue.run(retry)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
@@ -0,0 +1,69 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponseForbidden
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from .models import Job
+
+
+def _jobs_for(user):
+    """Superadmin : toutes ; admin : celles de son organisation ; sinon : les siennes."""
+    qs = Job.objects.select_related("created_by")
+    if user.role == user.Roles.SUPERADMIN:
+        return qs
+    if user.role == user.Roles.ADMIN:
+        return qs.filter(organization_id=user.organization_id)
+    return qs.filter(created_by=user)
+
+
+@login_required
+def job_list(request):
+    qs = _jobs_for(request.user)
+    status = (request.GET.get("status") or "").strip()
+    if status:
+        qs = qs.filter(status=status)
+
+    jobs = list(qs[:100])
+    return render(request, "jobs/job_list.html", {
+        "jobs": jobs,
+        "status": status,
+        "status_choices": Job.Status.choices,
+        "has_pending": any(not j.is_finished for j in jobs),
+    })
+
+
+@login_required
+def job_detail(request, pk: int):
+    job = get_object_or_404(_jobs_for(request.user), pk=pk)
+    return render(request, "jobs/job_detail.html", {"job": job})
+
+
+@login_required
+def job_download(request, pk: int):
+    job = get_object_or_404(_jobs_for(request.user), pk=pk)
+    if job.status != Job.Status.DONE or not job.result_file:
+        raise Http404("Aucun fichier pour cette tâche.")
+    try:
+        handle = job.result_file.open("rb")
+    except FileNotFoundError:
+        raise Http404("Fichier expiré.")
+    return FileResponse(handle, as_attachment=True, filename=job.result_filename)
+
+
+@require_POST
+@login_required
+def job_retry(request, pk: int):
+    job = get_object_or_404(_jobs_for(request.user), pk=pk)
+    if job.created_by_id != request.user.pk and request.user.role != request.user.Roles.SUPERADMIN:
+        return HttpResponseForbidden("Accès refusé.")
+
+    updated = Job.objects.filter(pk=job.pk, status=Job.Status.FAILED).update(
+        status=Job.Status.QUEUED, run_after=timezone.now(), attempts=0, progress=0, finished_at=None,
+    )
+    if updated:
+        messages.success(request, "Tâche remise en file.")
+    else:
+        messages.error(request, "Seule une tâche en échec peut être relancée.")
+    return redirect("job_detail", pk=job.pk)
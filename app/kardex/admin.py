@@ -1,23 +1,80 @@
-from django.contrib import admin
-from .models import Engine, Component, KardexEntry
+from django.contrib import admin, messages
+from django.db.models import Q
+
+from navigabilite.admin_utils import LargeTableAdmin
+from .models import Attachment, Engine, Component, KardexEntry
+
+# Recherche d'évènements par n° de série / PN : composants retenus au plus
+SEARCH_MAX_COMPONENTS = 500
 
 
 @admin.register(Engine)
 class EngineAdmin(admin.ModelAdmin):
     list_display = ("aircraft", "name", "manufacturer", "model", "serial_number", "part_number", "active")
     list_filter = ("active", "manufacturer", "model")
-    search_fields = ("aircraft__registration", "name", "serial_number", "part_number")
+    list_select_related = ("aircraft",)
+    search_fields = ("^serial_number", "^aircraft__registration")
+    autocomplete_fields = ("aircraft",)
+    fieldsets = (
+        (None, {"fields": ("aircraft", "name", "manufacturer", "model", "serial_number", "part_number", "active")}),
+        ("Totaux initiaux", {"fields": ("initial_minutes", "initial_cycles")}),
+        ("Limites (0 = aucune)", {"fields": ("tbo_minutes", "overhaul_at_minutes", "life_limit_minutes", "life_limit_cycles")}),
+    )
 
 
 @admin.register(Component)
-class ComponentAdmin(admin.ModelAdmin):
+class ComponentAdmin(LargeTableAdmin, admin.ModelAdmin):
     list_display = ("name", "category", "manufacturer", "part_number", "serial_number", "status", "current_location_str")
-    list_filter = ("category", "manufacturer", "status")
-    search_fields = ("name", "part_number", "serial_number")
+    # Pas de filtre « constructeur » : SELECT DISTINCT sur toute la table à chaque page
+    list_filter = ("category", "status")
+    # current_location_str : moteur -> aéronef
+    list_select_related = ("installed_aircraft", "installed_engine__aircraft")
+    search_fields = ("^serial_number", "^part_number")
+    search_help_text = "Début du n° de série ou du Part Number."
+    autocomplete_fields = ("installed_aircraft", "installed_engine")
+    # Tri par clé primaire (index) plutôt que par désignation (tri de toute la table)
+    ordering = ("-id",)
 
 
 @admin.register(KardexEntry)
-class KardexEntryAdmin(admin.ModelAdmin):
+class KardexEntryAdmin(LargeTableAdmin, admin.ModelAdmin):
     list_display = ("date", "action", "component", "aircraft", "engine", "position", "at_minutes", "at_cycles", "workorder_ref")
     list_filter = ("action", "date")
-    search_fields = ("component__name", "component__serial_number", "component__part_number", "workorder_ref", "position")
+    list_select_related = ("component", "aircraft", "engine__aircraft")
+    search_fields = ("^workorder_ref",)
+    search_help_text = "Début de la référence OT, du n° de série ou du Part Number du composant."
+    autocomplete_fields = ("component", "aircraft", "engine")
+    raw_id_fields = ("created_by",)
+
+    def get_search_results(self, request, queryset, search_term):
+        # OR sur une jointure = parcours complet des deux tables : les composants
+        # sont cherchés d'abord (index préfixe), puis leurs évènements par id
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        # Liste d'ids plutôt que sous-requête : dans le OR, PostgreSQL ferait de
+        # la sous-requête un filtre ligne à ligne sur tous les évènements
+        component_ids = list(
+            Component.objects.filter(Q(serial_number__istartswith=term) | Q(part_number__istartswith=term))
+            .order_by()
+            .values_list("pk", flat=True)[:SEARCH_MAX_COMPONENTS + 1]
+        )
+        if len(component_ids) > SEARCH_MAX_COMPONENTS:
+            component_ids = component_ids[:SEARCH_MAX_COMPONENTS]
+            self.message_user(
+                request,
+                f"Plus de {SEARCH_MAX_COMPONENTS} composants commencent par « {term} » : seuls les évènements "
+                f"de {SEARCH_MAX_COMPONENTS} d'entre eux sont listés. Précisez le n° de série ou le Part Number.",
+                level=messages.WARNING,
+            )
+        return queryset.filter(Q(workorder_ref__istartswith=term) | Q(component_id__in=component_ids)), False
+
+
+@admin.register(Attachment)
+class AttachmentAdmin(LargeTableAdmin, admin.ModelAdmin):
+    list_display = ("filename", "kind", "component", "blob", "uploaded_by", "created_at")
+    list_filter = ("kind",)
+    list_select_related = ("component", "uploaded_by")
+    search_fields = ("=blob__sha256",)
+    search_help_text = "Empreinte SHA-256 exacte."
+    raw_id_fields = ("component", "entry", "blob", "uploaded_by")
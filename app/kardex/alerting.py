@@ -1,30 +1,113 @@
 from django.db.models import Sum
-from fleet.models import Aircraft
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from fleet.models import Aircraft, FlightLog
+from monitoring.metrics import timed_alerting
+from .cache import levels_cache
 from .models import Component, KardexEntry, Engine, EngineLog
 
 WARN_MINUTES = 10 * 60
 WARN_CYCLES = 50
+WARN_DAYS = 30
 
+# Totaux et TSN / CSN passent par kardex.cache (invalidé par LISTEN/NOTIFY,
+# voir kardex.invalidation) : le niveau d'un composant inchangé ne coûte plus
+# de requête SQL.
 
-def aircraft_current_totals(aircraft: Aircraft):
+
+def _aircraft_totals(aircraft: Aircraft):
     agg = aircraft.logs.aggregate(mins=Sum("duration_minutes"), cyc=Sum("cycles"))
     log_minutes = agg["mins"] or 0
     log_cycles = agg["cyc"] or 0
     total_minutes = aircraft.initial_minutes + log_minutes
     total_cycles = aircraft.initial_cycles + log_cycles
-    return total_minutes, total_cycles
+    return (total_minutes, total_cycles), ()
 
 
-def engine_current_totals(engine: Engine):
+@timed_alerting()
+def aircraft_current_totals(aircraft: Aircraft):
+    return levels_cache.get_or_compute(("aircraft", aircraft.pk), lambda: _aircraft_totals(aircraft))
+
+
+def _aircrafts_totals(aircraft_by_key):
+    """Totaux de plusieurs aéronefs en une requête groupée (voir _engines_totals)."""
+    sums = {
+        row["aircraft_id"]: (row["mins"], row["cyc"])
+        for row in FlightLog.objects.filter(aircraft_id__in=[pk for _kind, pk in aircraft_by_key]).order_by()
+        .values("aircraft_id")
+        .annotate(mins=Coalesce(Sum("duration_minutes"), 0), cyc=Coalesce(Sum("cycles"), 0))
+    }
+    result = {}
+    for key, aircraft in aircraft_by_key.items():
+        log_minutes, log_cycles = sums.get(aircraft.pk, (0, 0))
+        result[key] = ((aircraft.initial_minutes + log_minutes, aircraft.initial_cycles + log_cycles), ())
+    return result
+
+
+@timed_alerting()
+def aircrafts_current_totals(aircraft):
+    """{id aéronef: (minutes, cycles)} ; absents du cache calculés en une requête."""
+    by_key = {("aircraft", a.pk): a for a in aircraft}
+    if not by_key:
+        return {}
+    totals = levels_cache.get_or_compute_many(
+        by_key, lambda missing: _aircrafts_totals({key: by_key[key] for key in missing})
+    )
+    return {pk: value for (_kind, pk), value in totals.items()}
+
+
+def _engine_totals(engine: Engine):
     agg = engine.logs.aggregate(mins=Sum("duration_minutes"), cyc=Sum("cycles"))
     log_minutes = agg["mins"] or 0
     log_cycles = agg["cyc"] or 0
     total_minutes = int(engine.initial_minutes or 0) + log_minutes
     total_cycles = int(engine.initial_cycles or 0) + log_cycles
-    return total_minutes, total_cycles
+    return (total_minutes, total_cycles), ()
 
 
+@timed_alerting()
+def engine_current_totals(engine: Engine):
+    return levels_cache.get_or_compute(("engine", engine.pk), lambda: _engine_totals(engine))
+
+
+def _engines_totals(engines_by_key):
+    """Totaux de plusieurs moteurs en une requête groupée (moteurs sans journal inclus)."""
+    ids = [pk for _kind, pk in engines_by_key]
+    sums = {
+        row["engine_id"]: (row["mins"], row["cyc"])
+        for row in EngineLog.objects.filter(engine_id__in=ids).order_by().values("engine_id")
+        .annotate(mins=Coalesce(Sum("duration_minutes"), 0), cyc=Coalesce(Sum("cycles"), 0))
+    }
+    result = {}
+    for key, engine in engines_by_key.items():
+        log_minutes, log_cycles = sums.get(engine.pk, (0, 0))
+        total = (int(engine.initial_minutes or 0) + log_minutes, int(engine.initial_cycles or 0) + log_cycles)
+        result[key] = (total, ())
+    return result
+
+
+@timed_alerting()
+def engines_current_totals(engines):
+    """
+    {id moteur: (minutes, cycles)} pour une page entière : moteurs absents du
+    cache calculés en une seule requête (et mis en cache), quel que soit leur nombre.
+    """
+    by_key = {("engine", e.pk): e for e in engines}
+    if not by_key:
+        return {}
+    totals = levels_cache.get_or_compute_many(
+        by_key, lambda missing: _engines_totals({key: by_key[key] for key in missing})
+    )
+    return {pk: value for (_kind, pk), value in totals.items()}
+
+
+@timed_alerting(counts_component=True)
 def compute_component_usage(comp: Component):
+    return levels_cache.get_or_compute(("component", comp.pk), lambda: _component_usage(comp))
+
+
+def _component_usage(comp: Component):
+    """(TSN, CSN), dépendances : l'aéronef / moteur de la période d'installation en cours."""
     entries = comp.entries.select_related("aircraft", "engine", "engine__aircraft").order_by("date", "id")
 
     used_minutes = 0
@@ -62,38 +145,36 @@ def compute_component_usage(comp: Component):
             if installed:
                 close_period(e.at_minutes, e.at_cycles)
 
+    depends_on = ()
     if installed:
         end_minutes = None
         end_cycles = None
         if start_target_aircraft:
             end_minutes, end_cycles = aircraft_current_totals(start_target_aircraft)
+            depends_on = (("aircraft", start_target_aircraft.pk),)
         elif start_target_engine:
             end_minutes, end_cycles = engine_current_totals(start_target_engine)
+            depends_on = (("engine", start_target_engine.pk),)
         close_period(end_minutes, end_cycles)
 
     tsn_minutes = int(comp.initial_tsn_minutes or 0) + used_minutes
     csn_cycles = int(comp.initial_csn_cycles or 0) + used_cycles
-    return tsn_minutes, csn_cycles
+    return (tsn_minutes, csn_cycles), depends_on
 
 
-def compute_alert_level(comp: Component, tsn_minutes: int, csn_cycles: int):
+def _limits_level(checks):
+    """checks : [(limite, consommé, marge d'alerte)] ; limite 0 = absente."""
     has_limits = False
     level = "ok"
 
-    if comp.limit_minutes and comp.limit_minutes > 0:
-        has_limits = True
-        rem = int(comp.limit_minutes) - int(tsn_minutes)
-        if rem < 0:
-            return "overdue"
-        if rem <= WARN_MINUTES:
-            level = "warn"
-
-    if comp.limit_cycles and comp.limit_cycles > 0:
+    for limit, used, warn in checks:
+        if not limit or limit <= 0:
+            continue
         has_limits = True
-        rem = int(comp.limit_cycles) - int(csn_cycles)
+        rem = int(limit) - int(used)
         if rem < 0:
             return "overdue"
-        if rem <= WARN_CYCLES:
+        if rem <= warn:
             level = "warn"
 
     if not has_limits:
@@ -102,6 +183,46 @@ def compute_alert_level(comp: Component, tsn_minutes: int, csn_cycles: int):
     return level
 
 
+def _date_level(limit_date, today=None):
+    rem = (limit_date - (today or timezone.localdate())).days
+    if rem < 0:
+        return "overdue"
+    return "warn" if rem <= WARN_DAYS else "ok"
+
+
+@timed_alerting()
+def compute_alert_level(comp: Component, tsn_minutes: int, csn_cycles: int):
+    # Heures, cycles, calendrier : la première limite atteinte l'emporte
+    level = _limits_level([
+        (comp.limit_minutes, tsn_minutes, WARN_MINUTES),
+        (comp.limit_cycles, csn_cycles, WARN_CYCLES),
+    ])
+    if comp.limit_date:
+        level = aggregate_levels([level, _date_level(comp.limit_date)])
+    return level
+
+
+def engine_remaining(engine: Engine, total_minutes: int, total_cycles: int):
+    """Potentiels restants {"tbo", "life_minutes", "life_cycles"} (None si pas de limite)."""
+    tso = int(total_minutes) - int(engine.overhaul_at_minutes or 0)
+    return {
+        "tbo": int(engine.tbo_minutes) - tso if engine.tbo_minutes else None,
+        "life_minutes": int(engine.life_limit_minutes) - int(total_minutes) if engine.life_limit_minutes else None,
+        "life_cycles": int(engine.life_limit_cycles) - int(total_cycles) if engine.life_limit_cycles else None,
+    }
+
+
+@timed_alerting()
+def engine_level(engine: Engine, total_minutes: int, total_cycles: int):
+    """Niveau d'un moteur : TBO (depuis la dernière révision) et limites de vie."""
+    return _limits_level([
+        (engine.tbo_minutes, int(total_minutes) - int(engine.overhaul_at_minutes or 0), WARN_MINUTES),
+        (engine.life_limit_minutes, total_minutes, WARN_MINUTES),
+        (engine.life_limit_cycles, total_cycles, WARN_CYCLES),
+    ])
+
+
+@timed_alerting()
 def component_level(comp: Component):
     tsn, csn = compute_component_usage(comp)
     return compute_alert_level(comp, tsn, csn)
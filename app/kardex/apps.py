@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class KardexConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kardex'
+
+    def ready(self):
+        # Cache des calculs (kardex.cache) : actif seulement si l'écoute des
+        # invalidations (LISTEN/NOTIFY) est établie dans le process
+        from . import attachments, invalidation
+        from .cache import levels_cache
+
+        levels_cache.enabled = invalidation.listening
+        invalidation.connect_signals()
+        attachments.connect_signals()
@@ -0,0 +1,293 @@
+"""
+Pièces jointes du kardex (Form 1, OT, factures) : stockage adressé par contenu.
+
+Un fichier = ATTACHMENTS_ROOT/ab/cd/<sha256>, écrit une seule fois quel que
+soit le nombre de pièces jointes qui le référencent (AttachmentBlob). Le même
+Form 1 joint à dix évènements n'occupe la place qu'une fois.
+
+Envoi : HashingUploadHandler écrit le corps de la requête directement dans
+ATTACHMENTS_ROOT/tmp en calculant le SHA-256 au fil des morceaux, puis le
+fichier est renommé à sa place (même système de fichiers, pas de copie),
+avec les droits FILE_UPLOAD_PERMISSIONS.
+Jamais plus d'un morceau (64 Ko) en mémoire.
+
+Téléchargement : requêtes Range (reprise, visionneuse PDF page par page),
+ETag = empreinte. Derrière nginx (ATTACHMENTS_ACCEL_REDIRECT), nginx envoie
+le fichier et gère lui-même les Range.
+
+Suppression : le contenu est effacé quand plus aucune pièce jointe ne le
+référence (release, sous verrou de la ligne AttachmentBlob : un envoi
+concurrent du même contenu attend et réécrit le fichier).
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+from .models import Attachment, AttachmentBlob
+
+CHUNK_SIZE = 64 * 1024
+# Affichés dans le navigateur ; tout le reste est proposé au téléchargement
+INLINE_TYPES = {"application/pdf", "image/jpeg", "image/png"}
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def root():
+    return Path(settings.ATTACHMENTS_ROOT)
+
+
+def blob_path(sha256):
+    return root() / sha256[:2] / sha256[2:4] / sha256
+
+
+def _tmp_dir():
+    path = root() / "tmp"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def max_bytes():
+    return getattr(settings, "ATTACHMENT_MAX_MB", 100) * 1024 * 1024
+
+
+def allowed_extension(filename):
+    ext = os.path.splitext(filename)[1].lower().lstrip(".")
+    return ext in getattr(settings, "ATTACHMENT_EXTENSIONS", ())
+
+
+# ---------------------------------------------------------------------------
+# Envoi
+# ---------------------------------------------------------------------------
+
+class HashedUploadedFile(UploadedFile):
+    """Fichier reçu, déjà sur disque dans ATTACHMENTS_ROOT/tmp, empreinte calculée."""
+
+    def __init__(self, file, name, content_type, size, charset, content_type_extra, sha256):
+        super().__init__(file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        # Toujours là si l'envoi n'a pas été stocké (formulaire invalide)
+        super().close()
+        try:
+            os.unlink(self.file.name)
+        except FileNotFoundError:
+            pass
+
+
+class HashingUploadHandler(FileUploadHandler):
+    """
+    Gestionnaire d'envoi des pièces jointes : disque direct + SHA-256 en continu.
+    Au-delà de ATTACHMENT_MAX_MB, l'envoi est abandonné (request.attachment_error).
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.file = tempfile.NamedTemporaryFile(dir=_tmp_dir(), prefix="up-", delete=False)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > max_bytes():
+            self.file.close()
+            os.unlink(self.file.name)
+            self.request.attachment_error = f"Fichier trop lourd (max {max_bytes() // (1024 * 1024)} Mo)."
+            raise StopUpload(connection_reset=False)
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.seek(0)
+        return HashedUploadedFile(
+            self.file, self.file_name, self.content_type, file_size, self.charset,
+            self.content_type_extra, self.digest.hexdigest(),
+        )
+
+
+def _spool(uploaded):
+    """Autre origine (admin, script) : recopie par morceaux dans tmp en calculant l'empreinte."""
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(dir=_tmp_dir(), prefix="up-", delete=False) as out:
+        for chunk in uploaded.chunks(CHUNK_SIZE):
+            digest.update(chunk)
+            out.write(chunk)
+        out.flush()
+        os.fsync(out.fileno())
+    return out.name, digest.hexdigest(), os.path.getsize(out.name)
+
+
+def _lock_blob(sha256, size):
+    """Ligne AttachmentBlob créée si besoin et verrouillée jusqu'à la fin de la transaction."""
+    while True:
+        AttachmentBlob.objects.get_or_create(sha256=sha256, defaults={"size": size})
+        blob = AttachmentBlob.objects.select_for_update().filter(pk=sha256).first()
+        if blob is not None:
+            return blob
+        # Supprimée entre les deux (release concurrent) : on recrée
+
+
+def attach(component, uploaded, *, kind, entry=None, user=None):
+    """Stocke le contenu (une fois) et crée la pièce jointe. Réutilise le fichier si déjà connu."""
+    if isinstance(uploaded, HashedUploadedFile):
+        tmp_path, sha256, size = uploaded.temporary_file_path(), uploaded.sha256, uploaded.size
+    else:
+        tmp_path, sha256, size = _spool(uploaded)
+
+    filename = os.path.basename(uploaded.name or "document")[:255]
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    with transaction.atomic():
+        blob = _lock_blob(sha256, size)
+        path = blob_path(sha256)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # NamedTemporaryFile crée en 0600 : nginx (ATTACHMENTS_ACCEL_REDIRECT) doit pouvoir lire,
+        # mêmes droits que FileSystemStorage
+        os.chmod(tmp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+        # Même contenu, même nom : remplacer un fichier existant ne change rien
+        os.replace(tmp_path, path)
+        return Attachment.objects.create(
+            component=component, entry=entry, blob=blob, kind=kind,
+            filename=filename, content_type=content_type, uploaded_by=user,
+        )
+
+
+def release(sha256):
+    """Efface le contenu s'il n'est plus référencé. True si effacé."""
+    with transaction.atomic():
+        blob = AttachmentBlob.objects.select_for_update().filter(pk=sha256).first()
+        if blob is None or blob.attachments.exists():
+            return False
+        blob.delete()
+        blob_path(sha256).unlink(missing_ok=True)
+    return True
+
+
+def _on_delete(sender, instance, **kwargs):
+    sha256 = instance.blob_id
+    transaction.on_commit(lambda: release(sha256))
+
+
+def connect_signals():
+    """Pièce jointe supprimée (vue, admin, cascade du composant) : contenu libéré après commit."""
+    from django.db.models.signals import post_delete
+
+    post_delete.connect(_on_delete, sender=Attachment, dispatch_uid="kardex_attachment_release")
+
+
+def collect_garbage(max_age_seconds=86400):
+    """
+    Contenus orphelins (libération manquée : process arrêté entre le commit
+    et release), fichiers sans ligne AttachmentBlob (transaction annulée après
+    écriture) et envois temporaires abandonnés. Fichiers de moins de
+    max_age_seconds épargnés : leur transaction peut être en cours.
+    Renvoie le nombre de fichiers effacés.
+    """
+    removed = 0
+    for sha256 in AttachmentBlob.objects.filter(attachments__isnull=True).values_list("sha256", flat=True):
+        removed += release(sha256)
+
+    limit = time.time() - max_age_seconds
+    known = set(AttachmentBlob.objects.values_list("sha256", flat=True))
+    for path in root().glob("??/??/*"):
+        if path.name not in known and path.stat().st_mtime < limit:
+            path.unlink(missing_ok=True)
+            removed += 1
+
+    for path in _tmp_dir().iterdir():
+        if path.stat().st_mtime < limit:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+# ---------------------------------------------------------------------------
+# Téléchargement
+# ---------------------------------------------------------------------------
+
+def _parse_range(header, size):
+    """(début, fin incluse) ; None : ignorer l'en-tête ; "invalid" : hors du fichier (416)."""
+    m = _RANGE_RE.match(header.strip())
+    if not m or (not m[1] and not m[2]):
+        return None  # plages multiples ou syntaxe inconnue : réponse complète
+    if not m[1]:
+        length = int(m[2])  # bytes=-N : N derniers octets
+        if length == 0:
+            return "invalid"
+        return max(size - length, 0), size - 1
+    start = int(m[1])
+    end = min(int(m[2]), size - 1) if m[2] else size - 1
+    if start >= size or start > end:
+        return "invalid"
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve(request, attachment):
+    """Réponse de téléchargement : complète (sendfile), partielle (206) ou 304."""
+    sha256, size = attachment.blob_id, attachment.blob.size
+    etag = f'"{sha256}"'
+    if request.headers.get("If-None-Match") == etag:
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    inline = attachment.content_type in INLINE_TYPES
+    prefix = getattr(settings, "ATTACHMENTS_ACCEL_REDIRECT", "")
+    path = blob_path(sha256)
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and request.headers.get("If-Range", etag) == etag:
+        byte_range = _parse_range(range_header, size)
+
+    if prefix:
+        response = HttpResponse(content_type=attachment.content_type)
+        response["X-Accel-Redirect"] = prefix + str(path.relative_to(root()))
+    elif byte_range == "invalid":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end - start + 1), status=206, content_type=attachment.content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    else:
+        try:
+            response = FileResponse(open(path, "rb"), content_type=attachment.content_type)
+        except FileNotFoundError:
+            raise Http404("Fichier introuvable.")
+
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    response["Content-Disposition"] = content_disposition_header(not inline, attachment.filename)
+    return response
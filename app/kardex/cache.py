@@ -0,0 +1,135 @@
+"""
+Cache en mémoire (par process) des calculs de navigabilité : totaux aéronef
+/ moteur et TSN / CSN des composants (kardex.alerting).
+
+Clés : ("aircraft", id), ("engine", id), ("component", id). Une entrée
+composant dépend aussi de l'aéronef ou du moteur qui la porte (période
+d'installation ouverte) : invalider l'aéronef invalide ses composants.
+
+Cohérence entre workers et machines : chaque écriture en base émet un NOTIFY
+(triggers, migration kardex.0009) reçu par le thread d'écoute de chaque
+process (kardex.invalidation), qui évince les entrées concernées. Pas de TTL :
+tant que l'écoute n'est pas établie (démarrage, coupure), le cache n'est ni
+lu ni alimenté.
+"""
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from monitoring.metrics import record_cache
+
+
+class LocalCache:
+    def __init__(self, name, max_entries):
+        self.name = name
+        self.max_entries = max_entries
+        self._data = OrderedDict()          # clé -> valeur (ordre LRU)
+        self._dependents = {}               # clé dont on dépend -> {clés dépendantes}
+        self._lock = threading.Lock()
+        # Incrémenté à chaque éviction : un calcul commencé avant n'est pas
+        # stocké (il a pu lire l'état d'avant l'écriture).
+        self._epoch = 0
+        self._local = threading.local()
+        # Remplacé au démarrage par kardex.invalidation.listening
+        self.enabled = lambda: False
+
+    def __len__(self):
+        return len(self._data)
+
+    @contextmanager
+    def bypass(self):
+        """Calcul direct, sans lire ni alimenter le cache (benchmarks, contrôles)."""
+        previous = getattr(self._local, "bypass", False)
+        self._local.bypass = True
+        try:
+            yield
+        finally:
+            self._local.bypass = previous
+
+    def get_or_compute(self, key, compute):
+        """
+        compute() -> (valeur, dépendances) ; dépendances : clés dont l'éviction
+        doit aussi évincer key.
+        """
+        if getattr(self._local, "bypass", False) or not self.enabled():
+            return compute()[0]
+
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                value = self._data[key]
+                hit = True
+            else:
+                epoch = self._epoch
+                hit = False
+        record_cache(self.name, hit)
+        if hit:
+            return value
+
+        value, depends_on = compute()
+        with self._lock:
+            if epoch == self._epoch:
+                self._data[key] = value
+                for dep in depends_on:
+                    self._dependents.setdefault(dep, set()).add(key)
+                while len(self._data) > self.max_entries:
+                    # _dependents gardé : l'éviction d'un aéronef sorti du LRU
+                    # doit encore atteindre ses composants
+                    self._data.popitem(last=False)
+        return value
+
+    def get_or_compute_many(self, keys, compute_many):
+        """
+        Variante groupée : compute_many(clés absentes) -> {clé: (valeur,
+        dépendances)}, appelé une seule fois pour toutes les absentes.
+        Retourne {clé: valeur}.
+        """
+        keys = list(keys)
+        if getattr(self._local, "bypass", False) or not self.enabled():
+            return {key: value for key, (value, _deps) in compute_many(keys).items()}
+
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._data:
+                    self._data.move_to_end(key)
+                    found[key] = self._data[key]
+            epoch = self._epoch
+        for key in keys:
+            record_cache(self.name, key in found)
+        missing = [key for key in keys if key not in found]
+        if not missing:
+            return found
+
+        computed = compute_many(missing)
+        with self._lock:
+            if epoch == self._epoch:
+                for key, (value, depends_on) in computed.items():
+                    self._data[key] = value
+                    for dep in depends_on:
+                        self._dependents.setdefault(dep, set()).add(key)
+                while len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+        found.update((key, value) for key, (value, _deps) in computed.items())
+        return found
+
+    def evict(self, keys):
+        """Évince keys et, récursivement, les entrées qui en dépendent."""
+        with self._lock:
+            self._epoch += 1
+            pending = list(keys)
+            while pending:
+                key = pending.pop()
+                self._data.pop(key, None)
+                pending.extend(self._dependents.pop(key, ()))
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._data.clear()
+            self._dependents.clear()
+
+
+levels_cache = LocalCache("alerting", getattr(settings, "ALERTING_CACHE_MAX_ENTRIES", 50000))
@@ -1,5 +1,8 @@
 from django import forms
-from .models import KardexEntry, EngineLog, Component
+
+from autocomplete.widgets import autocomplete_field
+from . import attachments
+from .models import Attachment, KardexEntry, EngineLog, Component
 
 
 def _parse_hhmm_to_minutes_allow_zero(value: str) -> int:
@@ -53,6 +56,15 @@ class KardexEntryForm(forms.ModelForm):
             "at_cycles": forms.NumberInput(attrs={"min": 0}),
         }
 
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop("user", None)
+        super().__init__(*args, **kwargs)
+
+        # Cibles limitées à l'organisation (toutes pour le superadmin), chargées à la frappe
+        if user:
+            autocomplete_field(self, "aircraft", "aircraft", user)
+            autocomplete_field(self, "engine", "engine", user)
+
     def clean_at_hhmm(self):
         return _parse_hhmm_to_minutes_allow_zero(self.cleaned_data.get("at_hhmm"))
 
@@ -120,6 +132,7 @@ class ComponentForm(forms.ModelForm):
             "initial_csn_cycles",
             "limit_minutes",
             "limit_cycles",
+            "limit_date",
             "status",
         ]
         widgets = {
@@ -128,9 +141,32 @@ class ComponentForm(forms.ModelForm):
             "initial_csn_cycles": forms.NumberInput(attrs={"min": 0}),
             "limit_minutes": forms.NumberInput(attrs={"min": 0}),
             "limit_cycles": forms.NumberInput(attrs={"min": 0}),
+            "limit_date": forms.DateInput(attrs={"type": "date"}, format="%Y-%m-%d"),
         }
 
     def clean_ata(self):
         ata = (self.cleaned_data.get("ata") or "").strip()
         # On tolère vide. Sinon on normalise un peu.
         return ata
+
+
+class AttachmentForm(forms.ModelForm):
+    file = forms.FileField(label="Fichier")
+
+    class Meta:
+        model = Attachment
+        fields = ["kind", "entry"]
+
+    def __init__(self, *args, **kwargs):
+        component = kwargs.pop("component")
+        super().__init__(*args, **kwargs)
+        # Évènements du composant seulement (quelques dizaines au plus)
+        self.fields["entry"].queryset = component.entries.all()
+        self.fields["entry"].label_from_instance = lambda e: f"{e.date} · {e.get_action_display()}"
+        self.fields["entry"].required = False
+
+    def clean_file(self):
+        f = self.cleaned_data["file"]
+        if not attachments.allowed_extension(f.name):
+            raise forms.ValidationError("Type de fichier non accepté (PDF, images, documents bureautiques).")
+        return f
@@ -0,0 +1,177 @@
+"""
+Bus d'invalidation du cache kardex.cache entre workers / machines.
+
+Émission : triggers PostgreSQL (migration kardex.0009) sur les tables dont
+dépendent les calculs. Chaque écriture fait pg_notify('nav_cache',
+'<type>:<id>') après commit : aircraft (journal de vol, visites, aéronef),
+engine (journal moteur, moteur), component (kardex, composant). Couvre
+save(), update(), bulk_create() et le SQL brut ; PostgreSQL fusionne les
+messages identiques d'une même transaction (un import de 10 000 vols d'un
+aéronef = un message).
+
+Réception : un thread par process, sur sa propre connexion (hors pool),
+LISTEN nav_cache puis éviction des clés reçues. Connexion perdue : cache
+vidé et désactivé jusqu'à la reconnexion (des messages ont pu être manqués).
+
+Le process qui écrit évince aussi ses propres entrées au commit (signaux),
+sans attendre l'aller-retour du NOTIFY : la page affichée juste après une
+saisie est à jour.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .cache import levels_cache
+
+logger = logging.getLogger("kardex.invalidation")
+
+CHANNEL = "nav_cache"
+KINDS = {"aircraft", "engine", "component"}
+
+_state = {"pid": None, "thread": None}
+_listening = threading.Event()
+_start_lock = threading.Lock()
+
+# Abonnés du process (flux SSE, fleet.live) : reçoivent chaque clé après éviction
+_subscribers = set()
+_subscribers_lock = threading.Lock()
+# Reçu par les abonnés à la (re)connexion du bus : des messages ont pu être manqués
+RESYNC = ("resync", 0)
+
+
+def parse_payload(payload):
+    """'aircraft:12' -> ("aircraft", 12) ; None si message inconnu."""
+    kind, _, raw_id = payload.partition(":")
+    if kind not in KINDS:
+        return None
+    try:
+        return kind, int(raw_id)
+    except ValueError:
+        return None
+
+
+def _publish(key):
+    with _subscribers_lock:
+        subscribers = list(_subscribers)
+    for q in subscribers:
+        q.put_nowait(key)
+
+
+def handle_payload(payload):
+    key = parse_payload(payload)
+    if key is not None:
+        levels_cache.evict([key])
+        _publish(key)
+
+
+def subscribe():
+    """File (queue.Queue) des clés invalidées dans ce process ; démarre l'écoute si besoin."""
+    ensure_listener()
+    q = queue.Queue()
+    with _subscribers_lock:
+        _subscribers.add(q)
+    return q
+
+
+def unsubscribe(q):
+    with _subscribers_lock:
+        _subscribers.discard(q)
+
+
+def _listen_forever(params):
+    import psycopg
+
+    backoff = 1
+    while True:
+        try:
+            with psycopg.connect(**params, autocommit=True) as conn:
+                conn.execute(f"LISTEN {CHANNEL}")
+                # Messages possiblement manqués avant l'écoute : on repart à vide
+                levels_cache.clear()
+                _listening.set()
+                _publish(RESYNC)
+                backoff = 1
+                while True:
+                    for notify in conn.notifies(timeout=30):
+                        handle_payload(notify.payload)
+                    conn.execute("SELECT 1")  # connexion toujours vivante ?
+        except Exception:
+            logger.warning("Écoute %s interrompue, reconnexion dans %ss", CHANNEL, backoff, exc_info=True)
+        _listening.clear()
+        levels_cache.clear()
+        time.sleep(backoff)
+        backoff = min(backoff * 2, 60)
+
+
+def ensure_listener():
+    """Démarre le thread d'écoute du process courant (une fois par pid : fork gunicorn)."""
+    pid = os.getpid()
+    if _state["pid"] == pid:
+        return
+    with _start_lock:
+        if _state["pid"] == pid:
+            return
+        # Dans un enfant forké, l'écoute du parent n'existe pas
+        _listening.clear()
+        levels_cache.clear()
+        conn = connections["default"]
+        if conn.vendor != "postgresql":
+            _state["pid"] = pid
+            return
+        params = conn.get_connection_params()
+        params.pop("cursor_factory", None)
+        params.pop("context", None)
+        thread = threading.Thread(target=_listen_forever, args=(params,), name="nav-cache-listener", daemon=True)
+        thread.start()
+        _state.update(pid=pid, thread=thread)
+
+
+def listening():
+    """Cache utilisable : écoute établie dans ce process (démarrée au premier appel)."""
+    if not getattr(settings, "ALERTING_CACHE_ENABLED", True):
+        return False
+    ensure_listener()
+    return _listening.is_set()
+
+
+def evict_on_commit(keys):
+    """Éviction locale immédiate après commit (l'écho NOTIFY arrive ensuite)."""
+    keys = list(keys)
+    transaction.on_commit(lambda: levels_cache.evict(keys))
+
+
+# Modèle -> (type de clé, attribut portant l'id) : mêmes tables que les triggers
+_WATCHED = {}
+
+
+def _on_write(sender, instance, **kwargs):
+    kind, attr = _WATCHED[sender]
+    object_id = getattr(instance, attr, None)
+    if object_id is not None:
+        evict_on_commit([(kind, object_id)])
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save
+
+    from fleet.models import Aircraft, FlightLog, VisitRule
+    from .models import Component, Engine, EngineLog, KardexEntry
+
+    _WATCHED.update({
+        FlightLog: ("aircraft", "aircraft_id"),
+        VisitRule: ("aircraft", "aircraft_id"),
+        Aircraft: ("aircraft", "pk"),
+        EngineLog: ("engine", "engine_id"),
+        Engine: ("engine", "pk"),
+        KardexEntry: ("component", "component_id"),
+        Component: ("component", "pk"),
+    })
+    for model in _WATCHED:
+        label = model._meta.label_lower
+        post_save.connect(_on_write, sender=model, dispatch_uid=f"kardex_cache_save_{label}")
+        post_delete.connect(_on_write, sender=model, dispatch_uid=f"kardex_cache_delete_{label}")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from kardex.attachments import collect_garbage
+
+
+class Command(BaseCommand):
+    help = (
+        "Efface les contenus de pièces jointes plus référencés, les fichiers sans "
+        "ligne AttachmentBlob et les envois temporaires abandonnés."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Âge minimal des fichiers sans ligne (défaut : 24)")
+
+    def handle(self, *args, **opts):
+        removed = collect_garbage(max_age_seconds=opts["hours"] * 3600)
+        self.stdout.write(self.style.SUCCESS(f"{removed} fichier(s) effacé(s)."))
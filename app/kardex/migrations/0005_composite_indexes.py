@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0004_composite_indexes'),
+        ('kardex', '0004_component_ata_alter_component_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['status', 'ata'], name='kardex_comp_status_ata_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(condition=models.Q(('status', 'installed')), fields=['ata'], name='kardex_comp_installed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enginelog',
+            index=models.Index(fields=['engine', '-date', '-id'], include=('duration_minutes', 'cycles'), name='kardex_elog_engine_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kardexentry',
+            index=models.Index(fields=['component', 'date', 'id'], name='kardex_entry_comp_date_idx'),
+        ),
+        # Index composites d'abord, puis suppression des index simples qu'ils couvrent
+        migrations.AlterField(
+            model_name='enginelog',
+            name='engine',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='logs', to='kardex.engine'),
+        ),
+        migrations.AlterField(
+            model_name='kardexentry',
+            name='component',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='kardex.component'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from navigabilite.db import partitioning
+
+
+def forwards(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        partitioning.partition_by_year(cursor, "kardex_enginelog")
+
+
+def backwards(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        partitioning.unpartition(cursor, "kardex_enginelog")
+
+
+class Migration(migrations.Migration):
+    """Journal moteur partitionné par année, comme fleet.0005 (PK en base : (id, date))."""
+
+    dependencies = [
+        ("kardex", "0005_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
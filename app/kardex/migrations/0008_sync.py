@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kardex', '0007_log_compaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='sync_xid',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# (table, type de clé, colonne portant l'id) : voir kardex.invalidation
+WATCHED = [
+    ("fleet_flightlog", "aircraft", "aircraft_id"),
+    ("fleet_visitrule", "aircraft", "aircraft_id"),
+    ("fleet_aircraft", "aircraft", "id"),
+    ("kardex_enginelog", "engine", "engine_id"),
+    ("kardex_engine", "engine", "id"),
+    ("kardex_kardexentry", "component", "component_id"),
+    ("kardex_component", "component", "id"),
+]
+
+FUNCTION = """
+CREATE OR REPLACE FUNCTION nav_cache_notify() RETURNS trigger AS $$
+DECLARE
+    new_id text;
+    old_id text;
+BEGIN
+    -- TG_ARGV[0] : type de clé, TG_ARGV[1] : colonne de l'id
+    IF TG_OP <> 'DELETE' THEN
+        new_id := to_jsonb(NEW) ->> TG_ARGV[1];
+        IF new_id IS NOT NULL THEN
+            PERFORM pg_notify('nav_cache', TG_ARGV[0] || ':' || new_id);
+        END IF;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        old_id := to_jsonb(OLD) ->> TG_ARGV[1];
+        IF old_id IS NOT NULL AND old_id IS DISTINCT FROM new_id THEN
+            PERFORM pg_notify('nav_cache', TG_ARGV[0] || ':' || old_id);
+        END IF;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGER = """
+CREATE TRIGGER {table}_cache_notify AFTER INSERT OR UPDATE OR DELETE ON {table}
+    FOR EACH ROW EXECUTE FUNCTION nav_cache_notify('{kind}', '{column}');
+"""
+
+DROP_TRIGGER = "DROP TRIGGER IF EXISTS {table}_cache_notify ON {table};"
+
+
+class Migration(migrations.Migration):
+    """
+    NOTIFY nav_cache '<type>:<id>' à chaque écriture (délivré au commit, messages
+    identiques fusionnés par transaction). Sur les tables partitionnées, le
+    trigger est cloné sur chaque partition, y compris celles créées ensuite.
+    """
+
+    dependencies = [
+        ("kardex", "0008_sync"),
+        ("fleet", "0008_sync_triggers"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            FUNCTION + "".join(TRIGGER.format(table=t, kind=k, column=c) for t, k, c in WATCHED),
+            "".join(DROP_TRIGGER.format(table=t) for t, _k, _c in WATCHED)
+            + "DROP FUNCTION IF EXISTS nav_cache_notify();",
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:43
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0009_autocomplete_indexes'),
+        ('kardex', '0009_cache_invalidation_triggers'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='engine',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('serial_number'), name='text_pattern_ops'), name='kardex_engine_sn_prefix_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:51
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0009_autocomplete_indexes'),
+        ('kardex', '0011_attachments'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('serial_number'), name='text_pattern_ops'), name='kardex_comp_sn_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('part_number'), name='text_pattern_ops'), name='kardex_comp_pn_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kardexentry',
+            index=models.Index(fields=['date', 'id'], name='kardex_entry_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='kardexentry',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('workorder_ref'), name='text_pattern_ops'), name='kardex_entry_wo_prefix_idx'),
+        ),
+    ]
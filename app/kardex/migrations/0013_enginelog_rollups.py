@@ -0,0 +1,47 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Fonction nav_log_rollup() : migration fleet.0010_log_rollups
+TRIGGER = """
+CREATE TRIGGER kardex_enginelog_rollup AFTER INSERT OR UPDATE OR DELETE ON kardex_enginelog
+    FOR EACH ROW EXECUTE FUNCTION nav_log_rollup('kardex_enginelogmonth', 'engine_id');
+"""
+
+BACKFILL = """
+INSERT INTO kardex_enginelogmonth (engine_id, month, minutes, cycles, entries)
+SELECT engine_id, date_trunc('month', date)::date, SUM(duration_minutes), SUM(cycles), COUNT(*)
+FROM kardex_enginelog WHERE NOT is_summary GROUP BY 1, 2;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kardex', '0012_admin_search_indexes'),
+        ('fleet', '0010_log_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngineLogMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Mois')),
+                ('minutes', models.BigIntegerField(default=0, verbose_name='Minutes')),
+                ('cycles', models.BigIntegerField(default=0, verbose_name='Cycles')),
+                ('entries', models.IntegerField(default=0, verbose_name='Lignes')),
+                ('engine', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='log_months', to='kardex.engine')),
+            ],
+            options={
+                'ordering': ['month'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='enginelogmonth',
+            constraint=models.UniqueConstraint(fields=('engine', 'month'), name='kardex_elog_month_uniq'),
+        ),
+        migrations.RunSQL(TRIGGER + BACKFILL, "DROP TRIGGER IF EXISTS kardex_enginelog_rollup ON kardex_enginelog;"),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.6 on 2026-10-19 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kardex', '0013_enginelog_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='engine',
+            name='life_limit_cycles',
+            field=models.PositiveIntegerField(default=0, verbose_name='Limite de vie (cycles)'),
+        ),
+        migrations.AddField(
+            model_name='engine',
+            name='life_limit_minutes',
+            field=models.PositiveIntegerField(default=0, verbose_name='Limite de vie (minutes)'),
+        ),
+        migrations.AddField(
+            model_name='engine',
+            name='overhaul_at_minutes',
+            field=models.PositiveIntegerField(default=0, verbose_name='Total moteur à la dernière révision (minutes)'),
+        ),
+        migrations.AddField(
+            model_name='engine',
+            name='tbo_minutes',
+            field=models.PositiveIntegerField(default=0, verbose_name='TBO (minutes)'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-19 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0012_calendar_due'),
+        ('kardex', '0014_engine_limits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='component',
+            name='limit_date',
+            field=models.DateField(blank=True, null=True, verbose_name='Limite calendaire'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(condition=models.Q(('limit_date__isnull', False), models.Q(('status', 'scrapped'), _negated=True)), fields=['limit_date'], name='kardex_comp_limit_date_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.6 on 2026-10-19 07:19
+
+from django.db import migrations, models
+
+# nav_sync_touch() : fleet.0008 ; pas de trace de suppression (le delta ne renvoie pas les lignes moteur)
+TRIGGER = """
+CREATE TRIGGER kardex_enginelog_sync_touch BEFORE INSERT OR UPDATE ON kardex_enginelog
+    FOR EACH ROW EXECUTE FUNCTION nav_sync_touch();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0008_sync_triggers'),
+        ('kardex', '0015_calendar_limit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enginelog',
+            name='sync_xid',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='enginelog',
+            index=models.Index(fields=['sync_xid', 'engine'], name='kardex_elog_sync_idx'),
+        ),
+        migrations.RunSQL(TRIGGER, "DROP TRIGGER IF EXISTS kardex_enginelog_sync_touch ON kardex_enginelog;"),
+    ]
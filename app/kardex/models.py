@@ -1,7 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import OpClass
+from django.db.models.functions import Upper
 from django.core.exceptions import ValidationError
-from fleet.models import Aircraft
+from fleet.models import Aircraft, LogArchiveBase, MonthlyUsageBase
 
 
 class Engine(models.Model):
@@ -17,6 +19,13 @@ class Engine(models.Model):
     initial_minutes = models.PositiveIntegerField("Heures initiales (minutes)", default=0)
     initial_cycles = models.PositiveIntegerField("Cycles initiaux", default=0)
 
+    # Limites (0 = pas de limite). TBO compté depuis la dernière révision
+    # générale (TSO = total - overhaul_at_minutes), potentiel calendaire hors champ.
+    tbo_minutes = models.PositiveIntegerField("TBO (minutes)", default=0)
+    overhaul_at_minutes = models.PositiveIntegerField("Total moteur à la dernière révision (minutes)", default=0)
+    life_limit_minutes = models.PositiveIntegerField("Limite de vie (minutes)", default=0)
+    life_limit_cycles = models.PositiveIntegerField("Limite de vie (cycles)", default=0)
+
     active = models.BooleanField(default=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -24,6 +33,10 @@ class Engine(models.Model):
 
     class Meta:
         ordering = ["aircraft__registration", "id"]
+        indexes = [
+            # Autocomplétion par n° de série (la recherche par immatriculation passe par Aircraft)
+            models.Index(OpClass(Upper("serial_number"), name="text_pattern_ops"), name="kardex_engine_sn_prefix_idx"),
+        ]
 
     def __str__(self):
         base = self.name or "Moteur"
@@ -32,22 +45,60 @@ class Engine(models.Model):
 
 class EngineLog(models.Model):
     """Journal moteur : totalise heures/cycles moteur indépendamment de la cellule."""
-    engine = models.ForeignKey(Engine, on_delete=models.CASCADE, related_name="logs")
+    # Pas d'index simple : couvert par kardex_elog_engine_date_idx (engine en tête)
+    engine = models.ForeignKey(Engine, on_delete=models.CASCADE, related_name="logs", db_index=False)
     date = models.DateField("Date")
     duration_minutes = models.PositiveIntegerField("Durée (minutes)")
     cycles = models.PositiveSmallIntegerField("Cycles", default=0)
     remarks = models.TextField("Remarques", blank=True)
 
+    # Ligne de synthèse d'une année compactée (voir EngineLogArchive)
+    is_summary = models.BooleanField(default=False)
+
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Transaction de la dernière écriture (trigger SQL) : niveaux composants du delta fleet.sync
+    sync_xid = models.BigIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-date", "-id"]
+        indexes = [
+            # Même principe que FlightLog : ordre d'affichage + SUM en index-only scan
+            models.Index(
+                fields=["engine", "-date", "-id"],
+                include=["duration_minutes", "cycles"],
+                name="kardex_elog_engine_date_idx",
+            ),
+            # Moteurs ayant volé depuis le curseur : index-only scan
+            models.Index(fields=["sync_xid", "engine"], name="kardex_elog_sync_idx"),
+        ]
 
     def __str__(self):
         return f"{self.engine} {self.date} {self.duration_minutes} min / {self.cycles} cy"
 
 
+class EngineLogArchive(LogArchiveBase):
+    engine = models.ForeignKey(Engine, on_delete=models.CASCADE, related_name="log_archives")
+
+    class Meta(LogArchiveBase.Meta):
+        unique_together = [("engine", "year")]
+
+    def __str__(self):
+        return f"{self.engine} {self.year} ({self.row_count} lignes archivées)"
+
+
+class EngineLogMonth(MonthlyUsageBase):
+    engine = models.ForeignKey(Engine, on_delete=models.CASCADE, related_name="log_months", db_index=False)
+
+    class Meta(MonthlyUsageBase.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=["engine", "month"], name="kardex_elog_month_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.engine_id} {self.month:%Y-%m} {self.minutes} min / {self.cycles} cy"
+
+
 class Component(models.Model):
     class Category(models.TextChoices):
         AIRFRAME = "airframe", "Cellule"
@@ -77,6 +128,8 @@ class Component(models.Model):
 
     limit_minutes = models.PositiveIntegerField("Limite (minutes)", default=0)
     limit_cycles = models.PositiveIntegerField("Limite (cycles)", default=0)
+    # Péremption, potentiel calendaire (ex. batterie ELT, révision 6 ans)
+    limit_date = models.DateField("Limite calendaire", null=True, blank=True)
 
     status = models.CharField("Statut", max_length=20, choices=Status.choices, default=Status.STOCK)
 
@@ -90,9 +143,26 @@ class Component(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Transaction de la dernière écriture (trigger SQL, voir fleet.sync)
+    sync_xid = models.BigIntegerField(default=0, editable=False, db_index=True)
 
     class Meta:
         ordering = ["name", "serial_number", "part_number"]
+        indexes = [
+            # Filtres statut (+ ATA) de la liste des composants
+            models.Index(fields=["status", "ata"], name="kardex_comp_status_ata_idx"),
+            # Composants installés (alertes flotte) : index partiel, sans le stock / réformés
+            models.Index(fields=["ata"], condition=models.Q(status="installed"), name="kardex_comp_installed_idx"),
+            # Recherche par préfixe (admin, autocomplétion) : UPPER(serial_number) LIKE 'XX%'
+            models.Index(OpClass(Upper("serial_number"), name="text_pattern_ops"), name="kardex_comp_sn_prefix_idx"),
+            models.Index(OpClass(Upper("part_number"), name="text_pattern_ops"), name="kardex_comp_pn_prefix_idx"),
+            # Échéancier calendaire (fleet.due) : parcours d'intervalle sur la date, sans les réformés
+            models.Index(
+                fields=["limit_date"],
+                condition=models.Q(limit_date__isnull=False) & ~models.Q(status="scrapped"),
+                name="kardex_comp_limit_date_idx",
+            ),
+        ]
 
     def clean(self):
         if self.installed_aircraft is not None and self.installed_engine is not None:
@@ -128,7 +198,8 @@ class KardexEntry(models.Model):
         OVERHAUL = "overhaul", "Révision"
         SCRAP = "scrap", "Réforme"
 
-    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name="entries")
+    # Pas d'index simple : couvert par kardex_entry_comp_date_idx (component en tête)
+    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name="entries", db_index=False)
 
     action = models.CharField("Action", max_length=20, choices=Action.choices)
     date = models.DateField("Date")
@@ -149,6 +220,13 @@ class KardexEntry(models.Model):
 
     class Meta:
         ordering = ["-date", "-id"]
+        indexes = [
+            # Historique d'un composant dans l'ordre chronologique (calcul TSN/CSN)
+            models.Index(fields=["component", "date", "id"], name="kardex_entry_comp_date_idx"),
+            # Liste globale (admin) : ordre -date, -id et filtre par date sans tri de la table
+            models.Index(fields=["date", "id"], name="kardex_entry_date_idx"),
+            models.Index(OpClass(Upper("workorder_ref"), name="text_pattern_ops"), name="kardex_entry_wo_prefix_idx"),
+        ]
 
     def clean(self):
         if self.aircraft is not None and self.engine is not None:
@@ -199,3 +277,47 @@ class KardexEntry(models.Model):
         target = self.engine or self.aircraft
         tgt = str(target) if target else "—"
         return f"{self.get_action_display()} {self.component} @ {tgt} ({self.date})"
+
+
+class AttachmentBlob(models.Model):
+    """Contenu d'une pièce jointe, stocké une seule fois sur disque (voir kardex.attachments)."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
+class Attachment(models.Model):
+    """Document (Form 1, facture, OT…) rattaché à un composant, et éventuellement à un évènement kardex."""
+
+    class Kind(models.TextChoices):
+        FORM1 = "form1", "EASA Form 1"
+        WORKORDER = "workorder", "Ordre de travail"
+        INVOICE = "invoice", "Facture"
+        OTHER = "other", "Autre"
+
+    component = models.ForeignKey(Component, on_delete=models.CASCADE, related_name="attachments")
+    entry = models.ForeignKey(
+        KardexEntry, on_delete=models.CASCADE, null=True, blank=True, related_name="attachments",
+        verbose_name="Évènement",
+    )
+    blob = models.ForeignKey(AttachmentBlob, on_delete=models.PROTECT, related_name="attachments")
+
+    kind = models.CharField("Type", max_length=20, choices=Kind.choices, default=Kind.OTHER)
+    filename = models.CharField("Nom du fichier", max_length=255)
+    content_type = models.CharField(max_length=100, default="application/octet-stream")
+
+    uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return self.filename
+
+    @property
+    def size(self):
+        return self.blob.size
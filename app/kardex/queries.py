@@ -0,0 +1,28 @@
+"""Querysets partagés par les vues et les tâches de fond du kardex."""
+from django.db.models import Q
+
+from .models import Component
+
+
+def components_queryset_for_user(user):
+    """Composants visibles : tous (superadmin), sinon ceux rattachés à l'organisation de l'utilisateur."""
+    qs = Component.objects.select_related("installed_aircraft", "installed_engine", "installed_engine__aircraft").all()
+    if user.role == user.Roles.SUPERADMIN:
+        return qs
+
+    # Si le composant est installé : on filtre par org de la machine
+    qs_installed = qs.filter(
+        Q(installed_aircraft__organization_id=user.organization_id) |
+        Q(installed_engine__aircraft__organization_id=user.organization_id)
+    )
+
+    # Si pas installé : on prend ceux qui ont au moins un event kardex dans l'org
+    qs_not_installed = qs.filter(
+        installed_aircraft__isnull=True,
+        installed_engine__isnull=True,
+    ).filter(
+        Q(entries__aircraft__organization_id=user.organization_id) |
+        Q(entries__engine__aircraft__organization_id=user.organization_id)
+    )
+
+    return (qs_installed | qs_not_installed).distinct()
@@ -0,0 +1,56 @@
+"""Tâches de fond du kardex (exécutées par run_jobs, voir jobs.registry)."""
+from fleet.forms import fmt_hhmm
+from jobs.exports import write_csv
+from jobs.registry import task
+
+from .alerting import compute_alert_level, compute_component_usage
+from .queries import components_queryset_for_user
+
+
+def _installed_on(comp):
+    if comp.installed_engine:
+        return str(comp.installed_engine)
+    if comp.installed_aircraft:
+        return comp.installed_aircraft.registration
+    return ""
+
+
+@task("kardex.export_component_levels", label="Export niveaux composants (CSV)")
+def export_component_levels(job):
+    """
+    Recalcule TSN / CSN et niveau d'alerte de chaque composant visible par le
+    demandeur (même périmètre que « Parc composants ») et les exporte.
+    """
+    if job.created_by is None:
+        raise ValueError("Demandeur supprimé : périmètre de l'export inconnu.")
+    qs = components_queryset_for_user(job.created_by).order_by("ata", "name", "id")
+    total = qs.count()
+    levels = {}
+
+    def rows():
+        for comp in qs.iterator(chunk_size=500):
+            tsn, csn = compute_component_usage(comp)
+            level = compute_alert_level(comp, tsn, csn)
+            levels[level] = levels.get(level, 0) + 1
+            yield [
+                comp.ata, comp.name, comp.part_number, comp.serial_number, comp.get_status_display(),
+                _installed_on(comp), comp.installed_position,
+                fmt_hhmm(tsn), csn,
+                fmt_hhmm(comp.limit_minutes) if comp.limit_minutes else "",
+                comp.limit_cycles or "",
+                fmt_hhmm(comp.limit_minutes - tsn) if comp.limit_minutes else "",
+                (comp.limit_cycles - csn) if comp.limit_cycles else "",
+                comp.limit_date.isoformat() if comp.limit_date else "",
+                level,
+            ]
+
+    n = write_csv(
+        job,
+        "composants-niveaux.csv",
+        ["ata", "designation", "pn", "sn", "statut", "installe_sur", "position", "tsn", "csn",
+         "limite_heures", "limite_cycles", "restant_heures", "restant_cycles", "limite_date", "niveau"],
+        rows(),
+        total=total,
+        every=200,
+    )
+    return {"rows": n, "levels": levels}
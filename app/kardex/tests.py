@@ -1,3 +1,164 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+
+from accounts.models import Organization, User
+from fleet.models import Aircraft
+
+from . import attachments
+from .models import Attachment, AttachmentBlob, Component, Engine, KardexEntry
+from .queries import components_queryset_for_user
+
+
+class ComponentScopeTests(TestCase):
+    """Périmètre « Parc composants » (vue et export) : composants de l'organisation seulement."""
+
+    @classmethod
+    def setUpTestData(cls):
+        org, other_org = Organization.objects.create(name="Club A"), Organization.objects.create(name="Club B")
+        aircraft = Aircraft.objects.create(registration="F-AAAA", organization=org)
+        other = Aircraft.objects.create(registration="F-BBBB", organization=other_org)
+        engine = Engine.objects.create(aircraft=aircraft)
+        cls.user = User.objects.create_user("camo-a", role=User.Roles.CAMO, organization=org)
+        cls.superadmin = User.objects.create_user("super", role=User.Roles.SUPERADMIN)
+
+        cls.on_aircraft = Component.objects.create(name="Train", installed_aircraft=aircraft)
+        cls.on_engine = Component.objects.create(name="Magnéto", installed_engine=engine)
+        cls.removed = Component.objects.create(name="Hélice")
+        KardexEntry.objects.create(
+            component=cls.removed, action=KardexEntry.Action.REMOVE, date=datetime.date(2026, 1, 5), aircraft=aircraft,
+        )
+        KardexEntry.objects.create(
+            component=cls.removed, action=KardexEntry.Action.INSPECT, date=datetime.date(2026, 2, 5), aircraft=aircraft,
+        )
+        cls.foreign = Component.objects.create(name="Radio", installed_aircraft=other)
+        cls.never_seen = Component.objects.create(name="Neuf")
+
+    def test_user_sees_own_organization(self):
+        self.assertEqual(
+            sorted(components_queryset_for_user(self.user).values_list("pk", flat=True)),
+            sorted([self.on_aircraft.pk, self.on_engine.pk, self.removed.pk]),
+        )
+
+    def test_superadmin_sees_everything(self):
+        self.assertEqual(components_queryset_for_user(self.superadmin).count(), Component.objects.count())
+
+
+class KardexEntryAdminSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superadmin = User.objects.create_superuser("root", password="x", role=User.Roles.SUPERADMIN)
+        for i in range(3):
+            component = Component.objects.create(name=f"Magnéto {i}", serial_number=f"SN-{i}")
+            KardexEntry.objects.create(component=component, action=KardexEntry.Action.INSPECT, date=datetime.date(2026, 1, i + 1))
+
+    def search(self, term):
+        self.client.force_login(self.superadmin)
+        response = self.client.get("/admin/kardex/kardexentry/", {"q": term})
+        return response, [str(m) for m in response.context["messages"]]
+
+    def test_search_by_serial_prefix(self):
+        response, warnings = self.search("sn-1")
+        self.assertEqual(response.context["cl"].result_count, 1)
+        self.assertEqual(warnings, [])
+
+    def test_truncated_component_list_is_reported(self):
+        with mock.patch("kardex.admin.SEARCH_MAX_COMPONENTS", 2):
+            response, warnings = self.search("SN-")
+        self.assertEqual(response.context["cl"].result_count, 2)
+        self.assertEqual(len(warnings), 1)
+        self.assertIn("Plus de 2 composants", warnings[0])
+
+
+class AttachmentStoreTests(TestCase):
+    """Stockage adressé par contenu : dédoublonnage, libération, téléchargement partiel."""
+
+    content = b"0123456789" * 10
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        settings = override_settings(ATTACHMENTS_ROOT=self.root, ATTACHMENTS_ACCEL_REDIRECT="")
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.component = Component.objects.create(name="Magnéto")
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+
+    def attach(self, name="form1.pdf"):
+        return attachments.attach(
+            self.component, SimpleUploadedFile(name, self.content), kind=Attachment.Kind.FORM1,
+        )
+
+    def get(self, attachment, **headers):
+        return attachments.serve(RequestFactory().get("/", headers=headers), attachment)
+
+    def test_parse_range(self):
+        cases = {
+            "bytes=0-9": (0, 9),
+            "bytes=90-": (90, 99),
+            "bytes=95-500": (95, 99),
+            "bytes=-10": (90, 99),
+            "bytes=-500": (0, 99),
+            "bytes=-0": "invalid",
+            "bytes=100-": "invalid",
+            "bytes=20-10": "invalid",
+            "bytes=0-1,5-6": None,
+            "bytes=-": None,
+            "items=0-1": None,
+        }
+        self.assertEqual({h: attachments._parse_range(h, 100) for h in cases}, cases)
+
+    def test_same_content_is_stored_once(self):
+        first, second = self.attach(), self.attach("copie.pdf")
+        self.assertEqual((first.blob_id, second.blob_id), (self.sha256, self.sha256))
+        self.assertEqual(AttachmentBlob.objects.get().size, len(self.content))
+        path = attachments.blob_path(self.sha256)
+        self.assertEqual(path.read_bytes(), self.content)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+        self.assertEqual(os.listdir(os.path.join(self.root, "tmp")), [])
+
+    def test_file_removed_with_last_reference(self):
+        first, second = self.attach(), self.attach("copie.pdf")
+        path = attachments.blob_path(self.sha256)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(path.exists())
+        self.assertFalse(attachments.release(self.sha256))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(path.exists())
+        self.assertFalse(AttachmentBlob.objects.exists())
+
+    def test_serve_full_partial_and_not_modified(self):
+        attachment = self.attach()
+        etag = f'"{self.sha256}"'
+        full = self.get(attachment)
+        self.assertEqual((full.status_code, b"".join(full.streaming_content)), (200, self.content))
+        full.file_to_stream.close()
+        self.assertEqual((full["ETag"], full["Accept-Ranges"]), (etag, "bytes"))
+
+        partial = self.get(attachment, Range="bytes=-10")
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial["Content-Range"], "bytes 90-99/100")
+        self.assertEqual(b"".join(partial.streaming_content), self.content[90:])
+
+        outside = self.get(attachment, Range="bytes=100-")
+        self.assertEqual((outside.status_code, outside["Content-Range"]), (416, "bytes */100"))
+
+        self.assertEqual(self.get(attachment, **{"If-None-Match": etag}).status_code, 304)
+
+    def test_if_range(self):
+        attachment = self.attach()
+        same = self.get(attachment, Range="bytes=0-9", **{"If-Range": f'"{self.sha256}"'})
+        self.assertEqual((same.status_code, b"".join(same.streaming_content)), (206, self.content[:10]))
+        # Autre version côté client : fichier complet
+        changed = self.get(attachment, Range="bytes=0-9", **{"If-Range": '"autre"'})
+        self.assertEqual((changed.status_code, b"".join(changed.streaming_content)), (200, self.content))
+        changed.file_to_stream.close()
@@ -5,9 +5,13 @@ urlpatterns = [
     # ✅ module “Parc composants”
     path("components/", views.component_list, name="component_list"),
     path("components/create/", views.component_create, name="component_create"),
+    path("components/export/", views.component_levels_export, name="component_levels_export"),
 
     # détail existant
     path("components/<int:pk>/", views.component_detail, name="component_detail"),
+    path("components/<int:pk>/attachments/", views.attachment_upload, name="attachment_upload"),
+    path("attachments/<int:pk>/", views.attachment_download, name="attachment_download"),
+    path("attachments/<int:pk>/delete/", views.attachment_delete, name="attachment_delete"),
 
     # moteur (si tu le gardes, même si on n’utilise plus le formulaire)
     path("engines/<int:engine_id>/log/add/", views.engine_log_add, name="engine_log_add"),
@@ -1,14 +1,20 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.decorators.http import require_POST
 
-from .models import Component, KardexEntry, Engine
-from .forms import KardexEntryForm, EngineLogForm, ComponentForm
+from . import attachments
+from .models import Attachment, Component, KardexEntry, Engine
+from .forms import AttachmentForm, KardexEntryForm, EngineLogForm, ComponentForm
 from .alerting import compute_component_usage, compute_alert_level
+from .queries import components_queryset_for_user
+from idempotency.decorators import idempotent, mark_succeeded, new_key, wants_json
+from jobs.registry import enqueue
+from monitoring.budgets import query_budget
 
 
 WARN_MINUTES = 10 * 60
@@ -57,32 +63,10 @@ def _can_view_component(user, component: Component) -> bool:
     return user.organization_id == org_id
 
 
-def _components_queryset_for_user(user):
-    qs = Component.objects.select_related("installed_aircraft", "installed_engine", "installed_engine__aircraft").all()
-    if user.role == user.Roles.SUPERADMIN:
-        return qs
-
-    # Si le composant est installé : on filtre par org de la machine
-    qs_installed = qs.filter(
-        Q(installed_aircraft__organization_id=user.organization_id) |
-        Q(installed_engine__aircraft__organization_id=user.organization_id)
-    )
-
-    # Si pas installé : on prend ceux qui ont au moins un event kardex dans l'org
-    qs_not_installed = qs.filter(
-        installed_aircraft__isnull=True,
-        installed_engine__isnull=True,
-    ).filter(
-        Q(entries__aircraft__organization_id=user.organization_id) |
-        Q(entries__engine__aircraft__organization_id=user.organization_id)
-    )
-
-    return (qs_installed | qs_not_installed).distinct()
-
-
 @login_required
+@query_budget(queries=10, duplicates=2)
 def component_list(request):
-    qs = _components_queryset_for_user(request.user)
+    qs = components_queryset_for_user(request.user)
 
     q = (request.GET.get("q") or "").strip()
     status = (request.GET.get("status") or "").strip()
@@ -106,7 +90,7 @@ def component_list(request):
     qs = qs.order_by("name", "part_number", "serial_number")
 
     ata_values = (
-        _components_queryset_for_user(request.user)
+        components_queryset_for_user(request.user)
         .exclude(ata__exact="")
         .values_list("ata", flat=True)
         .distinct()
@@ -125,6 +109,15 @@ def component_list(request):
     return render(request, "kardex/component_list.html", ctx)
 
 
+@require_POST
+@login_required
+def component_levels_export(request):
+    """Recalcul + export CSV des niveaux de tout le parc visible : tâche de fond."""
+    job = enqueue("kardex.export_component_levels", user=request.user)
+    messages.info(request, "Export lancé : le fichier sera téléchargeable ici une fois prêt.")
+    return redirect("job_detail", pk=job.pk)
+
+
 @login_required
 def component_create(request):
     if not _can_manage_kardex(request.user):
@@ -144,6 +137,8 @@ def component_create(request):
 
 
 @login_required
+@query_budget(queries=15, duplicates=3)
+@idempotent("kardex_entry_add")
 def component_detail(request, pk: int):
     comp = get_object_or_404(Component, pk=pk)
 
@@ -163,18 +158,19 @@ def component_detail(request, pk: int):
         if not can_manage:
             return HttpResponseForbidden("Accès refusé.")
 
-        form = KardexEntryForm(request.POST)
+        form = KardexEntryForm(request.POST, user=request.user)
         if form.is_valid():
             entry = form.save(commit=False)
             entry.component = comp
             entry.created_by = request.user
             entry.save()
+            mark_succeeded(request)
             messages.success(request, "Évènement kardex ajouté.")
             return redirect("component_detail", pk=comp.pk)
         else:
             messages.error(request, "Formulaire invalide.")
     else:
-        form = KardexEntryForm(initial={"date": timezone.localdate()}) if can_manage else None
+        form = KardexEntryForm(initial={"date": timezone.localdate()}, user=request.user) if can_manage else None
 
     tsn_minutes, csn_cycles = compute_component_usage(comp)
     level = compute_alert_level(comp, tsn_minutes, csn_cycles)
@@ -190,6 +186,7 @@ def component_detail(request, pk: int):
         "level": level,
         "rem_minutes": rem_minutes,
         "rem_cycles": rem_cycles,
+        "rem_days": (comp.limit_date - timezone.localdate()).days if comp.limit_date else None,
     }
 
     return render(
@@ -200,6 +197,8 @@ def component_detail(request, pk: int):
             "entries": entries,
             "can_manage": can_manage,
             "form": form,
+            "attachments": comp.attachments.select_related("blob", "entry", "uploaded_by"),
+            "attachment_form": AttachmentForm(component=comp) if can_manage else None,
             "tsn_minutes": tsn_minutes,
             "csn_cycles": csn_cycles,
             "alert": alert,
@@ -209,6 +208,7 @@ def component_detail(request, pk: int):
 
 @require_POST
 @login_required
+@idempotent("engine_log_add")
 def engine_log_add(request, engine_id: int):
     engine = get_object_or_404(Engine, pk=engine_id)
 
@@ -216,13 +216,76 @@ def engine_log_add(request, engine_id: int):
         return HttpResponseForbidden("Accès refusé.")
 
     form = EngineLogForm(request.POST)
-    if form.is_valid():
-        row = form.save(commit=False)
-        row.engine = engine
-        row.created_by = request.user
-        row.save()
-        messages.success(request, "Ligne moteur ajoutée.")
-    else:
+    if not form.is_valid():
+        if wants_json(request):
+            return JsonResponse({"ok": False, "errors": form.errors.get_json_data()}, status=400)
         messages.error(request, "Formulaire moteur invalide.")
-
+        return redirect("aircraft_detail", pk=engine.aircraft_id)
+
+    row = form.save(commit=False)
+    row.engine = engine
+    row.created_by = request.user
+    row.save()
+    mark_succeeded(request)
+
+    if wants_json(request):
+        # Seul le panneau composants / moteurs de la fiche est concerné
+        return JsonResponse({"ok": True, "message": "Ligne moteur ajoutée.", "idempotency_key": new_key()})
+    messages.success(request, "Ligne moteur ajoutée.")
     return redirect("aircraft_detail", pk=engine.aircraft_id)
+
+
+# -------------------------
+# Pièces jointes (Form 1, OT, factures)
+# -------------------------
+@require_POST
+@login_required
+@csrf_exempt
+def attachment_upload(request, pk: int):
+    # Le gestionnaire d'envoi doit être posé avant toute lecture de request.POST,
+    # y compris par le contrôle CSRF : d'où csrf_exempt ici et csrf_protect ensuite
+    request.upload_handlers = [attachments.HashingUploadHandler(request)]
+    return _attachment_upload(request, pk)
+
+
+@csrf_protect
+def _attachment_upload(request, pk):
+    comp = get_object_or_404(Component, pk=pk)
+    if not (_can_manage_kardex(request.user) and _can_view_component(request.user, comp)):
+        return HttpResponseForbidden("Accès refusé.")
+
+    form = AttachmentForm(request.POST, request.FILES, component=comp)
+    error = getattr(request, "attachment_error", "")
+    if error or not form.is_valid():
+        messages.error(request, error or "Pièce jointe invalide : " + " ".join(
+            e for errors in form.errors.values() for e in errors
+        ))
+        return redirect("component_detail", pk=comp.pk)
+
+    attachments.attach(
+        comp, form.cleaned_data["file"],
+        kind=form.cleaned_data["kind"], entry=form.cleaned_data["entry"], user=request.user,
+    )
+    messages.success(request, "Pièce jointe ajoutée.")
+    return redirect("component_detail", pk=comp.pk)
+
+
+@login_required
+def attachment_download(request, pk: int):
+    """Téléchargement en flux, avec prise en charge des requêtes Range."""
+    att = get_object_or_404(Attachment.objects.select_related("blob", "component"), pk=pk)
+    if not _can_view_component(request.user, att.component):
+        return HttpResponseForbidden("Accès refusé.")
+    return attachments.serve(request, att)
+
+
+@require_POST
+@login_required
+def attachment_delete(request, pk: int):
+    att = get_object_or_404(Attachment.objects.select_related("component"), pk=pk)
+    if not (_can_manage_kardex(request.user) and _can_view_component(request.user, att.component)):
+        return HttpResponseForbidden("Accès refusé.")
+    # Le contenu est effacé après commit s'il n'est plus référencé (kardex.attachments.release)
+    att.delete()
+    messages.success(request, "Pièce jointe supprimée.")
+    return redirect("component_detail", pk=att.component_id)
@@ -0,0 +1,54 @@
+from django.conf import settings
+
+
+class QueryBudget:
+    """
+    Budget d'une vue : au-delà, la requête HTTP est journalisée (logger
+    "monitoring.perf"). None = pas de limite sur ce critère.
+
+    queries     : nombre total de requêtes SQL
+    db_ms       : temps SQL cumulé (ms)
+    duplicates  : exécutions répétées d'une même forme de requête (N+1)
+    view_ms     : temps total de la vue (ms)
+    """
+
+    def __init__(self, queries=None, db_ms=None, duplicates=None, view_ms=None):
+        self.queries = queries
+        self.db_ms = db_ms
+        self.duplicates = duplicates
+        self.view_ms = view_ms
+
+    def exceeded(self, stats):
+        """Liste des critères dépassés, ex: ["queries 154 > 20"]."""
+        out = []
+        checks = (
+            ("queries", self.queries, stats.queries),
+            ("db_ms", self.db_ms, stats.db_ms),
+            ("duplicates", self.duplicates, stats.max_duplicates),
+            ("view_ms", self.view_ms, stats.view_ms),
+        )
+        for name, limit, value in checks:
+            if limit is not None and value > limit:
+                out.append(f"{name} {value:g} > {limit:g}")
+        return out
+
+
+def default_budget():
+    return QueryBudget(**getattr(settings, "PERF_DEFAULT_BUDGET", {}))
+
+
+def query_budget(queries=None, db_ms=None, duplicates=None, view_ms=None):
+    """
+    Déclare le budget SQL d'une vue, juste au-dessus de sa définition :
+
+        @login_required
+        @query_budget(queries=20, duplicates=3)
+        def aircraft_list(request): ...
+    """
+    budget = QueryBudget(queries=queries, db_ms=db_ms, duplicates=duplicates, view_ms=view_ms)
+
+    def decorator(view_func):
+        view_func.query_budget = budget
+        return view_func
+
+    return decorator
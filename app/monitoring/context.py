@@ -0,0 +1,66 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from . import slowqueries
+from .sql import normalize_sql
+
+# Stats de la requête HTTP en cours (None hors requête : commandes, shell...)
+current_stats = ContextVar("monitoring_current_stats", default=None)
+
+
+class RequestStats:
+    """Compteurs d'une requête HTTP, alimentés par le wrapper SQL du middleware."""
+
+    def __init__(self, slow_threshold=None):
+        self.started = time.perf_counter()
+        self.view_name = ""
+        self.resolved = False
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.shapes = Counter()
+        self.view_seconds = 0.0
+        self.components_evaluated = 0
+        # Requêtes lentes retenues (alias, sql, params, secondes) ; None = capture désactivée
+        self.slow_threshold = slow_threshold
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_seconds += elapsed
+            self.shapes[normalize_sql(sql)] += 1
+            if (
+                self.slow_threshold is not None
+                and elapsed >= self.slow_threshold
+                and not many
+                and slowqueries.should_capture(self.slow_queries)
+            ):
+                self.slow_queries.append((context["connection"].alias, sql, params, elapsed))
+
+    @property
+    def view_label(self):
+        """Nom de vue borné pour les métriques (pas de chemin brut : cardinalité)."""
+        return self.view_name if self.resolved else "unresolved"
+
+    @property
+    def db_ms(self):
+        return round(self.db_seconds * 1000, 1)
+
+    @property
+    def view_ms(self):
+        return round(self.view_seconds * 1000, 1)
+
+    @property
+    def max_duplicates(self):
+        """Plus grand nombre d'exécutions répétées d'une même forme (0 = aucune)."""
+        if not self.shapes:
+            return 0
+        return max(self.shapes.values()) - 1
+
+    def duplicated_shapes(self, limit=3):
+        return [(shape, n) for shape, n in self.shapes.most_common(limit) if n > 1]
@@ -0,0 +1,184 @@
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from fleet.models import Aircraft, FlightLog
+from kardex import alerting
+from kardex.cache import levels_cache
+from kardex.models import Component
+from monitoring.context import RequestStats
+
+User = get_user_model()
+
+
+def _percentile(values, p):
+    """Percentile (rang le plus proche) d'une liste non vide."""
+    ordered = sorted(values)
+    k = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+
+def _summary(samples):
+    wall = [s[0] for s in samples]
+    db = [s[2] for s in samples]
+    return {
+        "p50_ms": round(_percentile(wall, 50), 2),
+        "p95_ms": round(_percentile(wall, 95), 2),
+        "mean_ms": round(sum(wall) / len(wall), 2),
+        "min_ms": round(min(wall), 2),
+        "max_ms": round(max(wall), 2),
+        "queries": max(s[1] for s in samples),
+        "db_p50_ms": round(_percentile(db, 50), 2),
+        "iterations": len(samples),
+    }
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure les chemins chauds (vues + alerting) : p50/p95, nombre de requêtes SQL. "
+        "Résultats stockés en JSON pour comparer les exécutions (--compare). "
+        "À lancer sur le jeu synthétique (generate_fleet), DEBUG désactivé."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--user", default="syn_000_admin", help="Utilisateur pour les vues (défaut : admin org synthétique 000)")
+        parser.add_argument("--output", help="Fichier JSON (défaut : benchmarks/bench-<date>.json)")
+        parser.add_argument("--compare", help="JSON d'une exécution précédente à comparer")
+        parser.add_argument("--only", nargs="*", help="Sous-ensemble de cibles (ex: aircraft_list component_detail)")
+        parser.add_argument(
+            "--no-cache", action="store_true",
+            help="Calculs kardex sans cache (par défaut : cache chaud après l'échauffement)",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            user = User.objects.get(username=opts["user"])
+        except User.DoesNotExist:
+            raise CommandError(f"Utilisateur introuvable : {opts['user']} (lancer generate_fleet ?)")
+
+        aircraft_qs = Aircraft.objects.all()
+        if user.role != User.Roles.SUPERADMIN:
+            aircraft_qs = aircraft_qs.filter(organization_id=user.organization_id)
+        # Aéronef le plus chargé (journal le plus long) et son composant le plus ancien
+        aircraft = aircraft_qs.annotate(n=Count("logs")).order_by("-n", "id").first()
+        if aircraft is None:
+            raise CommandError("Aucun aéronef visible par cet utilisateur.")
+        component = (
+            Component.objects.filter(installed_aircraft=aircraft).annotate(n=Count("entries")).order_by("-n", "id").first()
+            or Component.objects.filter(installed_engine__aircraft=aircraft).order_by("id").first()
+        )
+        components = list(
+            Component.objects.filter(installed_aircraft=aircraft)
+            | Component.objects.filter(installed_engine__aircraft=aircraft)
+        )
+
+        client = Client()
+        client.force_login(user)
+
+        targets = {
+            "aircraft_list": ("view", reverse("aircraft_list")),
+            "aircraft_detail": ("view", reverse("aircraft_detail", kwargs={"pk": aircraft.pk})),
+            "component_list": ("view", reverse("component_list")),
+            "stock_item_list": ("view", reverse("stock_item_list")),
+            "alerting.aircraft_current_totals": ("func", lambda: alerting.aircraft_current_totals(aircraft)),
+            "alerting.component_level": ("func", lambda: [alerting.component_level(c) for c in components]),
+        }
+        if component is not None:
+            targets["component_detail"] = ("view", reverse("component_detail", kwargs={"pk": component.pk}))
+            targets["alerting.compute_component_usage"] = ("func", lambda: alerting.compute_component_usage(component))
+        if opts["only"]:
+            targets = {k: v for k, v in targets.items() if k in opts["only"]}
+
+        results = {}
+        cache_ctx = levels_cache.bypass() if opts["no_cache"] else nullcontext()
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]), cache_ctx:
+            for name, (kind, target) in targets.items():
+                samples = []
+                for i in range(opts["warmup"] + opts["iterations"]):
+                    stats = RequestStats()
+                    start = time.perf_counter()
+                    with connection.execute_wrapper(stats):
+                        if kind == "view":
+                            response = client.get(target)
+                            if response.status_code != 200:
+                                raise CommandError(f"{name} : HTTP {response.status_code}")
+                        else:
+                            target()
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if i >= opts["warmup"]:
+                        samples.append((elapsed, stats.queries, stats.db_seconds * 1000))
+                results[name] = _summary(samples)
+                r = results[name]
+                self.stdout.write(
+                    f"{name:<36} p50 {r['p50_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms  {r['queries']:>5} requêtes"
+                )
+
+        payload = {
+            "meta": {
+                "date": timezone.now().isoformat(),
+                "git": _git_revision(),
+                "python": platform.python_version(),
+                "debug": settings.DEBUG,
+                "user": user.username,
+                "aircraft": aircraft.registration,
+                "component_id": component.pk if component else None,
+                "iterations": opts["iterations"],
+                "alerting_cache": not opts["no_cache"],
+                "dataset": {
+                    "aircraft": Aircraft.objects.count(),
+                    "flight_logs": FlightLog.objects.count(),
+                    "components": Component.objects.count(),
+                },
+            },
+            "results": results,
+        }
+
+        output = opts["output"] or os.path.join(
+            settings.BASE_DIR, "benchmarks", f"bench-{timezone.now():%Y%m%d-%H%M%S}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Résultats : {output}"))
+
+        if opts["compare"]:
+            self._compare(opts["compare"], results)
+
+    def _compare(self, path, results):
+        with open(path, encoding="utf-8") as fh:
+            previous = json.load(fh)["results"]
+        self.stdout.write(f"\nComparaison avec {path} (p50 / requêtes) :")
+        for name, r in results.items():
+            old = previous.get(name)
+            if not old:
+                continue
+            delta = (r["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100 if old["p50_ms"] else 0.0
+            self.stdout.write(
+                f"{name:<36} {old['p50_ms']:>9.2f} -> {r['p50_ms']:>9.2f} ms ({delta:+.1f} %)  "
+                f"{old['queries']:>5} -> {r['queries']:>5} requêtes"
+            )
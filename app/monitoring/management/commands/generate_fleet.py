@@ -0,0 +1,42 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from monitoring import synthetic
+
+
+class Command(BaseCommand):
+    help = "Génère un jeu de données synthétique déterministe (flotte, journaux, kardex, stock)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organizations", type=int, default=5)
+        parser.add_argument("--aircraft", type=int, default=20, help="Aéronefs par organisation")
+        parser.add_argument("--years", type=int, default=10, help="Années de journaux")
+        parser.add_argument("--flights-per-year", type=int, default=150)
+        parser.add_argument("--components", type=int, default=12, help="Composants par aéronef")
+        parser.add_argument("--kardex-cycles", type=int, default=3, help="Cycles pose/dépose par composant")
+        parser.add_argument("--stock-items", type=int, default=500, help="Articles de stock par organisation")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--end-date", type=datetime.date.fromisoformat, default=datetime.date(2025, 12, 31))
+        parser.add_argument("--reset", action="store_true", help="Supprime d'abord les données synthétiques existantes")
+
+    def handle(self, *args, **opts):
+        if opts["reset"]:
+            deleted = synthetic.reset()
+            self.stdout.write(f"Supprimé : {deleted}")
+
+        counts = synthetic.generate(
+            organizations=opts["organizations"],
+            aircraft_per_org=opts["aircraft"],
+            years=opts["years"],
+            flights_per_year=opts["flights_per_year"],
+            components_per_aircraft=opts["components"],
+            kardex_cycles=opts["kardex_cycles"],
+            stock_items_per_org=opts["stock_items"],
+            seed=opts["seed"],
+            end_date=opts["end_date"],
+            log=self.stdout.write,
+        )
+        for key, value in counts.items():
+            self.stdout.write(f"{key:>16} : {value}")
+        self.stdout.write(self.style.SUCCESS("Jeu de données synthétique généré."))
@@ -0,0 +1,100 @@
+"""
+Métriques Prometheus (exposées sur /metrics).
+
+Multi-process : si PROMETHEUS_MULTIPROC_DIR est défini, chaque worker écrit
+ses compteurs dans des fichiers mmap de ce répertoire et /metrics agrège tous
+les workers (quel que soit celui qui répond). Le répertoire doit être vidé
+au démarrage du serveur (voir docker-compose.yml).
+"""
+import functools
+import os
+import time
+
+_multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if _multiproc_dir:
+    os.makedirs(_multiproc_dir, exist_ok=True)
+
+from prometheus_client import (  # noqa: E402  (après la préparation du répertoire multi-process)
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from .context import current_stats  # noqa: E402
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+REQUEST_LATENCY = Histogram(
+    "nav_http_request_duration_seconds", "Durée des requêtes HTTP par vue",
+    ["view", "method", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    "nav_http_request_db_queries", "Requêtes SQL par requête HTTP",
+    ["view"], buckets=COUNT_BUCKETS,
+)
+DB_QUERIES = Counter("nav_db_queries", "Requêtes SQL exécutées", ["view"])
+DB_TIME = Counter("nav_db_query_seconds", "Temps SQL cumulé", ["view"])
+CACHE_REQUESTS = Counter("nav_cache_requests", "Accès cache (ratio = hit / total)", ["cache", "result"])
+ALERTING_LATENCY = Histogram(
+    "nav_alerting_duration_seconds", "Durée des fonctions kardex.alerting",
+    ["function"], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+ALERTING_COMPONENTS = Histogram(
+    "nav_alerting_components_per_request", "Composants évalués (usage / niveau) par requête HTTP",
+    ["view"], buckets=COUNT_BUCKETS,
+)
+
+
+def observe_request(stats, method, status):
+    """Appelé par QueryInstrumentationMiddleware en fin de requête."""
+    view = stats.view_label
+    REQUEST_LATENCY.labels(view, method, f"{status // 100}xx").observe(stats.view_seconds)
+    REQUEST_QUERIES.labels(view).observe(stats.queries)
+    DB_QUERIES.labels(view).inc(stats.queries)
+    DB_TIME.labels(view).inc(stats.db_seconds)
+    if stats.components_evaluated:
+        ALERTING_COMPONENTS.labels(view).observe(stats.components_evaluated)
+
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def timed_alerting(counts_component=False):
+    """
+    Décorateur des fonctions de kardex.alerting : histogramme de durée et,
+    si counts_component, +1 composant évalué sur la requête HTTP en cours.
+    """
+    def decorator(func):
+        histogram = ALERTING_LATENCY.labels(func.__name__)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+                if counts_component:
+                    stats = current_stats.get()
+                    if stats is not None:
+                        stats.components_evaluated += 1
+
+        return wrapper
+
+    return decorator
+
+
+def render_latest():
+    """(corps, content-type) au format texte Prometheus, agrégé sur tous les workers."""
+    if _multiproc_dir:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,79 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics, slowqueries
+from .budgets import default_budget
+from .context import RequestStats, current_stats
+
+logger = logging.getLogger("monitoring.perf")
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Mesure chaque requête HTTP : nombre de requêtes SQL, temps SQL cumulé,
+    formes de requêtes dupliquées (N+1) et temps de la vue.
+
+    - Requête hors budget (@query_budget sur la vue, sinon PERF_DEFAULT_BUDGET)
+      => warning sur le logger "monitoring.perf".
+    - En DEBUG (ou PERF_SERVER_TIMING = True) : en-tête Server-Timing, visible
+      dans l'onglet Réseau du navigateur.
+    - Latence, requêtes SQL et composants évalués alimentent /metrics.
+    - Requêtes au-delà de SLOW_QUERY_THRESHOLD_MS : plan EXPLAIN enregistré
+      (monitoring.slowqueries).
+
+    À placer en tête de MIDDLEWARE pour compter aussi session / auth.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "PERF_SERVER_TIMING", settings.DEBUG)
+
+    def __call__(self, request):
+        stats = RequestStats(slow_threshold=slowqueries.threshold_seconds())
+        stats.view_name = request.path
+        token = current_stats.set(stats)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        stats.view_seconds = time.perf_counter() - stats.started
+        metrics.observe_request(stats, request.method, response.status_code)
+        if stats.slow_queries:
+            slowqueries.save_captures(stats.view_name, stats.slow_queries)
+
+        budget = getattr(request, "_query_budget", None) or default_budget()
+        exceeded = budget.exceeded(stats)
+        if exceeded:
+            dups = "; ".join(f"{n}x {shape[:160]}" for shape, n in stats.duplicated_shapes())
+            logger.warning(
+                "Budget dépassé %s (%s) : %d requêtes, %.1f ms SQL, vue %.1f ms | doublons : %s",
+                stats.view_name,
+                ", ".join(exceeded),
+                stats.queries,
+                stats.db_ms,
+                stats.view_ms,
+                dups or "—",
+            )
+
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'db;dur={stats.db_ms};desc="{stats.queries} queries", '
+                f'dup;desc="max {stats.max_duplicates} repeats", '
+                f"app;dur={stats.view_ms}"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = getattr(view_func, "query_budget", None)
+        stats = current_stats.get()
+        if stats is not None and request.resolver_match is not None:
+            stats.view_name = request.resolver_match.view_name or stats.view_name
+            stats.resolved = True
+        return None
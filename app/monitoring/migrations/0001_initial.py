@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('view', models.CharField(blank=True, default='', max_length=120)),
+                ('fingerprint', models.CharField(db_index=True, max_length=16)),
+                ('shape', models.TextField()),
+                ('sql', models.TextField()),
+                ('duration_ms', models.FloatField()),
+                ('plan', models.TextField(blank=True, default='')),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import models
+from django.utils import timezone
+
+
+class SlowQuery(models.Model):
+    """
+    Requête SQL lente capturée par monitoring.slowqueries (tampon borné :
+    SLOW_QUERY_MAX_ROWS lignes, les plus anciennes sont supprimées).
+    """
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    view = models.CharField(max_length=120, blank=True, default="")
+    fingerprint = models.CharField(max_length=16, db_index=True)   # sha1 tronqué de la forme
+    shape = models.TextField()                                     # requête normalisée (sans valeurs)
+    sql = models.TextField()                                       # requête telle qu'exécutée (placeholders)
+    duration_ms = models.FloatField()
+    plan = models.TextField(blank=True, default="")               # EXPLAIN (sans ANALYZE)
+
+    class Meta:
+        ordering = ["-id"]
+
+    def __str__(self):
+        return f"{self.view} {self.duration_ms:.0f} ms"
@@ -0,0 +1,173 @@
+"""
+Profilage cProfile de requêtes réelles (vue + rendu des templates).
+
+Seules les requêtes d'administrateurs sont profilées :
+- à la demande : ?_profile=1 dans l'URL ;
+- par échantillonnage : PROFILING_SAMPLE_RATE (0.0 à 1.0, 0 = désactivé).
+
+Chaque profil est écrit dans PROFILING_DIR (format pstats + métadonnées JSON).
+Le répertoire est un tampon circulaire : au-delà de PROFILING_MAX_FILES, les
+plus anciens sont supprimés. Consultation : /monitoring/profiles/.
+"""
+import cProfile
+import datetime
+import json
+import os
+import pstats
+import random
+import re
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_ID = re.compile(r"^[0-9]+-[0-9]+$")
+
+
+def profiles_dir() -> Path:
+    return Path(getattr(settings, "PROFILING_DIR", settings.BASE_DIR / "profiles"))
+
+
+def _can_be_profiled(user) -> bool:
+    return user.is_authenticated and (
+        user.is_superuser or user.role in {user.Roles.ADMIN, user.Roles.SUPERADMIN}
+    )
+
+
+class ProfilingMiddleware:
+    """À placer après AuthenticationMiddleware (a besoin de request.user)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = float(getattr(settings, "PROFILING_SAMPLE_RATE", 0.0))
+        self.max_files = int(getattr(settings, "PROFILING_MAX_FILES", 50))
+
+    def _wanted(self, request) -> bool:
+        if not _can_be_profiled(request.user):
+            return False
+        if request.GET.get("_profile") == "1":
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self._wanted(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Un autre profileur est déjà actif (debugger, autre outil)
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, "resolver_match", None)
+        meta = {
+            "path": request.get_full_path(),
+            "method": request.method,
+            "view": (match.view_name if match else "") or "",
+            "user": request.user.get_username(),
+            "status": response.status_code,
+            "duration_ms": round(elapsed_ms, 1),
+            "created": time.time(),
+        }
+        try:
+            save_profile(profiler, meta, self.max_files)
+        except OSError:
+            pass
+        return response
+
+
+def save_profile(profiler, meta, max_files):
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{time.time_ns()}-{os.getpid()}"
+    profiler.dump_stats(directory / f"{profile_id}.prof")
+    (directory / f"{profile_id}.json").write_text(json.dumps(meta), encoding="utf-8")
+    _trim(directory, max_files)
+    return profile_id
+
+
+def _trim(directory: Path, max_files: int):
+    """Tampon circulaire : garde les max_files profils les plus récents."""
+    ids = sorted((p.stem for p in directory.glob("*.prof")), key=lambda s: int(s.split("-")[0]))
+    for old in ids[:-max_files] if max_files > 0 else ids:
+        for suffix in (".prof", ".json"):
+            try:
+                (directory / f"{old}{suffix}").unlink()
+            except FileNotFoundError:
+                pass  # supprimé en parallèle par un autre worker
+
+
+def list_profiles():
+    directory = profiles_dir()
+    if not directory.exists():
+        return []
+    out = []
+    for meta_path in directory.glob("*.json"):
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        meta["id"] = meta_path.stem
+        meta["created_at"] = datetime.datetime.fromtimestamp(meta.get("created", 0), tz=datetime.timezone.utc)
+        out.append(meta)
+    out.sort(key=lambda m: m.get("created", 0), reverse=True)
+    return out
+
+
+def load_profile(profile_id):
+    """(métadonnées, pstats.Stats) ou None si l'id est invalide / expiré."""
+    if not PROFILE_ID.match(profile_id or ""):
+        return None
+    directory = profiles_dir()
+    try:
+        meta = json.loads((directory / f"{profile_id}.json").read_text(encoding="utf-8"))
+        stats = pstats.Stats(str(directory / f"{profile_id}.prof"))
+    except (OSError, ValueError, EOFError):
+        return None
+    meta["id"] = profile_id
+    return meta, stats
+
+
+SORT_KEYS = {
+    "cumulative": 3,
+    "tottime": 2,
+    "ncalls": 1,
+}
+
+
+def _short_path(filename: str) -> str:
+    base = str(settings.BASE_DIR)
+    if filename.startswith(base):
+        return filename[len(base) + 1:]
+    marker = "site-packages/"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return filename
+
+
+def top_functions(stats, sort="cumulative", limit=50, q=""):
+    """Lignes triées : fonction, appels, temps propre / cumulé (ms)."""
+    index = SORT_KEYS.get(sort, 3)
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        location = f"{_short_path(filename)}:{line}" if line else filename
+        if q and q.lower() not in f"{location} {func}".lower():
+            continue
+        rows.append({
+            "function": func,
+            "location": location,
+            "ncalls": nc if nc == cc else f"{nc}/{cc}",
+            "_sort": (cc, nc, tt, ct)[index],
+            "tottime_ms": round(tt * 1000, 2),
+            "cumtime_ms": round(ct * 1000, 2),
+            "percall_ms": round(ct * 1000 / nc, 3) if nc else 0.0,
+        })
+    rows.sort(key=lambda r: r["_sort"], reverse=True)
+    return rows[:limit], round(stats.total_tt * 1000, 1)
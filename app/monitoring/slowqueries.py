@@ -0,0 +1,80 @@
+"""
+Capture des requêtes SQL lentes avec leur plan d'exécution.
+
+Toute requête au-delà de SLOW_QUERY_THRESHOLD_MS est retenue (avec la
+probabilité SLOW_QUERY_SAMPLE_RATE) pendant la requête HTTP. En fin de
+requête, le middleware lance EXPLAIN (sans ANALYZE : la requête n'est pas
+rejouée) et enregistre le tout dans SlowQuery. La table est un tampon
+borné à SLOW_QUERY_MAX_ROWS lignes. Consultation : /monitoring/slow-queries/.
+"""
+import logging
+import random
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from .models import SlowQuery
+from .sql import normalize_sql, sql_fingerprint
+
+logger = logging.getLogger("monitoring.slowqueries")
+
+# Instructions pour lesquelles EXPLAIN a un sens (pas de SAVEPOINT, SET...)
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+# Au plus N captures par requête HTTP (une page pathologique ne noie pas le tampon)
+MAX_PER_REQUEST = 5
+
+
+def threshold_seconds():
+    """Seuil en secondes, ou None si la capture est désactivée."""
+    threshold_ms = float(getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0))
+    rate = float(getattr(settings, "SLOW_QUERY_SAMPLE_RATE", 0))
+    if threshold_ms <= 0 or rate <= 0:
+        return None
+    return threshold_ms / 1000
+
+
+def should_capture(pending) -> bool:
+    if len(pending) >= MAX_PER_REQUEST:
+        return False
+    return random.random() < float(getattr(settings, "SLOW_QUERY_SAMPLE_RATE", 0))
+
+
+def _explain(alias, sql, params):
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return ""
+    connection = connections[alias]
+    if connection.needs_rollback:
+        return ""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN {sql}", params)
+            return "\n".join(row[0] for row in cursor.fetchall())
+    except DatabaseError as exc:
+        return f"(EXPLAIN impossible : {exc})"
+
+
+def save_captures(view, pending):
+    """Appelé par le middleware hors wrapper SQL : EXPLAIN + écriture + purge."""
+    rows = []
+    for alias, sql, params, seconds in pending:
+        shape = normalize_sql(sql)
+        rows.append(SlowQuery(
+            view=view[:120],
+            fingerprint=sql_fingerprint(shape),
+            shape=shape,
+            sql=sql,
+            duration_ms=round(seconds * 1000, 1),
+            plan=_explain(alias, sql, params),
+        ))
+    try:
+        SlowQuery.objects.bulk_create(rows)
+        _trim(int(getattr(settings, "SLOW_QUERY_MAX_ROWS", 1000)))
+    except DatabaseError:
+        logger.exception("Enregistrement des requêtes lentes impossible")
+
+
+def _trim(max_rows):
+    """Tampon borné : ne garde que les max_rows captures les plus récentes."""
+    cutoff = SlowQuery.objects.order_by("-id").values_list("id", flat=True)[max_rows:max_rows + 1].first()
+    if cutoff is not None:
+        SlowQuery.objects.filter(id__lte=cutoff).delete()
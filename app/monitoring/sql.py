@@ -0,0 +1,25 @@
+import hashlib
+import re
+
+# IN (%s, %s, %s) -> IN (...) : même forme quel que soit le nombre d'ids
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*%s\s*,)*\s*%s\s*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Forme normalisée d'une requête (sans valeurs) pour regrouper les
+    exécutions identiques : N+1, requêtes lentes, etc.
+    Les requêtes ORM arrivent déjà avec des %s ; on neutralise en plus les
+    littéraux des requêtes brutes.
+    """
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def sql_fingerprint(shape: str) -> str:
+    return hashlib.sha1(shape.encode("utf-8")).hexdigest()[:16]
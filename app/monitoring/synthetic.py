@@ -0,0 +1,289 @@
+"""
+Jeu de données synthétique déterministe (même graine => mêmes données) pour
+reproduire une flotte à l'échelle production : organisations, utilisateurs,
+aéronefs, moteurs, années de journaux cellule / moteur, composants avec
+historique kardex, articles de stock.
+
+Tout ce qui est généré est marqué (organisations "SYN ...", utilisateurs
+"syn...", S/N composants "SYN...") pour pouvoir être supprimé avec reset().
+"""
+import bisect
+import datetime
+import random
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+
+from accounts.models import Organization
+from fleet.models import Aircraft, FlightLog
+from kardex.models import Component, Engine, EngineLog, KardexEntry
+from stock.models import StockItem, StockLocation
+
+User = get_user_model()
+
+ORG_PREFIX = "SYN "
+USER_PREFIX = "syn"
+SERIAL_PREFIX = "SYN"
+BATCH_SIZE = 5000
+
+AERODROMES = [
+    "LFPN", "LFPT", "LFPZ", "LFOX", "LFFE", "LFAQ", "LFBO", "LFBZ", "LFCL", "LFLY",
+    "LFMD", "LFMT", "LFNB", "LFRN", "LFRS", "LFSD", "LFST", "LFGA", "LFEZ", "LFQQ",
+]
+TYPES = [
+    ("Robin", "DR400", Aircraft.Category.SEP, 1),
+    ("Cessna", "172", Aircraft.Category.SEP, 1),
+    ("Piper", "PA-28", Aircraft.Category.SEP, 1),
+    ("Piper", "PA-34", Aircraft.Category.MEP, 2),
+    ("Tecnam", "P2006T", Aircraft.Category.MEP, 2),
+    ("Best Off", "Nynja", Aircraft.Category.ULM, 1),
+]
+COMPONENTS = [
+    ("Alternateur", "24", Component.Category.AIRFRAME),
+    ("Batterie", "24", Component.Category.AVIONICS),
+    ("Transpondeur", "34", Component.Category.AVIONICS),
+    ("Balise ELT", "25", Component.Category.AVIONICS),
+    ("Amortisseur train", "32", Component.Category.AIRFRAME),
+    ("Roue principale", "32", Component.Category.AIRFRAME),
+    ("Hélice", "61", Component.Category.PROPELLER),
+    ("Magnéto", "74", Component.Category.ENGINE),
+    ("Démarreur", "80", Component.Category.ENGINE),
+    ("Pompe à vide", "37", Component.Category.ENGINE),
+    ("Carburateur", "73", Component.Category.ENGINE),
+    ("Harnais", "25", Component.Category.OTHER),
+]
+STOCK_DESIGNATIONS = [
+    "Bougie", "Filtre à huile", "Joint torique", "Rivet", "Durite", "Ampoule", "Collier",
+    "Fusible", "Plaquette de frein", "Chambre à air", "Pneu", "Courroie", "Câble", "Vis",
+]
+
+
+class _Totals:
+    """Totaux cumulés (minutes / cycles) d'une machine, interrogeables à une date."""
+
+    def __init__(self, initial_minutes, initial_cycles):
+        self.dates = []
+        self.minutes = []
+        self.cycles = []
+        self.m = initial_minutes
+        self.c = initial_cycles
+        self.initial = (initial_minutes, initial_cycles)
+
+    def add(self, date, minutes, cycles):
+        self.m += minutes
+        self.c += cycles
+        self.dates.append(date)
+        self.minutes.append(self.m)
+        self.cycles.append(self.c)
+
+    def at(self, date):
+        i = bisect.bisect_right(self.dates, date)
+        if i == 0:
+            return self.initial
+        return self.minutes[i - 1], self.cycles[i - 1]
+
+
+def _bulk(model, rows):
+    for i in range(0, len(rows), BATCH_SIZE):
+        model.objects.bulk_create(rows[i:i + BATCH_SIZE], batch_size=BATCH_SIZE)
+
+
+def reset():
+    """Supprime toutes les données synthétiques (cascade logs, stock, règles)."""
+    comps = Component.objects.filter(serial_number__startswith=SERIAL_PREFIX)
+    counts = {
+        "components": comps.delete()[0],
+        "organizations": Organization.objects.filter(name__startswith=ORG_PREFIX).delete()[0],
+        "users": User.objects.filter(username__startswith=USER_PREFIX + "_").delete()[0],
+    }
+    return counts
+
+
+@transaction.atomic
+def generate(
+    organizations=5,
+    aircraft_per_org=20,
+    years=10,
+    flights_per_year=150,
+    components_per_aircraft=12,
+    kardex_cycles=3,
+    stock_items_per_org=500,
+    seed=42,
+    end_date=datetime.date(2025, 12, 31),
+    log=lambda msg: None,
+):
+    rng = random.Random(seed)
+    counts = {"organizations": 0, "users": 0, "aircraft": 0, "engines": 0, "flight_logs": 0,
+              "engine_logs": 0, "components": 0, "kardex_entries": 0, "stock_items": 0}
+
+    superadmin, _ = User.objects.get_or_create(
+        username=f"{USER_PREFIX}_superadmin",
+        defaults={"role": User.Roles.SUPERADMIN, "first_name": "Synthétique"},
+    )
+    superadmin.set_unusable_password()
+    superadmin.save()
+    counts["users"] += 1
+
+    start_year = end_date.year - years + 1
+    serial = 0
+
+    for o in range(organizations):
+        org = Organization.objects.create(name=f"{ORG_PREFIX}Aéroclub {o:03d}")
+        counts["organizations"] += 1
+
+        users = []
+        for role in (User.Roles.ADMIN, User.Roles.CAMO, User.Roles.PILOT, User.Roles.OWNER):
+            u = User(username=f"{USER_PREFIX}_{o:03d}_{role}", role=role, organization=org,
+                     first_name=role.label, last_name=f"{o:03d}")
+            u.set_unusable_password()
+            users.append(u)
+        User.objects.bulk_create(users)
+        counts["users"] += len(users)
+        users = list(User.objects.filter(organization=org).order_by("id"))
+        pilots = [u for u in users if u.role in {User.Roles.PILOT, User.Roles.OWNER}]
+        owner = next(u for u in users if u.role == User.Roles.OWNER)
+
+        aircraft = []
+        for a in range(aircraft_per_org):
+            manufacturer, model, category, _n = TYPES[rng.randrange(len(TYPES))]
+            aircraft.append(Aircraft(
+                registration=f"SYN-{o:03d}{a:03d}",
+                manufacturer=manufacturer,
+                model=model,
+                category=category,
+                year=rng.randint(1960, 2020),
+                serial_number=f"{SERIAL_PREFIX}{o:03d}{a:04d}",
+                initial_minutes=rng.randint(0, 3000) * 60,
+                initial_cycles=rng.randint(0, 5000),
+                organization=org,
+                owner_user=owner if rng.random() < 0.3 else None,
+            ))
+        Aircraft.objects.bulk_create(aircraft)
+        aircraft = list(Aircraft.objects.filter(organization=org).order_by("id"))
+        counts["aircraft"] += len(aircraft)
+
+        for ac in aircraft:
+            n_engines = next(n for m, mo, c, n in TYPES if m == ac.manufacturer and mo == ac.model)
+            engines = [
+                Engine(aircraft=ac, name=f"Moteur {i + 1}", manufacturer="Lycoming", model="O-360",
+                       serial_number=f"{SERIAL_PREFIX}E{ac.id:06d}{i}",
+                       initial_minutes=rng.randint(0, 1500) * 60, initial_cycles=rng.randint(0, 2000))
+                for i in range(n_engines)
+            ]
+            Engine.objects.bulk_create(engines)
+            engines = list(ac.engines.order_by("id"))
+            counts["engines"] += len(engines)
+
+            # --- Journaux cellule + moteurs (miroir, comme flightlog_add) ---
+            ac_totals = _Totals(ac.initial_minutes, ac.initial_cycles)
+            eng_totals = {e.id: _Totals(e.initial_minutes, e.initial_cycles) for e in engines}
+            flights = []
+            for year in range(start_year, end_date.year + 1):
+                days = sorted(rng.randrange(365) for _ in range(flights_per_year))
+                for d in days:
+                    date = min(datetime.date(year, 1, 1) + datetime.timedelta(days=d), end_date)
+                    duration = rng.randint(20, 240)
+                    cycles = rng.choice((1, 1, 1, 2, 3))
+                    frm, to = rng.sample(AERODROMES, 2)
+                    flights.append(FlightLog(
+                        aircraft=ac, date=date, from_icao=frm, to_icao=to, duration_minutes=duration,
+                        cycles=cycles, pilot=rng.choice(pilots), remarks="",
+                    ))
+                    ac_totals.add(date, duration, cycles)
+            _bulk(FlightLog, flights)
+            counts["flight_logs"] += len(flights)
+
+            engine_logs = []
+            for e in engines:
+                for f in flights:
+                    engine_logs.append(EngineLog(
+                        engine=e, date=f.date, duration_minutes=f.duration_minutes, cycles=f.cycles,
+                        remarks=f"Vol {f.from_icao} -> {f.to_icao}", created_by=f.pilot,
+                    ))
+                    eng_totals[e.id].add(f.date, f.duration_minutes, f.cycles)
+            _bulk(EngineLog, engine_logs)
+            counts["engine_logs"] += len(engine_logs)
+
+            # --- Composants + historique kardex ---
+            history_start = datetime.date(start_year, 1, 1)
+            span = (end_date - history_start).days
+            comps, histories = [], []
+            for i in range(components_per_aircraft):
+                name, ata, category = COMPONENTS[i % len(COMPONENTS)]
+                on_engine = category == Component.Category.ENGINE and engines
+                target_engine = engines[i % len(engines)] if on_engine else None
+                totals = eng_totals[target_engine.id] if target_engine else ac_totals
+                serial += 1
+
+                events = []
+                day = rng.randrange(max(1, span // 4))
+                for k in range(kardex_cycles):
+                    install_date = history_start + datetime.timedelta(days=day)
+                    events.append((KardexEntry.Action.INSTALL, install_date))
+                    day += rng.randint(30, max(31, span // max(1, kardex_cycles)))
+                    events.append((KardexEntry.Action.INSPECT, history_start + datetime.timedelta(days=min(day, span))))
+                    if k < kardex_cycles - 1:
+                        day += rng.randint(1, 20)
+                        events.append((KardexEntry.Action.REMOVE, history_start + datetime.timedelta(days=min(day, span))))
+                        day += rng.randint(1, 60)
+                        events.append((KardexEntry.Action.SEND_SHOP, history_start + datetime.timedelta(days=min(day, span))))
+                        events.append((KardexEntry.Action.RETURN_SHOP, history_start + datetime.timedelta(days=min(day + 30, span))))
+                        day += 31
+
+                # ~10 % des composants finissent déposés (en stock, rattachés via le kardex)
+                removed = rng.random() < 0.1
+                if removed:
+                    events.append((KardexEntry.Action.REMOVE, end_date))
+
+                limit_minutes = rng.choice((0, 1000 * 60, 2000 * 60, 3000 * 60))
+                comp = Component(
+                    category=category, ata=ata, name=name, manufacturer="SynthAero",
+                    part_number=f"PN-{ata}-{i:03d}", serial_number=f"{SERIAL_PREFIX}{serial:07d}",
+                    initial_tsn_minutes=rng.randint(0, 500) * 60, initial_csn_cycles=rng.randint(0, 500),
+                    limit_minutes=limit_minutes, limit_cycles=rng.choice((0, 0, 3000, 6000)),
+                    status=Component.Status.STOCK if removed else Component.Status.INSTALLED,
+                    installed_aircraft=None if (removed or target_engine) else ac,
+                    installed_engine=None if removed else target_engine,
+                    installed_position="" if removed else f"Pos {i + 1}",
+                )
+                comps.append(comp)
+                histories.append((comp, target_engine, totals, events))
+            Component.objects.bulk_create(comps)
+            counts["components"] += len(comps)
+
+            entries = []
+            for comp, target_engine, totals, events in histories:
+                for action, date in events:
+                    minutes, cycles = totals.at(date)
+                    entries.append(KardexEntry(
+                        component=comp, action=action, date=date,
+                        aircraft=None if target_engine else ac, engine=target_engine,
+                        position=comp.installed_position, at_minutes=minutes, at_cycles=cycles,
+                        workorder_ref=f"WO-{date.year}-{comp.serial_number[-5:]}",
+                    ))
+            _bulk(KardexEntry, entries)
+            counts["kardex_entries"] += len(entries)
+
+        # --- Stock ---
+        locations = [StockLocation(organization=org, name=f"Magasin {n}") for n in ("A", "B", "C")]
+        StockLocation.objects.bulk_create(locations)
+        locations = list(org.stock_locations.order_by("id"))
+        items = []
+        for n in range(stock_items_per_org):
+            designation = STOCK_DESIGNATIONS[rng.randrange(len(STOCK_DESIGNATIONS))]
+            items.append(StockItem(
+                organization=org, designation=f"{designation} {n:05d}", pn=f"SP-{rng.randrange(10**6):06d}",
+                ata=rng.choice(("", "21", "24", "32", "61", "71")),
+                barcode=f"{SERIAL_PREFIX}{o:03d}{n:06d}",
+            ))
+        _bulk(StockItem, items)
+        items = list(org.stock_items.order_by("id"))
+        through = StockItem.locations.through
+        _bulk(through, [
+            through(stockitem_id=it.id, stocklocation_id=rng.choice(locations).id) for it in items
+        ])
+        counts["stock_items"] += len(items)
+
+        log(f"Organisation {o + 1}/{organizations} générée.")
+
+    return counts
@@ -0,0 +1,15 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("db-pool/", views.db_pool_stats, name="monitoring_db_pool"),
+
+    # Profils cProfile (tampon circulaire sur disque)
+    path("profiles/", views.profile_list, name="monitoring_profile_list"),
+    path("profiles/<str:profile_id>/", views.profile_detail, name="monitoring_profile_detail"),
+    path("profiles/<str:profile_id>/download/", views.profile_download, name="monitoring_profile_download"),
+
+    # Requêtes SQL lentes (regroupées par forme normalisée)
+    path("slow-queries/", views.slow_query_list, name="monitoring_slow_query_list"),
+    path("slow-queries/<str:fingerprint>/", views.slow_query_detail, name="monitoring_slow_query_detail"),
+]
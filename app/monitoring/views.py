@@ -0,0 +1,155 @@
+import hmac
+import os
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.db.models import Avg, Count, Max, Sum
+from django.shortcuts import render
+
+from navigabilite.db.base import pool_stats
+
+from . import metrics as prom
+from . import profiling
+from .models import SlowQuery
+
+
+def _can_view_monitoring(user) -> bool:
+    return user.is_authenticated and (user.is_superuser or user.role == user.Roles.SUPERADMIN)
+
+
+def _has_metrics_token(request) -> bool:
+    token = getattr(settings, "METRICS_TOKEN", "")
+    header = request.headers.get("Authorization", "")
+    return bool(token) and hmac.compare_digest(header, f"Bearer {token}")
+
+
+def metrics(request):
+    """
+    Métriques au format texte Prometheus, agrégées sur tous les workers.
+    Scraper : en-tête "Authorization: Bearer <METRICS_TOKEN>".
+    Sans jeton : réservé aux super-administrateurs connectés.
+    """
+    if not (_has_metrics_token(request) or _can_view_monitoring(request.user)):
+        return HttpResponseForbidden("Accès refusé.")
+
+    body, content_type = prom.render_latest()
+    return HttpResponse(body, content_type=content_type)
+
+
+@login_required
+def db_pool_stats(request):
+    """
+    Stats du pool de connexions du worker qui répond (un pool par process).
+    À interroger plusieurs fois pendant un test de charge pour dimensionner
+    DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE.
+    """
+    if not _can_view_monitoring(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+
+    return JsonResponse({"pid": os.getpid(), "pools": pool_stats()})
+
+
+@login_required
+def profile_list(request):
+    if not _can_view_monitoring(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+
+    return render(request, "monitoring/profile_list.html", {
+        "profiles": profiling.list_profiles(),
+        "sample_rate": getattr(settings, "PROFILING_SAMPLE_RATE", 0.0),
+        "max_files": getattr(settings, "PROFILING_MAX_FILES", 50),
+    })
+
+
+@login_required
+def profile_detail(request, profile_id: str):
+    if not _can_view_monitoring(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+
+    loaded = profiling.load_profile(profile_id)
+    if loaded is None:
+        raise Http404("Profil introuvable (expiré ?).")
+    meta, stats = loaded
+
+    sort = request.GET.get("sort") or "cumulative"
+    if sort not in profiling.SORT_KEYS:
+        sort = "cumulative"
+    q = (request.GET.get("q") or "").strip()
+    rows, total_ms = profiling.top_functions(stats, sort=sort, q=q)
+
+    return render(request, "monitoring/profile_detail.html", {
+        "meta": meta,
+        "rows": rows,
+        "total_ms": total_ms,
+        "sort": sort,
+        "q": q,
+        "sort_choices": list(profiling.SORT_KEYS),
+    })
+
+
+@login_required
+def profile_download(request, profile_id: str):
+    """Fichier pstats brut (snakeviz, python -m pstats...)."""
+    if not _can_view_monitoring(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+    if not profiling.PROFILE_ID.match(profile_id):
+        raise Http404()
+    path = profiling.profiles_dir() / f"{profile_id}.prof"
+    if not path.exists():
+        raise Http404("Profil introuvable (expiré ?).")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=f"{profile_id}.prof")
+
+
+@login_required
+def slow_query_list(request):
+    """Requêtes lentes capturées, regroupées par forme (pires en premier)."""
+    if not _can_view_monitoring(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+
+    sort = request.GET.get("sort") or "total"
+    order = {"total": "-total_ms", "max": "-max_ms", "count": "-count", "recent": "-last_seen"}.get(sort, "-total_ms")
+    groups = (
+        SlowQuery.objects.values("fingerprint")
+        .annotate(
+            count=Count("id"),
+            total_ms=Sum("duration_ms"),
+            avg_ms=Avg("duration_ms"),
+            max_ms=Max("duration_ms"),
+            last_seen=Max("created_at"),
+            shape=Max("shape"),
+            view=Max("view"),
+        )
+        .order_by(order)
+    )
+    groups = groups[:100]
+
+    return render(request, "monitoring/slow_query_list.html", {
+        "groups": groups,
+        "sort": sort,
+        "threshold_ms": getattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0),
+        "sample_rate": getattr(settings, "SLOW_QUERY_SAMPLE_RATE", 0),
+        "max_rows": getattr(settings, "SLOW_QUERY_MAX_ROWS", 1000),
+    })
+
+
+@login_required
+def slow_query_detail(request, fingerprint: str):
+    """Captures d'une même forme : vues concernées, durées, plans EXPLAIN."""
+    if not _can_view_monitoring(request.user):
+        return HttpResponseForbidden("Accès refusé.")
+
+    captures = list(SlowQuery.objects.filter(fingerprint=fingerprint)[:50])
+    if not captures:
+        raise Http404("Forme de requête introuvable (purgée ?).")
+    views_count = (
+        SlowQuery.objects.filter(fingerprint=fingerprint)
+        .values("view").annotate(count=Count("id")).order_by("-count")
+    )
+
+    return render(request, "monitoring/slow_query_detail.html", {
+        "fingerprint": fingerprint,
+        "shape": captures[0].shape,
+        "captures": captures,
+        "views_count": views_count,
+    })
@@ -0,0 +1,52 @@
+"""
+Admin Django sur de gros volumes (kardex, journaux, utilisateurs).
+
+- Compteurs : le COUNT(*) de la liste parcourt toute la table à chaque page.
+  EstimatedCountPaginator demande d'abord l'estimation du planificateur
+  (EXPLAIN, statistiques d'ANALYZE) et ne compte vraiment que sous
+  ADMIN_EXACT_COUNT_LIMIT lignes. Au-delà, le total affiché est approché.
+- Le second COUNT(*) (« n résultats sur N au total ») est désactivé.
+- Recherches : préfixe (« ^champ », UPPER(champ) LIKE 'XX%'), servi par les
+  index text_pattern_ops ; jamais de LIKE '%xx%' sur une grosse table.
+"""
+import json
+
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset):
+    """Nombre de lignes estimé par PostgreSQL ; None hors PostgreSQL."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:  # filtre impossible (pk__in=[])
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        limit = getattr(settings, "ADMIN_EXACT_COUNT_LIMIT", 10000)
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < limit:
+            return super().count
+        return estimate
+
+
+class LargeTableAdmin:
+    """Mixin des ModelAdmin sur des tables volumineuses (à placer avant ModelAdmin)."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,168 @@
+"""
+Backend PostgreSQL avec pool de connexions (psycopg_pool).
+
+S'utilise comme le backend standard ("ENGINE": "navigabilite.db"). Le pool
+n'est activé que si OPTIONS["pool"] est présent dans settings.DATABASES :
+
+    "OPTIONS": {"pool": {"min_size": 2, "max_size": 10, "timeout": 10}}
+
+- Django rend la connexion au pool en fin de requête (CONN_MAX_AGE = 0)
+  au lieu de la fermer : plus de handshake TCP/TLS/auth par requête.
+- CONN_HEALTH_CHECKS = True => chaque connexion est vérifiée à la sortie
+  du pool (connexion morte remplacée, jamais servie à une vue).
+- Un pool par (process, alias, base) : après un fork (gunicorn), le worker
+  crée son propre pool et ne réutilise jamais les sockets du parent.
+"""
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+try:
+    from psycopg_pool import ConnectionPool
+except ImportError as exc:  # pragma: no cover
+    raise ImproperlyConfigured("psycopg_pool manquant : pip install 'psycopg[pool]'.") from exc
+
+
+# (pid, alias, nom de base) -> ConnectionPool
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _after_fork_in_child():
+    """
+    Dans le process enfant : on oublie les connexions héritées du parent sans
+    les fermer (psycopg ne termine pas une connexion créée par un autre pid).
+    Les pools du parent restent référencés dans _pools mais ne sont plus
+    jamais utilisés (la clé contient le pid).
+    """
+    for conn in connections.all(initialized_only=True):
+        if getattr(conn, "_pool_key", None) is not None and conn.connection is not None:
+            conn.connection = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def pool_stats():
+    """
+    Statistiques des pools du process courant, par alias.
+
+    wait_ms_avg : attente moyenne pour obtenir une connexion (requêtes mises en file)
+    utilization : connexions prêtées / max_size (1.0 = pool saturé)
+    """
+    pid = os.getpid()
+    out = {}
+    for (key_pid, alias, _name), pool in list(_pools.items()):
+        if key_pid != pid:
+            continue
+        stats = pool.get_stats()
+        size = stats.get("pool_size", 0)
+        available = stats.get("pool_available", 0)
+        queued = stats.get("requests_queued", 0)
+        wait_ms = stats.get("requests_wait_ms", 0)
+        out[alias] = {
+            **stats,
+            "in_use": size - available,
+            "utilization": round((size - available) / pool.max_size, 3) if pool.max_size else 0.0,
+            "wait_ms_avg": round(wait_ms / queued, 2) if queued else 0.0,
+        }
+    return out
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def destroy_test_db(self, *args, **kwargs):
+        # Les connexions inactives du pool bloqueraient le DROP DATABASE de la base de test
+        self.connection.close()
+        self.connection.close_pool()
+        return super().destroy_test_db(*args, **kwargs)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    _pool_key = None
+
+    def _pool_options(self):
+        if self.alias == NO_DB_ALIAS:
+            return None
+        return self.settings_dict["OPTIONS"].get("pool")
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pool", None)
+        return params
+
+    @property
+    def pool(self):
+        options = self._pool_options()
+        if not options:
+            return None
+
+        key = (os.getpid(), self.alias, self.settings_dict["NAME"])
+        pool = _pools.get(key)
+        if pool is not None:
+            return pool
+
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                if self.settings_dict["CONN_MAX_AGE"] != 0:
+                    raise ImproperlyConfigured("Pool de connexions : CONN_MAX_AGE doit valoir 0.")
+                options = {} if options is True else dict(options)
+                kwargs = self.get_connection_params()
+                # Django repositionne l'autocommit à chaque emprunt.
+                kwargs["autocommit"] = True
+                pool = ConnectionPool(
+                    kwargs=kwargs,
+                    open=False,  # ouvert au premier emprunt, jamais dans le master gunicorn
+                    check=ConnectionPool.check_connection if self.settings_dict["CONN_HEALTH_CHECKS"] else None,
+                    name=f"{self.alias}-{os.getpid()}",
+                    **options,
+                )
+                _pools[key] = pool
+        return pool
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        try:
+            self.isolation_level = IsolationLevel(isolation_level or IsolationLevel.READ_COMMITTED)
+        except ValueError:
+            raise ImproperlyConfigured(f"Niveau d'isolation invalide : {isolation_level}.")
+
+        pool.open()
+        connection = pool.getconn()
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        self._pool_key = (os.getpid(), self.alias, self.settings_dict["NAME"])
+        return connection
+
+    def _close(self):
+        key = self._pool_key
+        if self.connection is None or key is None:
+            return super()._close()
+
+        self._pool_key = None
+        pool = _pools.get(key)
+        if pool is None or key[0] != os.getpid():
+            # Connexion héritée d'un autre process : on la lâche sans la fermer.
+            self.connection = None
+            return
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+        self.connection = None
+
+    def close_pool(self):
+        key = (os.getpid(), self.alias, self.settings_dict["NAME"])
+        with _pools_lock:
+            pool = _pools.pop(key, None)
+        if pool is not None:
+            pool.close()
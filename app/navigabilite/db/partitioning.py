@@ -0,0 +1,200 @@
+"""
+Partitionnement déclaratif PostgreSQL par année (RANGE sur une colonne date).
+
+Utilisé pour les journaux (FlightLog, EngineLog) :
+- une partition par année : <table>_y1987, <table>_y2025... ;
+- une partition par défaut <table>_default : aucune insertion ne peut échouer
+  (vol de 1952 saisi d'après un carnet papier, année pas encore créée) ;
+- ensure_year_partitions() crée les années manquantes et y déplace les lignes
+  tombées dans la partition par défaut (commande ensure_log_partitions,
+  lancée aussi après chaque migrate).
+
+Contrainte PostgreSQL : la clé primaire d'une table partitionnée inclut la clé
+de partition => PRIMARY KEY (id, date) en base. Côté Django, id reste la clé
+primaire (unique de fait : séquence identity).
+"""
+import datetime
+
+from django.db import connection as default_connection
+
+
+def partition_name(table: str, year: int) -> str:
+    return f"{table}_y{year}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+    row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def list_partitions(cursor, table: str):
+    """[(nom, bornes)] des partitions de table, triées par nom."""
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        ORDER BY c.relname
+        """,
+        [table],
+    )
+    return cursor.fetchall()
+
+
+def _qn(name: str) -> str:
+    return default_connection.ops.quote_name(name)
+
+
+def _table_definition(cursor, table: str):
+    """Index (hors PK) et clés étrangères, à recréer sur la nouvelle table."""
+    cursor.execute(
+        """
+        SELECT indexdef FROM pg_indexes
+        WHERE schemaname = current_schema() AND tablename = %s
+          AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p')
+        ORDER BY indexname
+        """,
+        [table, table],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype = 'f'
+        ORDER BY conname
+        """,
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def _rebuild(cursor, table: str, create_sql: str, primary_key: str, after_create=None):
+    """
+    Recrée table (colonnes, CHECK, identity, défauts identiques) via create_sql,
+    copie les lignes, puis restaure PK, index et clés étrangères.
+    """
+    old = f"{table}_old"
+    indexes, foreign_keys = _table_definition(cursor, table)
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+    sequence = cursor.fetchone()[0]
+
+    cursor.execute(f"ALTER TABLE {_qn(table)} RENAME TO {_qn(old)}")
+    if sequence:
+        # La nouvelle séquence identity reprend le nom d'origine
+        cursor.execute(f"ALTER SEQUENCE {sequence} RENAME TO {_qn(old + '_id_seq')}")
+    cursor.execute(create_sql.format(table=_qn(table), old=_qn(old)))
+    if after_create:
+        after_create()
+
+    cursor.execute(f"INSERT INTO {_qn(table)} OVERRIDING SYSTEM VALUE SELECT * FROM {_qn(old)}")
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE((SELECT MAX(id) FROM {_qn(table)}), 0) + 1, false)",
+        [table],
+    )
+    cursor.execute(f"DROP TABLE {_qn(old)}")
+
+    cursor.execute(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(table + '_pkey')} PRIMARY KEY ({primary_key})")
+    for indexdef in indexes:
+        # Définitions lues avant le renommage : elles visent déjà le nom d'origine
+        cursor.execute(indexdef)
+    for name, definition in foreign_keys:
+        cursor.execute(f"ALTER TABLE {_qn(table)} ADD CONSTRAINT {_qn(name)} {definition}")
+
+
+def _data_years(cursor, table: str, column: str):
+    cursor.execute(f"SELECT EXTRACT(YEAR FROM MIN({_qn(column)}))::int, EXTRACT(YEAR FROM MAX({_qn(column)}))::int FROM {_qn(table)}")
+    lo, hi = cursor.fetchone()
+    this_year = datetime.date.today().year
+    lo = lo or this_year
+    hi = max(hi or this_year, this_year) + 1
+    return range(lo, hi + 1)
+
+
+def partition_by_year(cursor, table: str, column: str = "date"):
+    """Convertit une table ordinaire en table partitionnée par année (migration)."""
+    if is_partitioned(cursor, table):
+        return
+    years = _data_years(cursor, table, column)
+
+    def create_partitions():
+        for year in years:
+            _create_year_partition(cursor, table, year, column=column)
+        cursor.execute(f"CREATE TABLE {_qn(default_partition_name(table))} PARTITION OF {_qn(table)} DEFAULT")
+
+    _rebuild(
+        cursor,
+        table,
+        "CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY) "
+        f"PARTITION BY RANGE ({_qn(column)})",
+        primary_key=f"id, {_qn(column)}",
+        after_create=create_partitions,
+    )
+
+
+def unpartition(cursor, table: str, column: str = "date"):
+    """Inverse de partition_by_year : retour à une table ordinaire (PK id)."""
+    if not is_partitioned(cursor, table):
+        return
+    _rebuild(
+        cursor,
+        table,
+        "CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY)",
+        primary_key="id",
+    )
+
+
+def _create_year_partition(cursor, table: str, year: int, column: str = "date"):
+    cursor.execute(
+        f"CREATE TABLE {_qn(partition_name(table, year))} PARTITION OF {_qn(table)} "
+        "FOR VALUES FROM (%s) TO (%s)",
+        [datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)],
+    )
+
+
+def ensure_year_partitions(cursor, table: str, years, column: str = "date"):
+    """
+    Crée les partitions annuelles manquantes. Les lignes de ces années déjà
+    présentes dans la partition par défaut y sont déplacées (sinon PostgreSQL
+    refuse la nouvelle partition). Retourne la liste des années créées.
+    """
+    if not is_partitioned(cursor, table):
+        return []
+    existing = {name for name, _bound in list_partitions(cursor, table)}
+    default = default_partition_name(table)
+    created = []
+    for year in sorted(set(years)):
+        name = partition_name(table, year)
+        if name in existing:
+            continue
+        start, end = datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+        if default in existing:
+            cursor.execute(f"CREATE TABLE {_qn(name)} (LIKE {_qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {_qn(default)} WHERE {_qn(column)} >= %s AND {_qn(column)} < %s RETURNING *) "
+                f"INSERT INTO {_qn(name)} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(
+                f"ALTER TABLE {_qn(table)} ATTACH PARTITION {_qn(name)} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+        else:
+            _create_year_partition(cursor, table, year, column=column)
+        created.append(year)
+    return created
+
+
+def default_partition_years(cursor, table: str, column: str = "date"):
+    """Années présentes dans la partition par défaut (à sortir en partitions dédiées)."""
+    default = default_partition_name(table)
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [default])
+    if not cursor.fetchone()[0]:
+        return []
+    cursor.execute(f"SELECT DISTINCT EXTRACT(YEAR FROM {_qn(column)})::int FROM {_qn(default)} ORDER BY 1")
+    return [row[0] for row in cursor.fetchall()]
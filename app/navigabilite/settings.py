@@ -15,18 +15,27 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'accounts',
     'fleet',
     'kardex',
     'stock',
+    'monitoring',
+    'idempotency',
+    'jobs',
+    'autocomplete',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Mesure SQL / temps par requête (en tête pour compter session + auth)
+    'monitoring.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Profilage cProfile des requêtes admin (?_profile=1 ou échantillonnage)
+    'monitoring.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -53,15 +62,33 @@ WSGI_APPLICATION = 'navigabilite.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # Backend PostgreSQL + pool psycopg_pool (voir navigabilite/db/base.py)
+        'ENGINE': 'navigabilite.db',
         'NAME': os.environ.get('DB_NAME', 'navdb'),
         'USER': os.environ.get('DB_USER', 'navuser'),
         'PASSWORD': os.environ.get('DB_PASSWORD', 'navpass'),
         'HOST': os.environ.get('DB_HOST', 'localhost'),
         'PORT': os.environ.get('DB_PORT', '5432'),
+        # Connexion vérifiée à chaque emprunt (pool) / réutilisation
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
 
+# --- Pool de connexions (par process / worker) ---
+# DB_POOL=0 pour revenir à une connexion par requête.
+if os.environ.get('DB_POOL', '1') == '1':
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        # Attente max (s) pour obtenir une connexion avant erreur
+        'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        # Connexions inactives au-delà de min_size fermées après (s)
+        'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+        # Recyclage des connexions (s)
+        'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', '1800')),
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', 'OPTIONS': {'min_length': 8}},
@@ -87,3 +114,89 @@ LOGOUT_REDIRECT_URL = '/login/'
 # --- Media (uploads) ---
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Derrière nginx : préfixe d'une location `internal` pointant sur MEDIA_ROOT
+# (ex. "/protected-media/") ; les avatars sont alors envoyés par nginx (X-Accel-Redirect)
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT', '')
+
+# --- Pièces jointes kardex (kardex.attachments) : stockage par empreinte SHA-256 ---
+# Hors MEDIA_ROOT : jamais servi directement, toujours via la vue (droits du composant)
+ATTACHMENTS_ROOT = os.environ.get('ATTACHMENTS_ROOT', str(BASE_DIR / 'attachments'))
+ATTACHMENT_MAX_MB = int(os.environ.get('ATTACHMENT_MAX_MB', '100'))
+ATTACHMENT_EXTENSIONS = ('pdf', 'jpg', 'jpeg', 'png', 'tif', 'tiff', 'webp', 'heic', 'xlsx', 'xls', 'docx', 'doc', 'csv', 'txt')
+# Derrière nginx : préfixe d'une location `internal` pointant sur ATTACHMENTS_ROOT
+ATTACHMENTS_ACCEL_REDIRECT = os.environ.get('ATTACHMENTS_ACCEL_REDIRECT', '')
+
+# --- Avatars (accounts.avatars) : réduits à l'envoi, variantes carrées WebP + JPEG ---
+AVATAR_SIZES = (64, 192)
+AVATAR_MAX_SIDE = 1024
+AVATAR_MAX_UPLOAD_MB = int(os.environ.get('AVATAR_MAX_UPLOAD_MB', '5'))
+
+# --- Clés d'idempotence (renvois de formulaires) ---
+IDEMPOTENCY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_TTL_HOURS', '24'))
+
+# --- Cache des calculs kardex (kardex.cache, invalidé par LISTEN/NOTIFY) ---
+# Totaux aéronef / moteur et TSN / CSN des composants, en mémoire par process.
+# Nécessite une connexion directe à PostgreSQL (LISTEN : pas de PgBouncer en mode transaction).
+ALERTING_CACHE_ENABLED = os.environ.get('ALERTING_CACHE_ENABLED', '1') == '1'
+ALERTING_CACHE_MAX_ENTRIES = int(os.environ.get('ALERTING_CACHE_MAX_ENTRIES', '50000'))
+
+# --- Tableau de bord en direct (flux SSE /aircraft/live/, fleet.live) ---
+# Durée max d'un flux (s) : le navigateur se reconnecte seul ensuite
+FLEET_LIVE_MAX_SECONDS = int(os.environ.get('FLEET_LIVE_MAX_SECONDS', '300'))
+
+# --- Tâches de fond (jobs, commande run_jobs) ---
+# Process worker par défaut ; délai de base des nouvelles tentatives (doublé à
+# chaque échec) ; tâche RUNNING sans nouvelle au-delà => worker jugé perdu
+JOBS_CONCURRENCY = int(os.environ.get('JOBS_CONCURRENCY', '2'))
+JOBS_RETRY_DELAY_SECONDS = int(os.environ.get('JOBS_RETRY_DELAY_SECONDS', '30'))
+JOBS_STALE_SECONDS = int(os.environ.get('JOBS_STALE_SECONDS', '600'))
+# Tâches terminées (et fichiers produits) conservées, en jours (commande purge_jobs)
+JOBS_RETENTION_DAYS = int(os.environ.get('JOBS_RETENTION_DAYS', '7'))
+
+# --- Compactage des journaux (fleet.compaction, commande compact_logs) ---
+# Années civiles gardées en détail ; 0 = désactivé (opt-in)
+LOG_COMPACTION_HORIZON_YEARS = int(os.environ.get('LOG_COMPACTION_HORIZON_YEARS', '0'))
+
+# --- Admin sur gros volumes (navigabilite.admin_utils) ---
+# Au-delà de cette estimation, les listes affichent le total estimé (pas de COUNT(*))
+ADMIN_EXACT_COUNT_LIMIT = int(os.environ.get('ADMIN_EXACT_COUNT_LIMIT', '10000'))
+
+# --- Instrumentation des requêtes (monitoring) ---
+# Budget des vues sans @query_budget ; au-delà => warning "monitoring.perf"
+PERF_DEFAULT_BUDGET = {
+    'queries': int(os.environ.get('PERF_MAX_QUERIES', '50')),
+    'duplicates': int(os.environ.get('PERF_MAX_DUPLICATES', '10')),
+    'view_ms': float(os.environ.get('PERF_MAX_VIEW_MS', '1000')),
+}
+# En-tête Server-Timing (par défaut : seulement en DEBUG)
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', '1' if DEBUG else '0') == '1'
+
+# --- Profilage (monitoring.profiling) ---
+# Part des requêtes d'administrateurs profilées (0 = seulement ?_profile=1)
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = Path(os.environ.get('PROFILING_DIR', BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = int(os.environ.get('PROFILING_MAX_FILES', '50'))
+
+# --- Requêtes lentes (monitoring.slowqueries) ---
+# Seuil de capture (ms), part des requêtes lentes retenues, taille du tampon
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '200'))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_SAMPLE_RATE', '0.1'))
+SLOW_QUERY_MAX_ROWS = int(os.environ.get('SLOW_QUERY_MAX_ROWS', '1000'))
+
+# --- Métriques Prometheus (/metrics) ---
+# Jeton du scraper (Authorization: Bearer ...) ; vide = super-admins connectés seulement.
+# Plusieurs workers : définir PROMETHEUS_MULTIPROC_DIR (lu par prometheus_client, à vider au démarrage).
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'monitoring': {'handlers': ['console'], 'level': os.environ.get('MONITORING_LOG_LEVEL', 'INFO')},
+        'jobs': {'handlers': ['console'], 'level': os.environ.get('JOBS_LOG_LEVEL', 'INFO')},
+        'kardex': {'handlers': ['console'], 'level': os.environ.get('KARDEX_LOG_LEVEL', 'INFO')},
+    },
+}
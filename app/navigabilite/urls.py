@@ -3,6 +3,7 @@ from django.urls import path, include
 from django.contrib.auth import views as auth_views
 from django.conf import settings
 from django.conf.urls.static import static
+from monitoring.views import metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,6 +13,10 @@ urlpatterns = [
     path('aircraft/', include('fleet.urls')),
     path("kardex/", include("kardex.urls")),
     path('stock/', include("stock.urls")),
+    path('monitoring/', include("monitoring.urls")),
+    path('jobs/', include("jobs.urls")),
+    path('autocomplete/', include("autocomplete.urls")),
+    path('metrics', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-19 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_ui_theme'),
+        ('stock', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='stockitem',
+            index=models.Index(fields=['organization', 'designation'], name='stock_item_org_desig_idx'),
+        ),
+    ]
@@ -43,6 +43,10 @@ class StockItem(models.Model):
 
     class Meta:
         ordering = ["designation", "pn"]
+        indexes = [
+            # Liste du stock d'une organisation triée par désignation (LIMIT 200 sans tri)
+            models.Index(fields=["organization", "designation"], name="stock_item_org_desig_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         # Auto-génère un code barre si vide
@@ -4,6 +4,8 @@ from django.http import HttpResponseForbidden
 from django.shortcuts import render, redirect
 from django.db.models import Q
 
+from monitoring.budgets import query_budget
+
 from .forms import StockItemForm
 from .models import StockItem
 
@@ -23,6 +25,7 @@ def stock_home(request):
 
 
 @login_required
+@query_budget(queries=5, duplicates=2)
 def stock_item_list(request):
     org_id = _org_id(request.user)
     q = (request.GET.get("q") or "").strip()